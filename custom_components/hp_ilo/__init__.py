@@ -2,109 +2,90 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
-import hpilo
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import (
-    CONF_HOST, CONF_PORT, CONF_USERNAME, CONF_PASSWORD, Platform,
-)
-from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+
+from .connection import async_get_connection_manager, async_release_connection_manager
+from .const import DOMAIN
+from .coordinator import IloDataUpdateCoordinator, snapshot_store
+from .events import IloEventStream
+from .history import IloPowerHistory
+from .scheduler import async_get_scheduler
+from .services import async_setup_services
+from .transport import async_ensure_capabilities
 
 _LOGGER = logging.getLogger(__name__)
 
-DOMAIN = "hp_ilo"
 # Platforms die we laden
 PLATFORMS = [Platform.SENSOR, Platform.BUTTON, Platform.BINARY_SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Registreer de services één keer, voor alle iLO entries samen."""
+    async_setup_services(hass)
+    return True
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up HP iLO from a config entry."""
-    
-    # Maak de Coordinator aan voor centrale polling
-    coordinator = IloDataUpdateCoordinator(hass, entry)
-    
-    # Haal de eerste keer data op voordat we verder gaan
-    await coordinator.async_config_entry_first_refresh()
-
-    # Sla de coordinator op zodat sensor.py en binary_sensor.py deze kunnen gebruiken
+
+    # Eén coordinator per entry: alle platformen en services lezen hieruit,
+    # zodat de iLO maar één keer per interval gepolld wordt.
+    # De connection pool wordt gedeeld door coordinator, buttons en services.
+    connection = async_get_connection_manager(hass, entry)
+    # Ook bij een mislukte setup, anders blijft de referentie hangen
+    entry.async_on_unload(lambda: async_release_connection_manager(hass, entry))
+    # Protocol "auto": generatie en firmware één keer proben en in de entry
+    # bewaren; daaruit volgt het transport (vóór de update listener).
+    await async_ensure_capabilities(hass, entry)
+    # Eén scheduler voor het hele domein plant alle polls en begrenst
+    # het aantal gelijktijdige iLO requests (totaal en per subnet).
+    scheduler = async_get_scheduler(hass)
+    coordinator = IloDataUpdateCoordinator(hass, entry, connection, scheduler)
+    entry.async_on_unload(scheduler.async_add(coordinator))
+
+    # Met een cache van de vorige run worden de entities meteen aangemaakt
+    # met hun laatst bekende waarden; de scheduler haalt verse data op de
+    # achtergrond. Zonder cache wachten we op de eerste poll.
+    if not await coordinator.async_restore():
+        await coordinator.async_config_entry_first_refresh()
+
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
+        "connection": connection,
     }
 
-    # --- Service Registratie ---
-    async def handle_power_action(call: ServiceCall):
-        ilo = hpilo.Ilo(
-            hostname=entry.data[CONF_HOST],
-            login=entry.data[CONF_USERNAME],
-            password=entry.data[CONF_PASSWORD],
-            port=entry.data.get(CONF_PORT, 443),
-        )
-        action = call.service
-        try:
-            if action == "reboot_server":
-                await hass.async_add_executor_job(ilo.warm_boot)
-            elif action == "shutdown_graceful":
-                await hass.async_add_executor_job(ilo.press_pwr_button)
-            elif action == "shutdown_hard":
-                await hass.async_add_executor_job(lambda: ilo.press_pwr_button(hold=True))
-            elif action == "power_on":
-                await hass.async_add_executor_job(ilo.set_host_power, True)
-            _LOGGER.info("iLO action %s successful on %s", action, entry.data[CONF_HOST])
-        except Exception as err:
-            _LOGGER.error("Error executing %s: %s", action, err)
-
-    for service in ["reboot_server", "shutdown_graceful", "shutdown_hard", "power_on"]:
-        hass.services.async_register(DOMAIN, service, handle_power_action)
+    # Optioneel: power/health wijzigingen direct via de Redfish event stream
+    if coordinator.push_updates:
+        events = IloEventStream(hass, coordinator, coordinator.redfish)
+        events.async_start(entry)
+        entry.async_on_unload(events.async_stop)
+        hass.data[DOMAIN][entry.entry_id]["events"] = events
+
+    # Power historie van de iLO (Redfish) elk uur als statistieken importeren
+    if coordinator.redfish is not None and "recorder" in hass.config.components:
+        history = IloPowerHistory(hass, coordinator, coordinator.redfish)
+        history.async_start(entry)
+        hass.data[DOMAIN][entry.entry_id]["history"] = history
+
+    # Gewijzigde options (poll intervallen) vereisen een herlaad
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
-class IloDataUpdateCoordinator(DataUpdateCoordinator):
-    """Klasse om data-verzameling te beheren."""
-
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
-        super().__init__(
-            hass, _LOGGER, name=f"{DOMAIN}_{entry.data[CONF_HOST]}",
-            update_interval=timedelta(seconds=30),
-        )
-        self.entry = entry
-
-    async def _async_update_data(self):
-        """Haal alle data op in één batch verzoek."""
-        return await self.hass.async_add_executor_job(self._get_ilo_data)
-
-    def _get_ilo_data(self):
-        try:
-            ilo = hpilo.Ilo(
-                hostname=self.entry.data[CONF_HOST],
-                login=self.entry.data[CONF_USERNAME],
-                password=self.entry.data[CONF_PASSWORD],
-                port=self.entry.data.get(CONF_PORT, 443),
-            )
-            
-            health = ilo.get_embedded_health()
-            power_usage_raw = ilo.get_host_data()
-            
-            # Wattage zoeken
-            power_watt = 0
-            for item in power_usage_raw:
-                if 'host_pwr_usage' in item:
-                    power_watt = item['host_pwr_usage']
-                    break
-
-            return {
-                "temperature": health.get("temperature", {}),
-                "fans": health.get("fans", {}),
-                "power_status": ilo.get_host_power_status(),
-                "power_on_time": ilo.get_server_power_on_time(),
-                "power_usage": power_watt,
-                "health_summary": health.get("health_at_a_glance", {}).get("status", "OK"),
-            }
-        except Exception as err:
-            raise UpdateFailed(f"Communication error: {err}")
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached snapshot when the entry is deleted."""
+    await snapshot_store(hass, entry.entry_id).async_remove()
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
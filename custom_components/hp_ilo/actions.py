@@ -0,0 +1,142 @@
+"""Wachtrij voor power acties, per iLO host."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import Any
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .stats import LatencyHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+# Power status na een actie; ook de doelstatus voor conflicten in de wachtrij.
+ACTION_POWER_STATE = {
+    "power_on": "ON",
+    "warm_boot": "ON",
+    "press_pwr_button": "OFF",
+    "hard_shutdown": "OFF",
+}
+# Acties die een server herstarten die al ON is. Een warm boot meldt geen
+# OFF en reset de power-on teller niet: er is geen status om op te wachten,
+# dus deze acties worden alleen verstuurd.
+RESTART_ACTIONS = frozenset({"warm_boot"})
+# Binnen dit venster (seconden) na een actie wordt dezelfde actie niet
+# opnieuw verstuurd en een tegenstrijdige actie geweigerd.
+ACTION_WINDOW = 10.0
+
+
+@dataclass(slots=True)
+class IloPowerConvergence:
+    """Lopende bevestiging van power acties met dezelfde doelstatus.
+
+    Een volgende actie met dezelfde doelstatus (graceful en dan hard uit)
+    neemt deze bevestiging en zijn wachtenden over; alleen een actie met
+    een andere doelstatus beëindigt hem.
+    """
+
+    expected: str
+    deadline: float
+    waiters: list[asyncio.Future[bool]] = field(default_factory=list)
+
+    def resolve(self, confirmed: bool) -> None:
+        """Geef alle wachtenden de uitkomst."""
+        for waiter in self.waiters:
+            if not waiter.done():
+                waiter.set_result(confirmed)
+        self.waiters.clear()
+
+
+class IloActionRejected(HomeAssistantError):
+    """Een actie die een lopende of net uitgevoerde actie tegenspreekt."""
+
+
+class IloActionQueue:
+    """Voer power acties voor één host één voor één uit.
+
+    * Een actie die al in de wachtrij staat of binnen ``window`` seconden
+      uitgevoerd is, wordt niet nog eens verstuurd: de aanroeper wacht
+      op (het resultaat van) de eerste (coalesce).
+    * Een actie met een andere doelstatus (aan tegenover uit) wordt
+      geweigerd zolang er een actie in de wachtrij staat of de vorige
+      binnen het venster valt. Acties met dezelfde doelstatus, zoals
+      graceful gevolgd door hard uit, gaan gewoon na elkaar.
+
+    De wachttijd tot het versturen staat in ``latency``. Alleen bedoeld
+    voor gebruik vanaf de event loop.
+    """
+
+    def __init__(self, window: float = ACTION_WINDOW) -> None:
+        self.window = window
+        self.latency = LatencyHistogram()
+        self.executed = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self._lock = asyncio.Lock()
+        # Actie -> taak die hem verstuurt, zolang hij wacht of loopt
+        self._pending: dict[str, asyncio.Task[None]] = {}
+        # Laatst verstuurde actie en wanneer hij klaar was
+        self._last: tuple[str, float] | None = None
+
+    def _conflict(self, action: str, now: float) -> str | None:
+        target = ACTION_POWER_STATE[action]
+        recent = list(self._pending)
+        if self._last is not None and now - self._last[1] < self.window:
+            recent.append(self._last[0])
+        return next((other for other in recent if ACTION_POWER_STATE[other] != target), None)
+
+    async def async_submit(
+        self, action: str, send: Callable[[], Awaitable[None]]
+    ) -> bool:
+        """Zet een actie in de wachtrij en wacht tot hij verstuurd is.
+
+        Geeft False als de actie samengevoegd is met een identieke actie,
+        en gooit :class:`IloActionRejected` bij een tegenstrijdige actie.
+        """
+        now = time.monotonic()
+        if (task := self._pending.get(action)) is not None:
+            self.coalesced += 1
+            await asyncio.shield(task)
+            return False
+        if (other := self._conflict(action, now)) is not None:
+            self.rejected += 1
+            raise IloActionRejected(f"{action} conflicts with {other} that was just requested")
+        if self._last is not None and self._last[0] == action and now - self._last[1] < self.window:
+            self.coalesced += 1
+            return False
+
+        task = asyncio.get_running_loop().create_task(self._async_send(action, send, now))
+        self._pending[action] = task
+        # Shield: een geannuleerde service call breekt de actie niet af
+        # voor de aanroepers die erop meeliften.
+        await asyncio.shield(task)
+        return True
+
+    async def _async_send(
+        self, action: str, send: Callable[[], Awaitable[None]], submitted: float
+    ) -> None:
+        try:
+            async with self._lock:
+                wait = time.monotonic() - submitted
+                self.latency.observe(wait)
+                _LOGGER.debug("Sending %s after %.2fs in the queue", action, wait)
+                await send()
+                self.executed += 1
+                self._last = (action, time.monotonic())
+        finally:
+            del self._pending[action]
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Tellers en wachttijd, voor diagnostics."""
+        return {
+            "pending": list(self._pending),
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "queue_latency": self.latency.as_dict(),
+        }
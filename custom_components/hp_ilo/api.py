@@ -0,0 +1,432 @@
+"""Async Redfish client voor HP iLO, gebouwd op de aiohttp sessie van HA."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from datetime import UTC, datetime
+import json
+import logging
+import time
+from typing import Any
+
+import aiohttp
+
+from .const import TIER_INVENTORY, TIER_POWER, TIER_THERMAL
+from .stats import IloPollStats
+
+_LOGGER = logging.getLogger(__name__)
+
+REDFISH_ROOT = "/redfish/v1/"
+SESSIONS_PATH = "/redfish/v1/SessionService/Sessions/"
+EVENT_SERVICE_PATH = "/redfish/v1/EventService/"
+DEFAULT_TIMEOUT = 10
+
+# Alleen de properties die de entities lezen, voor firmware die $select kent
+SELECT_SYSTEM = ("PowerState", "Status")
+SELECT_THERMAL = (
+    "Temperatures/Name",
+    "Temperatures/ReadingCelsius",
+    "Temperatures/PhysicalContext",
+    "Temperatures/Status",
+    "Fans/Name",
+    "Fans/FanName",
+    "Fans/Reading",
+    "Fans/CurrentReading",
+    "Fans/Status",
+)
+SELECT_POWER = ("PowerControl/PowerConsumedWatts",)
+SELECT_MANAGER = ("FirmwareVersion", "Model")
+SELECT_IDENTITY = ("Model", "SerialNumber")
+
+# Button/service acties naar Redfish ResetType
+RESET_TYPES = {
+    "power_on": "On",
+    "warm_boot": "ForceRestart",
+    "press_pwr_button": "PushPowerButton",
+    "hard_shutdown": "ForceOff",
+}
+
+
+class IloRedfishError(Exception):
+    """Algemene Redfish fout."""
+
+
+class IloRedfishConnectionError(IloRedfishError):
+    """iLO niet bereikbaar of time-out."""
+
+
+class IloRedfishAuthError(IloRedfishError):
+    """Login geweigerd."""
+
+
+class IloRedfishNotFoundError(IloRedfishError):
+    """Resource bestaat niet (bv. oudere firmware)."""
+
+
+class IloRedfishClient:
+    """Minimale Redfish client met session-token auth.
+
+    Alle requests lopen over de gedeelde aiohttp sessie van Home Assistant,
+    zodat keep-alive verbindingen hergebruikt worden en polling geen
+    executor threads bezet houdt.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        timeout: float = DEFAULT_TIMEOUT,
+        stats: IloPollStats | None = None,
+    ) -> None:
+        self._session = session
+        self._stats = stats
+        self._base_url = f"https://{host}:{port}"
+        self._username = username
+        self._password = password
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._token: str | None = None
+        self._session_uri: str | None = None
+        self._system_uri: str | None = None
+        self._chassis_uri: str | None = None
+        self._manager_uri: str | None = None
+        self._login_lock = asyncio.Lock()
+        # ETag en geparste body per URI, voor conditional GETs
+        self._cache: dict[str, tuple[str, dict[str, Any]]] = {}
+        self._select_supported = False
+        self.last_cycle: dict[str, Any] = _empty_stats()
+        self.totals: dict[str, Any] = _empty_stats()
+
+    @property
+    def base_url(self) -> str:
+        """Base URL van de iLO."""
+        return self._base_url
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        json: Any = None,
+        auth: bool = True,
+        etag: str | None = None,
+    ) -> aiohttp.ClientResponse:
+        headers = {"OData-Version": "4.0"}
+        if auth and self._token:
+            headers["X-Auth-Token"] = self._token
+        if etag:
+            headers["If-None-Match"] = etag
+        self._count("requests", 1)
+        start = time.perf_counter()
+        try:
+            response = await self._session.request(
+                method,
+                f"{self._base_url}{path}",
+                json=json,
+                headers=headers,
+                timeout=self._timeout,
+            )
+            body = await response.read()
+        except asyncio.TimeoutError as err:
+            raise IloRedfishConnectionError(f"Timeout talking to {self._base_url}") from err
+        except aiohttp.ClientError as err:
+            raise IloRedfishConnectionError(f"Error talking to {self._base_url}: {err}") from err
+        if self._stats is not None:
+            self._stats.observe_call(
+                f"{method} {path.partition('?')[0]}", time.perf_counter() - start, len(body)
+            )
+        return response
+
+    async def async_login(self, stale: str | None = None) -> None:
+        """Open een Redfish sessie en bewaar het token.
+
+        ``stale`` is het token waarop de iLO 401 gaf. Alleen als dat nog
+        het huidige token is wordt opnieuw ingelogd: gelijktijdige requests
+        die allemaal een 401 krijgen openen zo samen één nieuwe sessie, in
+        plaats van elkaars verse token te overschrijven (en die sessie op
+        de iLO te laten hangen).
+        """
+        async with self._login_lock:
+            if self._token is not None and self._token != stale:
+                return
+            response = await self._request(
+                "POST",
+                SESSIONS_PATH,
+                json={"UserName": self._username, "Password": self._password},
+                auth=False,
+            )
+            if response.status in (401, 403):
+                raise IloRedfishAuthError("Invalid iLO credentials")
+            if response.status not in (200, 201):
+                raise IloRedfishError(f"Login failed: status {response.status}")
+            self._token = response.headers.get("X-Auth-Token")
+            self._session_uri = response.headers.get("Location")
+            if not self._token:
+                raise IloRedfishError("Login response contained no X-Auth-Token")
+            if self._stats is not None:
+                self._stats.observe_login()
+
+    async def async_logout(self) -> None:
+        """Sluit de sessie zodat de iLO geen sessie slot vasthoudt."""
+        if not self._token:
+            return
+        session_uri, self._session_uri = self._session_uri, None
+        try:
+            if session_uri:
+                path = session_uri.removeprefix(self._base_url)
+                await self._request("DELETE", path)
+        except IloRedfishError as err:
+            _LOGGER.debug("Logout from %s failed: %s", self._base_url, err)
+        finally:
+            self._token = None
+
+    async def async_get(
+        self, path: str, select: Iterable[str] | None = None
+    ) -> dict[str, Any]:
+        """GET een resource; logt (opnieuw) in als het token verlopen is.
+
+        Met een bekende ETag wordt If-None-Match meegestuurd; bij 304 komt
+        het eerder geparste object uit de cache terug.
+        """
+        if select and self._select_supported:
+            path = f"{path}?$select={','.join(select)}"
+        if not self._token:
+            await self.async_login()
+        token = self._token
+        response = await self._request("GET", path, etag=self._etag(path))
+        if response.status == 401:
+            await self.async_login(stale=token)
+            response = await self._request("GET", path, etag=self._etag(path))
+        if response.status == 304 and path in self._cache:
+            self._count("not_modified", 1)
+            return self._cache[path][1]
+        if response.status == 400 and "$select=" in path:
+            # Firmware kent (een deel van) de $select niet: zonder opnieuw
+            _LOGGER.debug("%s rejected $select, disabling it", self._base_url)
+            self._select_supported = False
+            return await self.async_get(path.partition("?")[0])
+        if response.status in (401, 403):
+            raise IloRedfishAuthError("Invalid iLO credentials")
+        if response.status == 404:
+            raise IloRedfishNotFoundError(f"GET {path} failed: not found")
+        if response.status != 200:
+            raise IloRedfishError(f"GET {path} failed: status {response.status}")
+
+        body = await response.read()
+        start = time.perf_counter()
+        data = json.loads(body)
+        self._count("parse_time", time.perf_counter() - start)
+        self._count("bytes", len(body))
+        if etag := response.headers.get("ETag"):
+            self._cache[path] = (etag, data)
+        return data
+
+    def _etag(self, path: str) -> str | None:
+        cached = self._cache.get(path)
+        return cached[0] if cached else None
+
+    def _count(self, key: str, value: float) -> None:
+        self.last_cycle[key] += value
+        self.totals[key] += value
+
+    async def async_post(self, path: str, payload: dict[str, Any]) -> None:
+        """POST een actie."""
+        if not self._token:
+            await self.async_login()
+        token = self._token
+        response = await self._request("POST", path, json=payload)
+        if response.status == 401:
+            await self.async_login(stale=token)
+            response = await self._request("POST", path, json=payload)
+        if response.status not in (200, 202, 204):
+            raise IloRedfishError(f"POST {path} failed: status {response.status}")
+
+    async def async_event_stream_uri(self) -> str | None:
+        """SSE URI van de EventService, of None als de firmware dat niet kent."""
+        service = await self.async_get(EVENT_SERVICE_PATH)
+        return service.get("ServerSentEventUri")
+
+    async def async_open_event_stream(self, uri: str) -> aiohttp.ClientResponse:
+        """Open de SSE stream; de aanroeper leest en sluit de response."""
+        if not self._token:
+            await self.async_login()
+        token = self._token
+        headers = {"X-Auth-Token": token, "Accept": "text/event-stream"}
+        try:
+            response = await self._session.get(
+                f"{self._base_url}{uri}",
+                headers=headers,
+                # Geen totale time-out: de stream blijft open zolang de iLO leeft
+                timeout=aiohttp.ClientTimeout(connect=self._timeout.total),
+            )
+        except asyncio.TimeoutError as err:
+            raise IloRedfishConnectionError(f"Timeout talking to {self._base_url}") from err
+        except aiohttp.ClientError as err:
+            raise IloRedfishConnectionError(f"Error talking to {self._base_url}: {err}") from err
+        if response.status == 401:
+            response.release()
+            if self._token == token:
+                # Niet het token van een intussen geopende sessie weggooien
+                self._token = None
+            raise IloRedfishAuthError("Event stream session expired")
+        if response.status != 200:
+            response.release()
+            raise IloRedfishError(f"GET {uri} failed: status {response.status}")
+        return response
+
+    async def _async_discover(self) -> None:
+        """Zoek de eerste System en Chassis resource (meestal /1)."""
+        if self._system_uri and self._chassis_uri and self._manager_uri:
+            return
+        root = await self.async_get(REDFISH_ROOT)
+        self._select_supported = bool(
+            root.get("ProtocolFeaturesSupported", {}).get("SelectQuery")
+        )
+        systems = await self.async_get("/redfish/v1/Systems/")
+        chassis = await self.async_get("/redfish/v1/Chassis/")
+        managers = await self.async_get("/redfish/v1/Managers/")
+        self._system_uri = systems["Members"][0]["@odata.id"]
+        self._chassis_uri = chassis["Members"][0]["@odata.id"]
+        self._manager_uri = managers["Members"][0]["@odata.id"]
+
+    async def async_get_snapshot(
+        self, tiers: Iterable[str] = (TIER_POWER, TIER_THERMAL, TIER_INVENTORY)
+    ) -> dict[str, Any]:
+        """Haal de gevraagde tiers op in hetzelfde formaat als de RIBCL poll."""
+        self.last_cycle = _empty_stats()
+        await self._async_discover()
+        chassis = self._chassis_uri.rstrip("/")
+        tiers = set(tiers)
+        data: dict[str, Any] = {}
+        if TIER_INVENTORY in tiers:
+            # Redfish kent geen power-on-time teller; de inventory tier kijkt
+            # alleen of de firmware gewijzigd is (meestal een goedkope 304)
+            manager = await self.async_get(self._manager_uri, SELECT_MANAGER)
+            data["inventory"] = {"firmware_version": manager.get("FirmwareVersion")}
+        if not tiers & {TIER_POWER, TIER_THERMAL}:
+            return data
+
+        requests = {"system": self.async_get(self._system_uri, SELECT_SYSTEM)}
+        if TIER_THERMAL in tiers:
+            requests["thermal"] = self.async_get(f"{chassis}/Thermal/", SELECT_THERMAL)
+        if TIER_POWER in tiers:
+            requests["power"] = self.async_get(f"{chassis}/Power/", SELECT_POWER)
+        results = dict(zip(requests, await asyncio.gather(*requests.values())))
+
+        system = results["system"]
+        data["health_summary"] = _parse_health(system)
+        if TIER_POWER in tiers:
+            data["power_status"] = str(system.get("PowerState", "Unknown")).upper()
+            data["power_usage"] = _parse_power_usage(results["power"])
+        if TIER_THERMAL in tiers:
+            data["temperature"] = _parse_temperatures(results["thermal"])
+            data["fans"] = _parse_fans(results["thermal"])
+        return data
+
+    async def async_get_inventory(self) -> dict[str, Any]:
+        """Model, serienummer en firmware van server en iLO."""
+        await self._async_discover()
+        system, manager = await asyncio.gather(
+            self.async_get(self._system_uri, SELECT_IDENTITY),
+            self.async_get(self._manager_uri, SELECT_MANAGER),
+        )
+        return {
+            "model": system.get("Model"),
+            "serial_number": (system.get("SerialNumber") or "").strip() or None,
+            "firmware_version": manager.get("FirmwareVersion"),
+            "hw_version": manager.get("Model"),
+        }
+
+    async def async_get_power_history(self) -> list[dict[str, Any]]:
+        """De power meter historie van de iLO (HPE OEM, iLO 4 2.x+/5).
+
+        Eén request levert de laatste 24 uur in samples van 5 minuten,
+        oudste eerst. ``IloRedfishNotFoundError`` als de firmware hem niet kent.
+        """
+        await self._async_discover()
+        chassis = self._chassis_uri.rstrip("/")
+        return _parse_power_history(await self.async_get(f"{chassis}/Power/PowerMeter/"))
+
+    async def async_power_action(self, action: str) -> None:
+        """Voer een power actie uit via ComputerSystem.Reset."""
+        await self._async_discover()
+        system = self._system_uri.rstrip("/")
+        await self.async_post(
+            f"{system}/Actions/ComputerSystem.Reset/",
+            {"ResetType": RESET_TYPES[action]},
+        )
+
+
+def _empty_stats() -> dict[str, Any]:
+    return {"requests": 0, "not_modified": 0, "bytes": 0, "parse_time": 0.0}
+
+
+def _parse_temperatures(thermal: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    temperatures = {}
+    for sensor in thermal.get("Temperatures", []):
+        label = sensor.get("Name")
+        if not label:
+            continue
+        status = sensor.get("Status", {})
+        temperatures[label] = {
+            "label": label,
+            "location": sensor.get("PhysicalContext"),
+            "status": (
+                "Not Installed"
+                if status.get("State") == "Absent"
+                else status.get("Health") or "OK"
+            ),
+            "currentreading": (sensor.get("ReadingCelsius"), "Celsius"),
+        }
+    return temperatures
+
+
+def _parse_fans(thermal: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    fans = {}
+    for fan in thermal.get("Fans", []):
+        label = fan.get("Name") or fan.get("FanName")
+        if not label:
+            continue
+        if fan.get("Status", {}).get("State") == "Absent":
+            continue
+        fans[label] = {
+            "label": label,
+            "status": fan.get("Status", {}).get("Health") or "OK",
+            "speed": (fan.get("Reading", fan.get("CurrentReading")), "Percentage"),
+        }
+    return fans
+
+
+def _parse_power_usage(power: dict[str, Any]) -> int | float:
+    for control in power.get("PowerControl", []):
+        if (watts := control.get("PowerConsumedWatts")) is not None:
+            return watts
+    return 0
+
+
+def _parse_power_history(meter: dict[str, Any]) -> list[dict[str, Any]]:
+    samples = []
+    for detail in meter.get("PowerDetail", []):
+        if detail.get("Average") is None or not detail.get("Time"):
+            continue
+        try:
+            time_ = datetime.fromisoformat(detail["Time"])
+        except ValueError:
+            continue
+        average = float(detail["Average"])
+        samples.append(
+            {
+                # Tijdstip van het einde van het sample; zonder zone is het UTC
+                "time": time_ if time_.tzinfo else time_.replace(tzinfo=UTC),
+                "average": average,
+                "minimum": float(detail.get("Minimum", average)),
+                "peak": float(detail.get("Peak", average)),
+            }
+        )
+    return sorted(samples, key=lambda sample: sample["time"])
+
+
+def _parse_health(system: dict[str, Any]) -> str:
+    status = system.get("Status", {})
+    return status.get("HealthRollup") or status.get("Health") or "OK"
@@ -0,0 +1,108 @@
+"""Circuit breaker met exponentiële backoff voor onbereikbare iLO's."""
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Any
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+FAILURE_THRESHOLD = 3
+BASE_DELAY = 10.0
+MAX_DELAY = 600.0
+JITTER = 0.2
+
+
+class IloCircuitBreaker:
+    """Houd polls tegen zolang een iLO niet antwoordt.
+
+    Na ``threshold`` opeenvolgende fouten gaat de breaker open en wordt er
+    niets meer verstuurd tot de (exponentieel groeiende, gejitterde) backoff
+    verstreken is. Daarna mag precies één probe door (half-open); slaagt die
+    dan sluit de breaker, anders gaat hij met een langere backoff weer open.
+    Andere entries van dezelfde host wachten intussen op de uitkomst van de
+    probe (:meth:`async_wait_probe`) in plaats van elke tick te falen.
+    Alleen bedoeld voor gebruik vanaf de event loop.
+    """
+
+    def __init__(
+        self,
+        threshold: int = FAILURE_THRESHOLD,
+        base_delay: float = BASE_DELAY,
+        max_delay: float = MAX_DELAY,
+    ) -> None:
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_count = 0
+        self._retry_at = 0.0
+        # Gezet zodra de lopende probe een uitkomst heeft
+        self._probe: asyncio.Event | None = None
+
+    def allow_request(self, now: float) -> bool:
+        """Mag er nu een request naar de iLO?"""
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN and now >= self._retry_at:
+            self.state = STATE_HALF_OPEN
+            self._probe = asyncio.Event()
+            return True
+        return False
+
+    @property
+    def probing(self) -> bool:
+        """Loopt er een probe (half-open)?"""
+        return self._probe is not None
+
+    async def async_wait_probe(self) -> None:
+        """Wacht tot de lopende probe gelukt, mislukt of afgebroken is."""
+        if self._probe is not None:
+            await self._probe.wait()
+
+    def _end_probe(self) -> None:
+        if self._probe is not None:
+            self._probe.set()
+            self._probe = None
+
+    def abort_probe(self, now: float) -> None:
+        """De probe kwam niet tot een request: de volgende poll mag meteen proben."""
+        if self.state == STATE_HALF_OPEN:
+            self.state = STATE_OPEN
+            self._retry_at = now
+        self._end_probe()
+
+    def record_success(self) -> None:
+        """Request gelukt: breaker dicht en teller terug naar nul."""
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._end_probe()
+
+    def record_failure(self, now: float) -> float:
+        """Request mislukt; geeft het aantal seconden tot de volgende poging."""
+        self.failures += 1
+        delay = min(self.max_delay, self.base_delay * 2 ** (self.failures - 1))
+        delay *= random.uniform(1 - JITTER, 1 + JITTER)
+        if self.state == STATE_HALF_OPEN or self.failures >= self.threshold:
+            if self.state != STATE_OPEN:
+                self.opened_count += 1
+            self.state = STATE_OPEN
+        self._retry_at = now + delay
+        self._end_probe()
+        return delay
+
+    def retry_in(self, now: float) -> float:
+        """Seconden tot de breaker weer een probe toelaat."""
+        return max(0.0, self._retry_at - now)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Status voor logging en diagnostics."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened_count": self.opened_count,
+        }
@@ -1,20 +1,15 @@
 """Support for HP iLO power buttons."""
 from __future__ import annotations
 
-import hpilo
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import (
-    CONF_HOST,
-    CONF_PORT,
-    CONF_USERNAME,
-    CONF_PASSWORD,
-)
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, DEFAULT_PORT
+from .const import DOMAIN
+from .coordinator import IloDataUpdateCoordinator
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -22,53 +17,34 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the iLO buttons."""
-    device_info = DeviceInfo(
-        identifiers={(DOMAIN, entry.unique_id or entry.entry_id)},
-        name=entry.data.get("name", "HP iLO"),
-        manufacturer="Hewlett Packard Enterprise",
-    )
+    coordinator: IloDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    device_info = coordinator.device_info
 
     async_add_entities([
-        IloPowerButton(entry, device_info, "Power On", "power_on", "mdi:power-on"),
-        IloPowerButton(entry, device_info, "Reboot (Warm)", "warm_boot", "mdi:restart"),
-        IloPowerButton(entry, device_info, "Shutdown (Graceful)", "press_pwr_button", "mdi:power"),
-        IloPowerButton(entry, device_info, "Shutdown (Hard - Press & Hold)", "hard_shutdown", "mdi:power-off"),
+        IloPowerButton(coordinator, device_info, "Power On", "power_on", "mdi:power-on"),
+        IloPowerButton(coordinator, device_info, "Reboot (Warm)", "warm_boot", "mdi:restart"),
+        IloPowerButton(coordinator, device_info, "Shutdown (Graceful)", "press_pwr_button", "mdi:power"),
+        IloPowerButton(coordinator, device_info, "Shutdown (Hard - Press & Hold)", "hard_shutdown", "mdi:power-off"),
     ])
 
-class IloPowerButton(ButtonEntity):
+class IloPowerButton(CoordinatorEntity, ButtonEntity):
     """Representation of an iLO power action button."""
 
-    def __init__(self, entry, device_info, name, action_type, icon):
-        self._entry = entry
+    def __init__(self, coordinator, device_info, name, action_type, icon):
+        # Buttons tonen geen iLO data: de context verandert nooit, dus alleen
+        # een wisseling van beschikbaarheid schrijft de state opnieuw.
+        super().__init__(coordinator, ("button", action_type))
+        self._entry = coordinator.entry
         self._action_type = action_type
         self._attr_name = f"{device_info['name']} {name}"
-        self._attr_unique_id = f"{entry.entry_id}_{action_type}"
+        self._attr_unique_id = f"{self._entry.entry_id}_{action_type}"
         self._attr_device_info = device_info
         self._attr_icon = icon
 
-    def _get_ilo_client(self):
-        return hpilo.Ilo(
-            hostname=self._entry.data[CONF_HOST],
-            login=self._entry.data[CONF_USERNAME],
-            password=self._entry.data[CONF_PASSWORD],
-            port=self._entry.data.get(CONF_PORT, DEFAULT_PORT),
-        )
-
     async def async_press(self) -> None:
         """Handle the button press."""
-        ilo = await self.hass.async_add_executor_job(self._get_ilo_client)
-        
+        # De coordinator pollt de power status daarna snel tot hij bevestigd is
         try:
-            if self._action_type == "power_on":
-                await self.hass.async_add_executor_job(ilo.set_host_power, True)
-            elif self._action_type == "warm_boot":
-                await self.hass.async_add_executor_job(ilo.warm_boot)
-            elif self._action_type == "press_pwr_button":
-                # GEFIXT: Gebruik press_pwr_button (de correcte library naam)
-                await self.hass.async_add_executor_job(ilo.press_pwr_button)
-            elif self._action_type == "hard_shutdown":
-                # GEFIXT: Gebruik press_pwr_button met hold=True
-                await self.hass.async_add_executor_job(lambda: ilo.press_pwr_button(hold=True))
+            await self.coordinator.async_power_action(self._action_type)
         except Exception as err:
-            from homeassistant.exceptions import HomeAssistantError
             raise HomeAssistantError(f"iLO Action failed: {err}")
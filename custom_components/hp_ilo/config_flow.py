@@ -1,11 +1,11 @@
 """Config flow voor HP iLO via Redfish API."""
 from __future__ import annotations
 
+from ipaddress import ip_network
 import logging
 from urllib.parse import urlparse  # Toegevoegd voor SSDP support
 
 import voluptuous as vol
-from redfish import redfish_client, AuthMethod
 
 from homeassistant import config_entries
 from homeassistant.components import ssdp
@@ -16,10 +16,40 @@ from homeassistant.const import (
     CONF_PASSWORD,
     CONF_NAME,
 )
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.typing import DiscoveryInfoType
 from homeassistant.helpers.service_info.ssdp import SsdpServiceInfo
 
-from .const import DOMAIN, DEFAULT_PORT
+from .const import (
+    CONF_CAPABILITIES,
+    CONF_FAN_DEADBAND,
+    CONF_PROTOCOL,
+    CONF_PUSH_UPDATES,
+    CONF_TEMPERATURE_DEADBAND,
+    DEFAULT_FAN_DEADBAND,
+    DEFAULT_PORT,
+    DEFAULT_PUSH_UPDATES,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    DEFAULT_TIER_INTERVALS,
+    DOMAIN,
+    PROTOCOL_AUTO,
+    PROTOCOL_REDFISH,
+    PROTOCOL_RIBCL,
+    TIER_INTERVAL_OPTIONS,
+)
+from .discovery import MAX_SCAN_HOSTS, IloScanResult, async_scan_subnet
+from .gate import PRIORITY_SETUP, async_get_session_gate
+from .transport import (
+    IloTransportAuthError,
+    IloTransportConnectionError,
+    async_probe_capabilities,
+    capabilities_from_scan,
+    create_transport,
+    resolve_protocol,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,6 +61,16 @@ class RedfishIloFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     def __init__(self) -> None:
         self.config: dict = {}
+        # Gevonden iLO's van de subnet scan, per host
+        self.found: dict[str, IloScanResult] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> IloOptionsFlowHandler:
+        """Options flow voor de poll intervallen."""
+        return IloOptionsFlowHandler()
 
     # ---------------------------------------------------------------------
     # SSDP DISCOVERY
@@ -54,12 +94,120 @@ class RedfishIloFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         await self.async_set_unique_id(f"redfish_ilo_{host}")
         self._abort_if_unique_id_configured(updates=self.config)
 
-        return await self.async_step_user()
+        return await self.async_step_manual()
 
     # ---------------------------------------------------------------------
-    # MANUELE INVOER
+    # KEUZE: MANUEEL OF SUBNET SCAN
     # ---------------------------------------------------------------------
     async def async_step_user(self, user_input=None) -> FlowResult:
+        """Eén iLO invoeren of een subnet scannen."""
+        return self.async_show_menu(step_id="user", menu_options=["manual", "scan"])
+
+    # ---------------------------------------------------------------------
+    # SUBNET SCAN (routed management VLANs dragen geen SSDP)
+    # ---------------------------------------------------------------------
+    async def async_step_scan(self, user_input=None) -> FlowResult:
+        """Scan een CIDR range op iLO's."""
+        errors = {}
+
+        if user_input is not None:
+            try:
+                network = ip_network(user_input["subnet"].strip(), strict=False)
+            except ValueError:
+                errors["subnet"] = "invalid_subnet"
+            else:
+                if network.num_addresses > MAX_SCAN_HOSTS:
+                    errors["subnet"] = "subnet_too_large"
+                else:
+                    port = int(user_input[CONF_PORT])
+                    configured = {
+                        entry.data.get(CONF_HOST) for entry in self._async_current_entries()
+                    }
+                    found = await async_scan_subnet(
+                        async_get_clientsession(self.hass, verify_ssl=False), network, port
+                    )
+                    self.found = {
+                        result.host: result
+                        for result in found
+                        if result.host not in configured
+                    }
+                    if self.found:
+                        return await self.async_step_scan_select()
+                    errors["base"] = "no_devices_found"
+
+        return self.async_show_form(
+            step_id="scan",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        "subnet", default=(user_input or {}).get("subnet", "")
+                    ): str,
+                    vol.Required(CONF_PORT, default=DEFAULT_PORT): vol.All(
+                        vol.Coerce(int), vol.Range(min=1, max=65535)
+                    ),
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_scan_select(self, user_input=None) -> FlowResult:
+        """Kies de gevonden iLO's en de gedeelde credentials."""
+        if user_input is not None:
+            hosts = [host for host in user_input["hosts"] if host in self.found]
+            for host in hosts:
+                result = self.found[host]
+                # Elke iLO een eigen discovery flow: die logt in en maakt de
+                # entry, of blijft bij een fout staan onder "Discovered".
+                self.hass.async_create_task(
+                    self.hass.config_entries.flow.async_init(
+                        DOMAIN,
+                        context={"source": config_entries.SOURCE_INTEGRATION_DISCOVERY},
+                        data={
+                            CONF_HOST: host,
+                            CONF_PORT: result.port,
+                            CONF_USERNAME: user_input[CONF_USERNAME],
+                            CONF_PASSWORD: user_input[CONF_PASSWORD],
+                            CONF_NAME: f"iLO Redfish @ {host}",
+                            # De scan heeft de iLO al geprobed
+                            CONF_PROTOCOL: PROTOCOL_AUTO,
+                            CONF_CAPABILITIES: capabilities_from_scan(result).as_dict(),
+                        },
+                    ),
+                    f"hp_ilo onboarding {host}",
+                )
+            return self.async_abort(
+                reason="onboarding_started",
+                description_placeholders={"count": str(len(hosts))},
+            )
+
+        return self.async_show_form(
+            step_id="scan_select",
+            data_schema=vol.Schema(
+                {
+                    vol.Required("hosts", default=list(self.found)): cv.multi_select(
+                        {host: result.label for host, result in self.found.items()}
+                    ),
+                    vol.Required(CONF_USERNAME, default="Administrator"): str,
+                    vol.Required(CONF_PASSWORD): str,
+                }
+            ),
+            description_placeholders={"count": str(len(self.found))},
+        )
+
+    async def async_step_integration_discovery(
+        self, discovery_info: DiscoveryInfoType
+    ) -> FlowResult:
+        """Een iLO uit de subnet scan, met de gekozen credentials."""
+        self.config = dict(discovery_info)
+        await self.async_set_unique_id(f"redfish_ilo_{self.config[CONF_HOST]}")
+        self._abort_if_unique_id_configured()
+        self.context["title_placeholders"] = {"name": self.config[CONF_NAME]}
+        return await self.async_step_auth()
+
+    # ---------------------------------------------------------------------
+    # MANUELE INVOER
+    # ---------------------------------------------------------------------
+    async def async_step_manual(self, user_input=None) -> FlowResult:
         """Handmatige invoer van host, poort, credentials."""
         errors = {}
 
@@ -70,11 +218,15 @@ class RedfishIloFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_USERNAME: user_input[CONF_USERNAME],
                 CONF_PASSWORD: user_input[CONF_PASSWORD],
                 CONF_NAME: user_input.get(CONF_NAME) or f"iLO Redfish @ {user_input[CONF_HOST]}",
+                # Het foutformulier van auth heeft geen protocol veld
+                CONF_PROTOCOL: user_input.get(
+                    CONF_PROTOCOL, self.config.get(CONF_PROTOCOL, PROTOCOL_AUTO)
+                ),
             }
             return await self.async_step_auth()
 
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=vol.Schema(
                 {
                     vol.Required(CONF_HOST, default=self.config.get(CONF_HOST, "")): str,
@@ -84,6 +236,10 @@ class RedfishIloFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                     vol.Required(CONF_USERNAME, default="Administrator"): str,
                     vol.Required(CONF_PASSWORD): str,
                     vol.Optional(CONF_NAME, default=self.config.get(CONF_NAME, "")): str,
+                    vol.Optional(
+                        CONF_PROTOCOL,
+                        default=self.config.get(CONF_PROTOCOL, PROTOCOL_AUTO),
+                    ): vol.In([PROTOCOL_AUTO, PROTOCOL_RIBCL, PROTOCOL_REDFISH]),
                 }
             ),
             errors=errors,
@@ -93,35 +249,40 @@ class RedfishIloFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     # AUTHENTICATIE & TEST CONNECTIE
     # ---------------------------------------------------------------------
     async def async_step_auth(self, user_input=None) -> FlowResult:
-        """Probeer in te loggen en een test call uit te voeren naar de API Root."""
+        """Log in over het transport dat de entry gaat gebruiken."""
         errors = {}
 
-        try:
-            base_url = f"https://{self.config[CONF_HOST]}:{self.config[CONF_PORT]}"
-
-            def _test_connection():
-                redfish_obj = redfish_client(
-                    base_url=base_url,
-                    username=self.config[CONF_USERNAME],
-                    password=self.config[CONF_PASSWORD],
-                    default_prefix="/redfish/v1/",
-                    timeout=10
+        if (
+            self.config[CONF_PROTOCOL] == PROTOCOL_AUTO
+            and CONF_CAPABILITIES not in self.config
+            and (
+                capabilities := await async_probe_capabilities(
+                    self.hass, self.config[CONF_HOST], self.config[CONF_PORT]
                 )
-                redfish_obj.login(auth=AuthMethod.SESSION)
-                
-                # TEST: We vragen de Root aan (/) in plaats van /Systems/1/
-                # Dit voorkomt de 404 als de systeem-ID anders is dan "1"
-                response = redfish_obj.get("/redfish/v1/")
-                
-                # Uitloggen om sessie-vervuiling op de iLO te voorkomen
-                redfish_obj.logout()
-                return response
-
-            response = await self.hass.async_add_executor_job(_test_connection)
-
-            if response.status != 200:
-                raise Exception(f"Redfish request mislukt: status {response.status}")
+            )
+        ):
+            # Eén keer proben; de entry bewaart het resultaat
+            self.config[CONF_CAPABILITIES] = capabilities.as_dict()
+        transport = create_transport(
+            self.hass, self.config, resolve_protocol(self.config)
+        )
 
+        try:
+            # Dezelfde sessie limiet als de entries van deze iLO
+            async with async_get_session_gate(
+                self.hass, self.config[CONF_HOST]
+            ).async_session(PRIORITY_SETUP):
+                await transport.async_validate()
+        except IloTransportConnectionError as err:
+            _LOGGER.error("%s fout tijdens setup: %s", transport.protocol, err)
+            errors["base"] = "cannot_connect"
+        except IloTransportAuthError as err:
+            _LOGGER.error("%s fout tijdens setup: %s", transport.protocol, err)
+            errors["base"] = "invalid_auth"
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.error("%s fout tijdens setup: %s", transport.protocol, err)
+            errors["base"] = "unknown"
+        else:
             # Unique ID instellen
             unique_id = f"redfish_ilo_{self.config[CONF_HOST]}"
             await self.async_set_unique_id(unique_id)
@@ -132,20 +293,9 @@ class RedfishIloFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 data=self.config,
             )
 
-        except Exception as err:
-            err_str = str(err).lower()
-            _LOGGER.error("Redfish fout tijdens setup: %s", err)
-
-            if "timeout" in err_str or "connection" in err_str:
-                errors["base"] = "cannot_connect"
-            elif "401" in err_str or "unauthorized" in err_str:
-                errors["base"] = "invalid_auth"
-            else:
-                errors["base"] = "unknown"
-
         # Bij een fout gaan we terug naar het gebruikersscherm om gegevens te corrigeren
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=vol.Schema({
                 vol.Required(CONF_HOST, default=self.config[CONF_HOST]): str,
                 vol.Required(CONF_PORT, default=self.config[CONF_PORT]): int,
@@ -154,3 +304,42 @@ class RedfishIloFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             }),
             errors=errors,
         )
+
+
+class IloOptionsFlowHandler(config_entries.OptionsFlow):
+    """Poll interval per tier instellen."""
+
+    async def async_step_init(self, user_input=None) -> FlowResult:
+        """Toon en bewaar de intervallen (seconden)."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        schema = {
+            vol.Required(
+                option,
+                default=options.get(option, DEFAULT_TIER_INTERVALS[tier]),
+            ): vol.All(vol.Coerce(int), vol.Range(min=5, max=86400))
+            for tier, option in TIER_INTERVAL_OPTIONS.items()
+        }
+        schema[
+            vol.Required(
+                CONF_TEMPERATURE_DEADBAND,
+                default=options.get(CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND),
+            )
+        ] = vol.All(vol.Coerce(float), vol.Range(min=0, max=10))
+        schema[
+            vol.Required(
+                CONF_FAN_DEADBAND,
+                default=options.get(CONF_FAN_DEADBAND, DEFAULT_FAN_DEADBAND),
+            )
+        ] = vol.All(vol.Coerce(float), vol.Range(min=0, max=25))
+        if resolve_protocol(self.config_entry.data, options) == PROTOCOL_REDFISH:
+            # De event stream bestaat alleen via Redfish
+            schema[
+                vol.Required(
+                    CONF_PUSH_UPDATES,
+                    default=options.get(CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES),
+                )
+            ] = bool
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(schema))
@@ -0,0 +1,226 @@
+"""Gedeelde, per-host pool van python-hpilo clients."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+import logging
+import threading
+import time
+from typing import Any
+
+import hpilo
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .actions import IloActionQueue
+from .breaker import IloCircuitBreaker
+from .const import DATA_CONNECTIONS, DEFAULT_PORT
+
+_LOGGER = logging.getLogger(__name__)
+
+# Een client die langer ongebruikt blijft wordt opnieuw opgebouwd, zodat een
+# iLO die intussen herstart of van firmware wisselt opnieuw gedetecteerd wordt.
+MAX_IDLE = 300
+POOL_SIZE = 2
+# python-hpilo wacht standaard 60 s; een onbereikbare iLO houdt zo lang een
+# executor thread bezet.
+RIBCL_TIMEOUT = 15
+
+# Fouten waarna een client niet meer betrouwbaar is
+_STALE_ERRORS = (hpilo.IloCommunicationError, hpilo.IloLoginFailed, OSError)
+
+
+class IloConnectionManager:
+    """Hergebruik hpilo.Ilo clients voor één iLO host.
+
+    python-hpilo opent per RIBCL document een eigen TLS socket, maar een
+    verse ``hpilo.Ilo`` moet eerst het protocol detecteren (een extra
+    round trip) en een nieuwe SSL context opbouwen. Een warme client slaat
+    beide over. Clients worden exclusief uitgeleend, zodat delayed mode en
+    de interne state nooit tussen threads gedeeld worden.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        pool_size: int = POOL_SIZE,
+        max_idle: float = MAX_IDLE,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self._username = username
+        self._password = password
+        self._pool_size = pool_size
+        self._max_idle = max_idle
+        self._idle: deque[tuple[hpilo.Ilo, float]] = deque()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+        # Per host, dus gedeeld door alles wat deze iLO aanspreekt
+        self.breaker = IloCircuitBreaker()
+        # Power acties naar deze host gaan één voor één
+        self.actions = IloActionQueue()
+        # Aantal entries dat deze manager gebruikt
+        self.references = 0
+        # Verhoogd bij nieuwe credentials; oudere clients gaan niet terug de pool in
+        self._generation = 0
+
+    def _new_client(self) -> hpilo.Ilo:
+        client = hpilo.Ilo(
+            hostname=self.host,
+            login=self._username,
+            password=self._password,
+            port=self.port,
+            timeout=RIBCL_TIMEOUT,
+        )
+        _meter_responses(client)
+        return client
+
+    def _checkout(self) -> tuple[hpilo.Ilo, int]:
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation
+            while self._idle:
+                ilo, last_used = self._idle.pop()
+                if now - last_used <= self._max_idle:
+                    self.hits += 1
+                    return ilo, generation
+                self.discarded += 1
+            self.misses += 1
+        return self._new_client(), generation
+
+    def _checkin(self, ilo: hpilo.Ilo, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                # Uitgeleend met de vorige credentials
+                self.discarded += 1
+            elif len(self._idle) < self._pool_size:
+                self._idle.append((ilo, time.monotonic()))
+
+    def set_password(self, password: str) -> bool:
+        """Nieuwe credentials (entry herladen na een wachtwoord wijziging).
+
+        Warme clients loggen in met het oude wachtwoord: die worden
+        weggegooid, ook de clients die nu uitgeleend zijn. Breaker en
+        actie wachtrij blijven, die horen bij de host.
+        """
+        with self._lock:
+            if password == self._password:
+                return False
+            self._password = password
+            self._generation += 1
+            self.discarded += len(self._idle)
+            self._idle.clear()
+        return True
+
+    @contextmanager
+    def client(self) -> Iterator[hpilo.Ilo]:
+        """Leen een client uit; blocking, dus alleen vanuit de executor gebruiken."""
+        ilo, generation = self._checkout()
+        try:
+            yield ilo
+        except _STALE_ERRORS:
+            # Niet teruggeven: de volgende call bouwt een nieuwe verbinding op
+            with self._lock:
+                self.discarded += 1
+            raise
+        except Exception:
+            self._checkin(ilo, generation)
+            raise
+        self._checkin(ilo, generation)
+
+    def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Voer één hpilo methode uit op een uitgeleende client (blocking)."""
+        with self.client() as ilo:
+            return getattr(ilo, method)(*args, **kwargs)
+
+    def clear(self) -> None:
+        """Gooi alle warme clients weg."""
+        with self._lock:
+            self._idle.clear()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Pool hit/miss tellers."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "discarded": self.discarded,
+                "idle": len(self._idle),
+            }
+
+
+def _connection_key(entry: ConfigEntry) -> tuple[str, int, str]:
+    return (
+        entry.data[CONF_HOST],
+        entry.data.get(CONF_PORT, DEFAULT_PORT),
+        entry.data[CONF_USERNAME],
+    )
+
+
+def _meter_responses(client: hpilo.Ilo) -> None:
+    """Tel de ontvangen bytes in ``client.bytes_received``.
+
+    python-hpilo meldt de grootte van elk antwoord alleen via zijn debug
+    hook ("Received N bytes"), die ook zonder debug output aangeroepen wordt.
+    """
+    if (debug := getattr(client, "_debug", None)) is None:
+        return
+
+    def _debug(level: int, message: Any) -> None:
+        if isinstance(message, str) and message.startswith("Received "):
+            client.bytes_received += int(message.split()[1])
+        debug(level, message)
+
+    client.bytes_received = 0
+    client._debug = _debug
+
+
+def async_get_connection_manager(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> IloConnectionManager:
+    """Geef de gedeelde connection manager voor de host van deze entry."""
+    managers: dict[tuple[str, int, str], IloConnectionManager] = hass.data.setdefault(
+        DATA_CONNECTIONS, {}
+    )
+    key = _connection_key(entry)
+    if (manager := managers.get(key)) is None:
+        manager = managers[key] = IloConnectionManager(
+            host=entry.data[CONF_HOST],
+            port=entry.data.get(CONF_PORT, DEFAULT_PORT),
+            username=entry.data[CONF_USERNAME],
+            password=entry.data[CONF_PASSWORD],
+        )
+    elif manager.set_password(entry.data[CONF_PASSWORD]):
+        _LOGGER.debug("Credentials for %s changed, dropping pooled clients", manager.host)
+    manager.references += 1
+    return manager
+
+
+def async_release_connection_manager(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Geef de manager terug; de laatste entry van de host ruimt hem op.
+
+    Twee entries kunnen dezelfde sleutel delen (een reload die overlapt,
+    of dezelfde iLO opnieuw toegevoegd): de eerste die ontlaadt mag de
+    pool, breaker en actie queue van de andere niet sluiten.
+    """
+    managers: dict[tuple[str, int, str], IloConnectionManager] = hass.data.get(
+        DATA_CONNECTIONS, {}
+    )
+    key = _connection_key(entry)
+    if (manager := managers.get(key)) is None:
+        return
+    manager.references -= 1
+    if manager.references > 0:
+        return
+    del managers[key]
+    _LOGGER.debug("Closing iLO connection pool for %s: %s", manager.host, manager.stats)
+    manager.clear()
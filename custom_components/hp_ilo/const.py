@@ -1,2 +1,56 @@
 DOMAIN = "hp_ilo"
 DEFAULT_PORT = 443
+
+# hass.data sleutel voor de gedeelde iLO connection pools (per host)
+DATA_CONNECTIONS = f"{DOMAIN}_connections"
+# hass.data sleutel voor de domein-brede poll scheduler
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+# hass.data sleutel voor de per-host sessie gates
+DATA_SESSION_GATES = f"{DOMAIN}_session_gates"
+
+# Transport voor polling en acties
+CONF_PROTOCOL = "protocol"
+PROTOCOL_RIBCL = "ribcl"
+PROTOCOL_REDFISH = "redfish"
+# Kies per iLO op basis van de geprobede capabilities (zie CONF_CAPABILITIES)
+PROTOCOL_AUTO = "auto"
+# Entries van voor de protocol keuze spreken RIBCL
+DEFAULT_PROTOCOL = PROTOCOL_RIBCL
+# Entry data: resultaat van de capability probe (generatie, firmware, Redfish)
+CONF_CAPABILITIES = "capabilities"
+
+# Polling tiers: elke tier heeft een eigen interval (seconden) in de options
+TIER_POWER = "power"
+TIER_THERMAL = "thermal"
+TIER_INVENTORY = "inventory"
+CONF_POWER_INTERVAL = "power_interval"
+CONF_THERMAL_INTERVAL = "thermal_interval"
+CONF_INVENTORY_INTERVAL = "inventory_interval"
+TIER_INTERVAL_OPTIONS = {
+    TIER_POWER: CONF_POWER_INTERVAL,
+    TIER_THERMAL: CONF_THERMAL_INTERVAL,
+    TIER_INVENTORY: CONF_INVENTORY_INTERVAL,
+}
+DEFAULT_TIER_INTERVALS = {
+    TIER_POWER: 10,
+    TIER_THERMAL: 60,
+    TIER_INVENTORY: 3600,
+}
+
+# Push updates via de Redfish event stream (alleen met protocol redfish).
+# Met push aan wordt de power tier alleen nog als trage sweep gepolld.
+CONF_PUSH_UPDATES = "push_updates"
+DEFAULT_PUSH_UPDATES = False
+PUSH_SWEEP_INTERVAL = 300
+
+# Deadbands: een sensor wordt pas bijgewerkt als de waarde meer dan dit
+# verschilt van de laatst geschreven state (0 = elke wijziging).
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+CONF_FAN_DEADBAND = "fan_deadband"
+DEFAULT_TEMPERATURE_DEADBAND = 0.0
+DEFAULT_FAN_DEADBAND = 0.0
+
+# Na een power actie wordt de power tier elke paar seconden gepolld tot de
+# verwachte status bereikt is of de timeout verstrijkt (seconden).
+CONVERGE_INTERVAL = 2
+CONVERGE_TIMEOUT = 180
@@ -0,0 +1,597 @@
+"""Data update coordinator for HP iLO."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+from functools import partial
+import logging
+import random
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_NAME
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .actions import ACTION_POWER_STATE, RESTART_ACTIONS, IloPowerConvergence
+from .api import IloRedfishClient
+from .breaker import IloCircuitBreaker
+from .connection import IloConnectionManager
+from .gate import (
+    PRIORITY_ACTION,
+    PRIORITY_POLL,
+    IloPollMerged,
+    async_get_session_gate,
+)
+from .const import (
+    CONF_CAPABILITIES,
+    CONF_FAN_DEADBAND,
+    CONF_PUSH_UPDATES,
+    CONF_TEMPERATURE_DEADBAND,
+    CONVERGE_INTERVAL,
+    CONVERGE_TIMEOUT,
+    DEFAULT_FAN_DEADBAND,
+    DEFAULT_PUSH_UPDATES,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    DEFAULT_TIER_INTERVALS,
+    DOMAIN,
+    PROTOCOL_REDFISH,
+    PUSH_SWEEP_INTERVAL,
+    TIER_INTERVAL_OPTIONS,
+    TIER_INVENTORY,
+    TIER_POWER,
+    TIER_THERMAL,
+)
+from .models import (
+    FANS,
+    TEMPERATURE,
+    IloEnergyMeter,
+    IloInventory,
+    IloSnapshot,
+    SensorSlots,
+    normalize,
+)
+from .rolling import IloRollingMetrics
+from .scheduler import IloFleetScheduler
+from .stats import IloPollStats
+from .transport import IloTransport, create_transport, resolve_protocol
+
+_LOGGER = logging.getLogger(__name__)
+
+# Snapshot velden per tier, voor het detecteren van veranderingen
+TIER_KEYS: dict[str, tuple[str, ...]] = {
+    TIER_POWER: ("power_status", "power_usage"),
+    TIER_THERMAL: ("temperature", "fans", "health_summary"),
+    TIER_INVENTORY: ("power_on_time",),
+}
+
+# Adaptief pollen: een tier die verandert gaat tot 2x sneller, een stabiele
+# tier tot 2x trager dan het ingestelde interval.
+MIN_FACTOR = 0.5
+MAX_FACTOR = 2.0
+SPEEDUP = 0.5
+SLOWDOWN = 1.25
+# Elke poll valt tot 10% eerder, zodat entries niet synchroon gaan lopen
+JITTER = 0.1
+# Nooit vaker dan dit tikken, ook niet na een handmatige refresh
+MIN_TICK = 1.0
+# Energie: een gat langer dan dit aantal (maximaal vertraagde) power
+# intervallen wordt niet geïntegreerd
+ENERGY_MAX_GAP_INTERVALS = 3
+
+# Laatste snapshot en sensor inventory in HA storage, voor een snelle start
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+# Model/serienummer opnieuw ophalen na een week, of eerder bij nieuwe firmware
+INVENTORY_TTL = 7 * 24 * 3600
+
+
+def snapshot_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """HA storage met de laatste snapshot en inventory van een entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+
+
+class IloDataUpdateCoordinator(DataUpdateCoordinator[IloSnapshot]):
+    """Eén centrale poll per iLO, gedeeld door alle platformen en services."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        connection: IloConnectionManager,
+        scheduler: IloFleetScheduler,
+    ) -> None:
+        # Met protocol "auto" volgt dit uit de gecachete capabilities
+        self.protocol = resolve_protocol(entry.data, entry.options)
+        self.push_updates = self.protocol == PROTOCOL_REDFISH and entry.options.get(
+            CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES
+        )
+        self.tier_intervals: dict[str, float] = {
+            tier: float(entry.options.get(option, DEFAULT_TIER_INTERVALS[tier]))
+            for tier, option in TIER_INTERVAL_OPTIONS.items()
+        }
+        if self.push_updates:
+            # Power state komt via de event stream; pollen is alleen nog een
+            # consistentie-sweep (power draw volgt dan ook dit interval).
+            self.tier_intervals[TIER_POWER] = max(
+                self.tier_intervals[TIER_POWER], PUSH_SWEEP_INTERVAL
+            )
+        # Geen eigen timer: de fleet scheduler start de refresh zodra
+        # next_due verstreken is. Per tick gaan alleen de tiers mee die aan
+        # de beurt zijn.
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_{entry.data[CONF_HOST]}",
+            update_interval=None,
+        )
+        self.entry = entry
+        self.scheduler = scheduler
+        # Fase (0, 1] van de eerste poll binnen het interval, gezet door de scheduler
+        self.phase = 1.0
+        self.next_due: float | None = None
+        self._tier_due: dict[str, float] = dict.fromkeys(self.tier_intervals, 0.0)
+        self._tier_factor: dict[str, float] = dict.fromkeys(self.tier_intervals, 1.0)
+        self.connection = connection
+        self.breaker: IloCircuitBreaker = connection.breaker
+        # Gedeeld met de config flow en andere entries op dezelfde iLO
+        self.gate = async_get_session_gate(hass, entry.data[CONF_HOST])
+        self.deadbands: dict[str, float] = {
+            "temperature": float(
+                entry.options.get(CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND)
+            ),
+            "fans": float(entry.options.get(CONF_FAN_DEADBAND, DEFAULT_FAN_DEADBAND)),
+        }
+        # Label -> kolom index van temperaturen en fans, stabiel over polls
+        self.slots = SensorSlots()
+        self._store = snapshot_store(hass, entry.entry_id)
+        self._polled = False
+        self.inventory: IloInventory | None = None
+        self.energy = IloEnergyMeter()
+        self.rolling = IloRollingMetrics()
+        self.stats = IloPollStats()
+        self._inventory_requested = False
+        # Laatst aan de listener doorgegeven waarde per entity context
+        self._notified: dict[tuple[str, Any], Any] = {}
+        self._notified_success: bool | None = None
+        # Lopende bevestiging van een power actie
+        self._converge: IloPowerConvergence | None = None
+        self.transport: IloTransport = create_transport(
+            hass, entry.data, self.protocol, connection=connection, stats=self.stats
+        )
+        # Event stream en power historie bestaan alleen via Redfish
+        self.redfish: IloRedfishClient | None = self.transport.redfish
+
+    def _due_tiers(self, now: float) -> set[str]:
+        """Tiers waarvan het interval verstreken is (kleine marge tegen drift)."""
+        return {tier for tier, due in self._tier_due.items() if now >= due - MIN_TICK / 2}
+
+    def _schedule_tier(self, tier: str, now: float, first: bool) -> None:
+        """Plan de volgende poll van een tier, gejitterd."""
+        interval = self.tier_intervals[tier]
+        if tier == TIER_POWER and self._converge is not None:
+            # Na een power actie: snel pollen tot de status bevestigd is
+            self._tier_due[tier] = now + min(interval, CONVERGE_INTERVAL)
+        elif first:
+            # Startfase over het hele interval spreiden, zodat niet alle
+            # iLO's na een herstart op dezelfde seconde gepolld worden.
+            self._tier_due[tier] = now + interval * self.phase
+        else:
+            delay = interval * self._tier_factor[tier]
+            self._tier_due[tier] = now + delay * (1 - JITTER * random.random())
+
+    def _adapt(self, tier: str, new_data: IloSnapshot) -> None:
+        """Versnel een tier als de waarden bewegen, vertraag als ze stabiel zijn."""
+        changed = any(
+            getattr(self.data, key) != getattr(new_data, key) for key in TIER_KEYS[tier]
+        )
+        factor = self._tier_factor[tier] * (SPEEDUP if changed else SLOWDOWN)
+        self._tier_factor[tier] = min(MAX_FACTOR, max(MIN_FACTOR, factor))
+
+    def _set_next_tick(self, delay: float) -> None:
+        self.next_due = time.monotonic() + max(MIN_TICK, delay)
+        self.scheduler.async_reschedule()
+
+    def context_value(self, context: tuple[str, int | None]) -> Any:
+        """De waarde die een entity met deze context (veld, slot) toont."""
+        key, slot = context
+        value = getattr(self.data, key, None)
+        if slot is None or value is None:
+            return value
+        return value[slot] if slot < len(value) else None
+
+    def _changed(self, key: str, old: Any, new: Any) -> bool:
+        deadband = self.deadbands.get(key)
+        if deadband and isinstance(old, (int, float)) and isinstance(new, (int, float)):
+            return abs(new - old) > deadband
+        return old != new
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> CALLBACK_TYPE:
+        """Registreer een listener; de entity schrijft nu zelf zijn huidige state."""
+        remove = super().async_add_listener(update_callback, context)
+        if context is None:
+            return remove
+        self._notified[context] = self.context_value(context)
+
+        @callback
+        def remove_listener() -> None:
+            remove()
+            # Laatste listener van deze context weg: ook de laatst gemelde waarde
+            if all(other != context for _, other in self._listeners.values()):
+                self._notified.pop(context, None)
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Roep alleen de entities aan waarvan de waarde gewijzigd is.
+
+        Entities zonder context, en alle entities na een wisseling van
+        beschikbaarheid, krijgen altijd een update.
+        """
+        notify_all = self._notified_success != self.last_update_success
+        self._notified_success = self.last_update_success
+        for update_callback, context in list(self._listeners.values()):
+            if context is not None:
+                value = self.context_value(context)
+                if (
+                    not notify_all
+                    and context in self._notified
+                    and not self._changed(context[0], self._notified[context], value)
+                ):
+                    continue
+                self._notified[context] = value
+            update_callback()
+        self._async_check_converged()
+
+    @callback
+    def _async_start_converge(self, action: str, timeout: float) -> None:
+        """Poll de power tier meteen en daarna snel, tot de actie bevestigd is."""
+        expected = ACTION_POWER_STATE[action]
+        deadline = time.monotonic() + timeout
+        if self._converge is not None and self._converge.expected == expected:
+            # Zelfde doelstatus: de wachtenden van de vorige actie wachten mee
+            self._converge.deadline = max(self._converge.deadline, deadline)
+        else:
+            # Een andere doelstatus: de vorige bevestiging komt niet meer
+            self._async_finish_converge(False)
+            self._converge = IloPowerConvergence(expected, deadline)
+        self.async_mark_tiers_due(TIER_POWER)
+        self._set_next_tick(0)
+
+    @callback
+    def _async_check_converged(self) -> None:
+        if self._converge is None:
+            return
+        expected, deadline = self._converge.expected, self._converge.deadline
+        if self.data is not None and self.data.power_status == expected:
+            _LOGGER.debug("Power state of %s confirmed: %s", self.connection.host, expected)
+            self._async_finish_converge(True)
+        elif time.monotonic() >= deadline:
+            _LOGGER.warning(
+                "Power state of %s did not reach %s in time", self.connection.host, expected
+            )
+            self._async_finish_converge(False)
+
+    @callback
+    def _async_finish_converge(self, confirmed: bool) -> None:
+        if self._converge is None:
+            return
+        converge, self._converge = self._converge, None
+        converge.resolve(confirmed)
+        # Terug naar het normale interval
+        now = time.monotonic()
+        self._tier_due[TIER_POWER] = max(
+            self._tier_due[TIER_POWER],
+            now + self.tier_intervals[TIER_POWER] * self._tier_factor[TIER_POWER],
+        )
+        self._set_next_tick(min(self._tier_due.values()) - now)
+
+    async def async_wait_power_state(self, action: str) -> bool:
+        """Wacht tot de status na ``action`` bevestigd is; False bij een timeout.
+
+        Loopt er geen bevestiging voor die status (meer), dan beslist de
+        huidige snapshot.
+        """
+        expected = ACTION_POWER_STATE[action]
+        while True:
+            converge = self._converge
+            if converge is None or converge.expected != expected:
+                return self.data is not None and self.data.power_status == expected
+            waiter: asyncio.Future[bool] = self.hass.loop.create_future()
+            converge.waiters.append(waiter)
+            try:
+                async with asyncio.timeout(max(0.0, converge.deadline - time.monotonic())):
+                    return await waiter
+            except TimeoutError:
+                if converge is self._converge and time.monotonic() >= converge.deadline:
+                    # Geen poll meer na de deadline (bv. breaker open)
+                    self._async_finish_converge(False)
+                    return False
+            # Deadline verlengd door een actie met dezelfde doelstatus: verder wachten
+
+    async def async_restore(self) -> bool:
+        """Laad de laatst bekende snapshot en inventory uit HA storage.
+
+        Geeft True als er een bruikbare cache was; de entities kunnen dan
+        meteen aangemaakt worden en de eerste echte poll loopt op de achtergrond.
+        """
+        if not (stored := await self._store.async_load()):
+            return False
+        try:
+            slots = SensorSlots.from_dict(stored["slots"])
+            snapshot = IloSnapshot.from_dict(stored["snapshot"])
+            if inventory := stored.get("inventory"):
+                self.inventory = IloInventory.from_dict(inventory)
+            if energy := stored.get("energy"):
+                self.energy = IloEnergyMeter.from_dict(energy)
+        except (KeyError, TypeError) as err:
+            _LOGGER.debug("Ignoring cached snapshot of %s: %s", self.connection.host, err)
+            return False
+        self.slots = slots
+        self.data = snapshot
+        self._set_next_tick(0)
+        return True
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        return {
+            "slots": self.slots.as_dict(),
+            "snapshot": self.data.as_dict(),
+            "inventory": self.inventory.as_dict() if self.inventory else None,
+            "energy": self.energy.as_dict(),
+        }
+
+    @property
+    def tier_factors(self) -> dict[str, float]:
+        """Huidige adaptieve factor op het interval van elke tier."""
+        return dict(self._tier_factor)
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """DeviceInfo voor alle entities, aangevuld uit de inventory cache."""
+        inventory = self.inventory or IloInventory()
+        return DeviceInfo(
+            identifiers={(DOMAIN, self.entry.unique_id or self.entry.entry_id)},
+            name=self.entry.data.get(CONF_NAME, "HP iLO"),
+            manufacturer="Hewlett Packard Enterprise",
+            model=inventory.model,
+            serial_number=inventory.serial_number,
+            sw_version=inventory.firmware_version,
+            hw_version=inventory.hw_version,
+            configuration_url=f"https://{self.entry.data[CONF_HOST]}",
+        )
+
+    def _inventory_due(self) -> bool:
+        return (
+            self._inventory_requested
+            or self.inventory is None
+            or dt_util.utcnow().timestamp() - self.inventory.fetched_at > INVENTORY_TTL
+        )
+
+    @callback
+    def _async_update_inventory(self, info: dict[str, Any]) -> None:
+        """Verwerk de inventory velden van een poll en werk het device bij."""
+        current = self.inventory
+        if "model" in info:
+            inventory = IloInventory(**info, fetched_at=dt_util.utcnow().timestamp())
+            self._inventory_requested = False
+        elif current and info.get("firmware_version") not in (None, current.firmware_version):
+            # Nieuwe firmware: de rest van de inventory bij de volgende tick verversen
+            _LOGGER.info(
+                "Firmware of %s changed to %s", self.connection.host, info["firmware_version"]
+            )
+            inventory = IloInventory(
+                **{**current.as_dict(), "firmware_version": info["firmware_version"]}
+            )
+            self.async_refresh_inventory()
+            self._async_forget_capabilities()
+        else:
+            return
+        self.inventory = inventory
+        if inventory != current:
+            device_registry = dr.async_get(self.hass)
+            device_info = self.device_info
+            if device := device_registry.async_get_device(
+                identifiers=device_info["identifiers"]
+            ):
+                device_registry.async_update_device(
+                    device.id,
+                    model=inventory.model,
+                    serial_number=inventory.serial_number,
+                    sw_version=inventory.firmware_version,
+                    hw_version=inventory.hw_version,
+                )
+
+    @callback
+    def _async_forget_capabilities(self) -> None:
+        """Nieuwe firmware kan een ander transport mogelijk maken: opnieuw proben.
+
+        Zonder gecachete capabilities probet de setup opnieuw; het
+        bijwerken van de entry herlaadt hem via de update listener.
+        """
+        if CONF_CAPABILITIES not in self.entry.data:
+            return
+        data = {key: value for key, value in self.entry.data.items() if key != CONF_CAPABILITIES}
+        self.hass.config_entries.async_update_entry(self.entry, data=data)
+
+    @callback
+    def async_refresh_inventory(self) -> None:
+        """Haal de inventory bij de volgende tick opnieuw op (service of firmware wissel)."""
+        self._inventory_requested = True
+        self.async_mark_tiers_due(TIER_INVENTORY)
+
+    def async_mark_tiers_due(self, *tiers: str) -> None:
+        """Laat de volgende refresh deze tiers meteen ophalen."""
+        for tier in tiers:
+            self._tier_due[tier] = 0.0
+
+    async def _async_update_data(self) -> IloSnapshot:
+        """Haal de tiers op die aan de beurt zijn en voeg ze samen met de vorige snapshot."""
+        now = time.monotonic()
+        tiers = self._due_tiers(now)
+        if not tiers:
+            self._set_next_tick(min(self._tier_due.values()) - now)
+            return self.data
+
+        while self.breaker.probing:
+            # Een andere entry van deze host probet al: op de uitkomst
+            # wachten in plaats van elke tick UpdateFailed te geven
+            await self.breaker.async_wait_probe()
+            now = time.monotonic()
+        if not self.breaker.allow_request(now):
+            # Breaker open: geen I/O, alleen wachten op de volgende probe
+            retry_in = self.breaker.retry_in(now)
+            self._set_next_tick(retry_in)
+            raise UpdateFailed(
+                f"iLO {self.connection.host} unreachable, next attempt in {retry_in:.0f}s"
+            )
+        # Deze poll is de probe van een half-open breaker
+        probe = self.breaker.probing
+
+        identity = TIER_INVENTORY in tiers and self._inventory_due()
+        try:
+            async with self.gate.async_session(
+                PRIORITY_POLL, self.entry.entry_id
+            ), self.scheduler.async_slot(self):
+                snapshot, inventory = await self._async_fetch(tiers, identity)
+        except IloPollMerged:
+            # Er loopt al een poll van deze entry; die levert de data en
+            # de tiers die nu aan de beurt waren gaan mee met de volgende.
+            if probe:
+                self.breaker.abort_probe(time.monotonic())
+            self._set_next_tick(MIN_TICK)
+            return self.data
+        except UpdateFailed:
+            retry_in = self.breaker.record_failure(time.monotonic())
+            _LOGGER.debug(
+                "Poll of %s failed (%s), retrying in %.0fs",
+                self.connection.host,
+                self.breaker.stats,
+                retry_in,
+            )
+            self._set_next_tick(retry_in)
+            raise
+        except BaseException:
+            # Bv. ontladen tijdens de probe: de andere entries niet laten wachten
+            if probe:
+                self.breaker.abort_probe(time.monotonic())
+            raise
+        self.breaker.record_success()
+        if TIER_POWER in tiers and snapshot.power_usage is not None:
+            snapshot = self._integrate_energy(snapshot)
+        snapshot = self._update_rolling(snapshot, tiers, now)
+
+        first = not self._polled
+        self._polled = True
+        for tier in tiers:
+            if not first:
+                self._adapt(tier, snapshot)
+            self._schedule_tier(tier, now, first)
+        # Na het plannen: een firmware wissel zet de inventory tier weer vooraan
+        self._async_update_inventory(inventory)
+        self._set_next_tick(min(self._tier_due.values()) - now)
+        self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+        return snapshot
+
+    def _integrate_energy(self, snapshot: IloSnapshot) -> IloSnapshot:
+        """Tel de nieuwe power reading op bij de energie meter."""
+        max_gap = (
+            ENERGY_MAX_GAP_INTERVALS * self.tier_intervals[TIER_POWER] * MAX_FACTOR
+        )
+        self.energy.add(
+            float(snapshot.power_usage), dt_util.utcnow().timestamp(), max_gap
+        )
+        # Op Wh afgerond: kleinere stapjes schrijven geen nieuwe state
+        return replace(snapshot, energy=round(self.energy.total, 3))
+
+    def _update_rolling(
+        self, snapshot: IloSnapshot, tiers: set[str], now: float
+    ) -> IloSnapshot:
+        """Voeg de opgehaalde metingen toe aan de rolling vensters."""
+        values: dict[str, Any] = {}
+        if TIER_POWER in tiers:
+            values.update(
+                self.rolling.update_power(
+                    now, snapshot.power_usage, self._min_spacing(TIER_POWER)
+                )
+            )
+        if TIER_THERMAL in tiers:
+            spacing = self._min_spacing(TIER_THERMAL)
+            for kind in (TEMPERATURE, FANS):
+                values[f"{kind}_rate"] = self.rolling.update_rates(
+                    kind, now, getattr(snapshot, kind), spacing
+                )
+        return replace(snapshot, **values) if values else snapshot
+
+    def _min_spacing(self, tier: str) -> float:
+        """Kortste afstand tussen twee polls van een tier; bepaalt de buffer grootte."""
+        spacing = self.tier_intervals[tier] * MIN_FACTOR * (1 - JITTER)
+        return min(spacing, CONVERGE_INTERVAL) if tier == TIER_POWER else spacing
+
+    def normalize_poll(self, raw: dict[str, Any]) -> IloSnapshot:
+        """Voeg een ruwe poll samen met de huidige snapshot.
+
+        Alleen op de event loop: leest ``data`` en wijst nieuwe sensors
+        een slot toe in ``slots``.
+        """
+        return normalize(raw, self.data, self.slots)
+
+    async def _async_fetch(
+        self, tiers: set[str], identity: bool
+    ) -> tuple[IloSnapshot, dict[str, Any]]:
+        self.stats.start_poll()
+        start = time.perf_counter()
+        try:
+            raw, inventory = await self.transport.async_fetch(tiers, identity)
+        except UpdateFailed as err:
+            self.stats.finish_poll(time.perf_counter() - start, err)
+            raise
+        self.stats.finish_poll(time.perf_counter() - start)
+        return self.normalize_poll(raw), inventory
+
+    async def async_power_action(
+        self, action: str, timeout: float = CONVERGE_TIMEOUT
+    ) -> bool:
+        """Voer een power actie uit over het ingestelde transport.
+
+        Acties gaan via de wachtrij van de host: dubbele acties worden
+        samengevoegd (geeft False) en tegenstrijdige geweigerd
+        (``IloActionRejected``).
+        Daarna wordt de power tier snel gepolld tot de verwachte status
+        bereikt is of ``timeout`` seconden verstreken zijn; zie
+        :meth:`async_wait_power_state`. Ook een samengevoegde actie doet
+        mee, zodat wie erop wacht een echte bevestiging krijgt. Een
+        herstart (``RESTART_ACTIONS``) heeft geen status om te bevestigen:
+        alleen de power tier wordt meteen gepolld.
+        """
+        sent = await self.connection.actions.async_submit(
+            action, partial(self._async_send_power_action, action)
+        )
+        if action in RESTART_ACTIONS:
+            self.async_mark_tiers_due(TIER_POWER)
+            self._set_next_tick(0)
+        else:
+            self._async_start_converge(action, timeout)
+        return sent
+
+    async def _async_send_power_action(self, action: str) -> None:
+        # Acties gaan in de gate voor wachtende polls
+        async with self.gate.async_session(PRIORITY_ACTION), self.scheduler.async_slot(
+            self
+        ):
+            await self.transport.async_power_action(action)
+
+    async def async_shutdown(self) -> None:
+        """Sluit de sessie van het transport bij het ontladen van de entry."""
+        await super().async_shutdown()
+        self._async_finish_converge(False)
+        await self.transport.async_close()
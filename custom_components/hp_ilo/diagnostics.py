@@ -0,0 +1,46 @@
+"""Diagnostics support for HP iLO."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import IloDataUpdateCoordinator
+
+# Credentials en het serienummer gaan nooit mee in een gedeelde dump
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME, "serial_number"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Entry, laatste snapshot en de poll instrumentatie."""
+    coordinator: IloDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "transport": coordinator.protocol,
+        "snapshot": coordinator.data.as_dict() if coordinator.data else None,
+        "inventory": async_redact_data(coordinator.inventory.as_dict(), TO_REDACT)
+        if coordinator.inventory
+        else None,
+        "tiers": {
+            "intervals": coordinator.tier_intervals,
+            "factors": coordinator.tier_factors,
+        },
+        "energy": coordinator.energy.as_dict(),
+        "rolling": coordinator.rolling.stats,
+        "stats": coordinator.stats.as_dict(),
+        "breaker": coordinator.breaker.stats,
+        "pool": coordinator.connection.stats,
+        "actions": coordinator.connection.actions.stats,
+        "gate": coordinator.gate.stats,
+        "redfish": coordinator.redfish.totals if coordinator.redfish else None,
+        "scheduler": coordinator.scheduler.stats,
+        "history": history.stats
+        if (history := hass.data[DOMAIN][entry.entry_id].get("history"))
+        else None,
+    }
@@ -0,0 +1,153 @@
+"""Subnet scan naar iLO's, voor routed netwerken zonder SSDP."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict, dataclass
+from ipaddress import IPv4Network, IPv6Network
+import logging
+from typing import Any
+from xml.etree import ElementTree
+
+import aiohttp
+
+from .api import REDFISH_ROOT
+from .const import DEFAULT_PORT, PROTOCOL_REDFISH, PROTOCOL_RIBCL
+
+_LOGGER = logging.getLogger(__name__)
+
+XMLDATA_PATH = "/xmldata?item=all"
+# Per host: een dode host kost hoogstens één timeout
+SCAN_TIMEOUT = 2.0
+SCAN_CONCURRENCY = 64
+# Grootste subnet dat de config flow wil scannen (een /22)
+MAX_SCAN_HOSTS = 1024
+
+
+@dataclass(slots=True, frozen=True)
+class IloScanResult:
+    """Een gevonden iLO, met wat hij zonder login over zichzelf vertelt."""
+
+    host: str
+    port: int
+    protocol: str
+    model: str | None = None
+    manager: str | None = None
+    firmware: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """JSON-vriendelijke vorm, voor de flow context."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> IloScanResult:
+        """Terug uit :meth:`as_dict`."""
+        return cls(**data)
+
+    @property
+    def label(self) -> str:
+        """Korte omschrijving voor de selectielijst."""
+        details = ", ".join(
+            part for part in (self.manager, self.firmware and f"v{self.firmware}") if part
+        )
+        label = f"{self.host} — {self.model or 'HP iLO'}"
+        return f"{label} ({details})" if details else label
+
+
+def scan_hosts(network: IPv4Network | IPv6Network) -> list[str]:
+    """De adressen van een subnet; een /32 (of /31) is zelf de host."""
+    return [str(address) for address in network.hosts()] or [
+        str(network.network_address)
+    ]
+
+
+def _redfish_fingerprint(
+    host: str, port: int, root: dict[str, Any]
+) -> IloScanResult | None:
+    """Alleen een service root met een HP(E) manager is een iLO."""
+    oem = root.get("Oem") or {}
+    managers = (oem.get("Hpe") or oem.get("Hp") or {}).get("Manager") or []
+    if not managers:
+        return None
+    manager = managers[0]
+    return IloScanResult(
+        host=host,
+        port=port,
+        protocol=PROTOCOL_REDFISH,
+        model=root.get("Product"),
+        manager=manager.get("ManagerType"),
+        firmware=manager.get("ManagerFirmwareVersion"),
+    )
+
+
+def _xmldata_fingerprint(host: str, port: int, text: str) -> IloScanResult | None:
+    """iLO 2 en 3 kennen geen Redfish, maar wel het RIMP document."""
+    try:
+        rimp = ElementTree.fromstring(text)
+    except ElementTree.ParseError:
+        return None
+    if rimp.tag != "RIMP":
+        return None
+    manager = rimp.findtext("MP/PN")
+    if manager and "(" in manager:
+        # "Integrated Lights-Out 3 (iLO 3)" -> "iLO 3"
+        manager = manager.rpartition("(")[2].rstrip(")")
+    return IloScanResult(
+        host=host,
+        port=port,
+        protocol=PROTOCOL_RIBCL,
+        model=rimp.findtext("HSI/SPN"),
+        manager=manager,
+        firmware=rimp.findtext("MP/FWRI"),
+    )
+
+
+async def async_probe_host(
+    session: aiohttp.ClientSession,
+    host: str,
+    port: int = DEFAULT_PORT,
+    timeout: float = SCAN_TIMEOUT,
+) -> IloScanResult | None:
+    """Herken een iLO aan zijn Redfish root, anders aan ``/xmldata``."""
+    base_url = f"https://{host}:{port}"
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    try:
+        async with session.get(f"{base_url}{REDFISH_ROOT}", timeout=client_timeout) as response:
+            if response.status == 200:
+                root = await response.json(content_type=None)
+                if isinstance(root, dict) and (
+                    result := _redfish_fingerprint(host, port, root)
+                ):
+                    return result
+        async with session.get(f"{base_url}{XMLDATA_PATH}", timeout=client_timeout) as response:
+            if response.status == 200:
+                return _xmldata_fingerprint(host, port, await response.text())
+    except (aiohttp.ClientError, TimeoutError, ValueError) as err:
+        _LOGGER.debug("No iLO at %s: %s", base_url, err)
+    return None
+
+
+async def async_scan_subnet(
+    session: aiohttp.ClientSession,
+    network: IPv4Network | IPv6Network,
+    port: int = DEFAULT_PORT,
+    *,
+    timeout: float = SCAN_TIMEOUT,
+    concurrency: int = SCAN_CONCURRENCY,
+) -> list[IloScanResult]:
+    """Probe alle hosts van een subnet, hoogstens ``concurrency`` tegelijk.
+
+    Een gesloten poort faalt meteen; alleen hosts die niet antwoorden
+    kosten een volle ``timeout``. Een /24 duurt zo hoogstens
+    ``ceil(254 / concurrency) * timeout`` seconden. De resultaten staan
+    op volgorde van adres.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(host: str) -> IloScanResult | None:
+        async with semaphore:
+            return await async_probe_host(session, host, port, timeout)
+
+    results = await asyncio.gather(*(probe(host) for host in scan_hosts(network)))
+    found = [result for result in results if result is not None]
+    _LOGGER.debug("Scan of %s:%s found %d iLOs", network, port, len(found))
+    return found
@@ -0,0 +1,170 @@
+"""Push updates via de Redfish EventService (Server-Sent Events)."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import replace
+import json
+import logging
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .api import IloRedfishClient, IloRedfishError
+
+if TYPE_CHECKING:
+    from .coordinator import IloDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+RECONNECT_MIN = 5.0
+RECONNECT_MAX = 300.0
+
+# Delen van MessageId (HPE iLOEvents en de standaard ResourceEvent registry)
+POWER_ON_MESSAGES = ("ServerPoweredOn", "PowerOn")
+POWER_OFF_MESSAGES = ("ServerPoweredOff", "PowerOff")
+POWER_CHANGED_MESSAGE = "ResourcePowerStateChanged"
+HEALTH_MESSAGES = {
+    "ResourceStatusChangedOK": "OK",
+    "ResourceStatusChangedWarning": "Warning",
+    "ResourceStatusChangedCritical": "Critical",
+}
+# Alerts zonder status-event: de ernst van het bericht zelf
+SEVERITY_HEALTH = {"OK": "OK", "Warning": "Warning", "Critical": "Critical"}
+
+
+def parse_event(event: dict[str, Any]) -> dict[str, Any]:
+    """Vertaal één Redfish event naar snapshot keys die bijgewerkt moeten worden."""
+    message_id = event.get("MessageId")
+    if not isinstance(message_id, str):
+        message_id = ""
+    args = event.get("MessageArgs")
+    if not isinstance(args, list):
+        args = []
+    changes: dict[str, Any] = {}
+
+    if POWER_CHANGED_MESSAGE in message_id and args:
+        changes["power_status"] = str(args[-1]).upper()
+    elif any(part in message_id for part in POWER_ON_MESSAGES):
+        changes["power_status"] = "ON"
+    elif any(part in message_id for part in POWER_OFF_MESSAGES):
+        changes["power_status"] = "OFF"
+
+    for part, health in HEALTH_MESSAGES.items():
+        if part in message_id:
+            changes["health_summary"] = health
+            break
+    else:
+        severity = event.get("MessageSeverity") or event.get("Severity")
+        if event.get("EventType") == "Alert" and severity in SEVERITY_HEALTH:
+            changes["health_summary"] = SEVERITY_HEALTH[severity]
+    return changes
+
+
+async def iter_sse(stream: aiohttp.StreamReader) -> AsyncIterator[str]:
+    """Lever de data van elk SSE bericht (meerdere data-regels samengevoegd)."""
+    data: list[str] = []
+    async for raw in stream:
+        line = raw.decode("utf-8", "replace").rstrip("\r\n")
+        if not line:
+            if data:
+                yield "\n".join(data)
+                data = []
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip(" "))
+        # Commentaar (":" keepalives), id: en event: regels hebben we niet nodig
+
+
+class IloEventStream:
+    """Luister naar de iLO event stream en patch de coordinator snapshot.
+
+    Power- en health-events worden direct in de snapshot gezet, zodat de
+    bijbehorende entities binnen een seconde bijwerken. Polling blijft
+    bestaan als langzame consistentie-sweep.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: IloDataUpdateCoordinator,
+        client: IloRedfishClient,
+    ) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self.client = client
+        self.connected = False
+        self.events_received = 0
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def async_start(self, entry: ConfigEntry) -> None:
+        """Start de stream als achtergrondtaak van de entry."""
+        self._task = entry.async_create_background_task(
+            self.hass, self._async_run(), f"hp_ilo event stream {self.client.base_url}"
+        )
+
+    async def async_stop(self) -> None:
+        """Stop de stream."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _async_run(self) -> None:
+        delay = RECONNECT_MIN
+        while True:
+            try:
+                uri = await self.client.async_event_stream_uri()
+                if not uri:
+                    _LOGGER.warning(
+                        "%s does not offer a Redfish SSE stream, push updates disabled",
+                        self.client.base_url,
+                    )
+                    return
+                response = await self.client.async_open_event_stream(uri)
+                try:
+                    self.connected = True
+                    delay = RECONNECT_MIN
+                    _LOGGER.debug("Event stream connected to %s", self.client.base_url)
+                    async for message in iter_sse(response.content):
+                        self._handle_message(message)
+                finally:
+                    self.connected = False
+                    response.release()
+            except (IloRedfishError, aiohttp.ClientError, asyncio.TimeoutError) as err:
+                _LOGGER.debug("Event stream of %s lost: %s", self.client.base_url, err)
+            await asyncio.sleep(delay)
+            delay = min(RECONNECT_MAX, delay * 2)
+
+    @callback
+    def _handle_message(self, message: str) -> None:
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            _LOGGER.debug("Ignoring non-JSON event: %s", message)
+            return
+        # Een kapot bericht overslaan; een exception zou de stream task beëindigen
+        events = payload.get("Events", [payload]) if isinstance(payload, dict) else None
+        if not isinstance(events, list) or not all(
+            isinstance(event, dict) for event in events
+        ):
+            _LOGGER.debug("Ignoring malformed event: %s", message)
+            return
+        changes: dict[str, Any] = {}
+        for event in events:
+            changes.update(parse_event(event))
+        self.events_received += len(events)
+
+        data = self.coordinator.data
+        if not changes or data is None:
+            return
+        if all(getattr(data, key) == value for key, value in changes.items()):
+            return
+        _LOGGER.debug("Push update from %s: %s", self.client.base_url, changes)
+        self.coordinator.async_set_updated_data(replace(data, **changes))
@@ -0,0 +1,126 @@
+"""Per-host limiet op gelijktijdige iLO sessies, met prioriteit."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import heapq
+import itertools
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_SESSION_GATES
+from .stats import LatencyHistogram
+
+# iLO firmware staat maar een paar gelijktijdige sessies toe
+MAX_SESSIONS = 2
+
+# Lagere waarde gaat eerst
+PRIORITY_ACTION = 0
+PRIORITY_SETUP = 1
+PRIORITY_POLL = 2
+PRIORITY_NAMES = {PRIORITY_ACTION: "action", PRIORITY_SETUP: "setup", PRIORITY_POLL: "poll"}
+
+
+class IloPollMerged(Exception):
+    """Er staat al een poll van dezelfde eigenaar klaar of loopt er een."""
+
+
+class IloSessionGate:
+    """Laat hoogstens ``limit`` requests tegelijk naar één iLO.
+
+    Config flow, coordinator polls, buttons en services gaan allemaal
+    door dezelfde gate. Wachtenden komen op volgorde van prioriteit
+    (power acties voor polls), daarbinnen op volgorde van aankomst. Een
+    tweede poll van dezelfde eigenaar terwijl er al een wacht of loopt
+    wordt niet in de rij gezet maar geweigerd met :class:`IloPollMerged`;
+    de lopende poll levert de data. Alleen bedoeld voor gebruik vanaf de
+    event loop.
+    """
+
+    def __init__(self, host: str, limit: int = MAX_SESSIONS) -> None:
+        self.host = host
+        self.limit = limit
+        self.active = 0
+        self.merged = 0
+        self.wait = {name: LatencyHistogram() for name in PRIORITY_NAMES.values()}
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+        self._polls: set[str] = set()
+
+    @asynccontextmanager
+    async def async_session(
+        self, priority: int, owner: str | None = None
+    ) -> AsyncIterator[None]:
+        """Wacht op een vrije sessie; ``owner`` voegt polls samen."""
+        poll = priority == PRIORITY_POLL and owner is not None
+        if poll:
+            if owner in self._polls:
+                self.merged += 1
+                raise IloPollMerged(owner)
+            self._polls.add(owner)
+        try:
+            start = time.monotonic()
+            await self._async_acquire(priority)
+            self.wait[PRIORITY_NAMES[priority]].observe(time.monotonic() - start)
+            try:
+                yield
+            finally:
+                self._release()
+        finally:
+            if poll:
+                self._polls.discard(owner)
+
+    async def _async_acquire(self, priority: int) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Al toegewezen maar nooit gebruikt: meteen weer vrijgeven.
+            # Een geannuleerde wachtende slaat _wake() gewoon over.
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self.active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.active < self.limit:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.done():
+                continue
+            self.active += 1
+            waiter.set_result(None)
+
+    @property
+    def queued(self) -> int:
+        """Aantal wachtenden."""
+        return sum(not waiter.done() for _, _, waiter in self._waiters)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Bezetting en wachttijd per prioriteit, voor diagnostics."""
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.queued,
+            "merged_polls": self.merged,
+            "wait": {name: histogram.as_dict() for name, histogram in self.wait.items()},
+        }
+
+
+@callback
+def async_get_session_gate(hass: HomeAssistant, host: str) -> IloSessionGate:
+    """Geef de gate van een iLO host; gedeeld door alle entries en flows."""
+    gates: dict[str, IloSessionGate] = hass.data.setdefault(DATA_SESSION_GATES, {})
+    if (gate := gates.get(host)) is None:
+        gate = gates[host] = IloSessionGate(host)
+    return gate
@@ -0,0 +1,206 @@
+"""Power historie van de iLO als lange-termijn statistieken."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+from statistics import fmean, median
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfEnergy, UnitOfPower
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util, slugify
+
+from .api import IloRedfishClient, IloRedfishError, IloRedfishNotFoundError
+from .const import DOMAIN
+from .coordinator import IloDataUpdateCoordinator
+from .gate import PRIORITY_POLL, IloPollMerged
+
+_LOGGER = logging.getLogger(__name__)
+
+# De iLO bewaart 24 uur; elk uur ophalen laat dus ruim marge voor uitval
+HISTORY_INTERVAL = timedelta(hours=1)
+DEFAULT_SAMPLE_STEP = timedelta(minutes=5)
+HOUR = timedelta(hours=1)
+
+
+def _sample_step(samples: list[dict[str, Any]]) -> timedelta:
+    """Lengte van één sample: de gebruikelijke afstand tussen twee samples."""
+    gaps = [
+        later["time"] - earlier["time"]
+        for earlier, later in zip(samples, samples[1:])
+        if later["time"] > earlier["time"]
+    ]
+    return median(gaps) if gaps else DEFAULT_SAMPLE_STEP
+
+
+def hourly_statistics(
+    samples: list[dict[str, Any]], after: datetime | None, total: float
+) -> tuple[list[StatisticData], list[StatisticData], float]:
+    """Vat de samples samen per afgerond uur na ``after``.
+
+    Geeft de power statistieken (gemiddelde, minimum, piek in W), de
+    energie statistieken (kWh, doorlopende som vanaf ``total``) en de
+    nieuwe som. Een uur telt pas als het laatste sample op of na het
+    einde van dat uur ligt; ontbrekende samples tellen niet mee.
+    """
+    if not samples:
+        return [], [], total
+    step = _sample_step(samples)
+    hours: dict[datetime, list[dict[str, Any]]] = {}
+    for sample in samples:
+        # Het sample beschrijft de ``step`` voor zijn tijdstip
+        start = dt_util.as_utc(sample["time"] - step)
+        hours.setdefault(start.replace(minute=0, second=0, microsecond=0), []).append(
+            sample
+        )
+    end = dt_util.as_utc(samples[-1]["time"])
+
+    power: list[StatisticData] = []
+    energy: list[StatisticData] = []
+    for hour in sorted(hours):
+        if (after is not None and hour <= after) or hour + HOUR > end:
+            continue
+        bucket = hours[hour]
+        averages = [sample["average"] for sample in bucket]
+        total += sum(averages) * step.total_seconds() / 3_600_000
+        power.append(
+            StatisticData(
+                start=hour,
+                mean=fmean(averages),
+                min=min(sample["minimum"] for sample in bucket),
+                max=max(sample["peak"] for sample in bucket),
+            )
+        )
+        energy.append(StatisticData(start=hour, state=total, sum=total))
+    return power, energy, total
+
+
+class IloPowerHistory:
+    """Importeer elk uur de power historie van één iLO in de recorder.
+
+    Eén request haalt de laatste 24 uur op (samples van 5 minuten); de
+    afgeronde uren die nog niet geïmporteerd zijn gaan in één batch per
+    statistiek naar de recorder. Zo komt ook het verbruik tijdens een
+    HA-uitval in de statistieken terecht.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: IloDataUpdateCoordinator,
+        client: IloRedfishClient,
+    ) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self.client = client
+        entry = coordinator.entry
+        slug = slugify(entry.entry_id)
+        self.power_metadata = StatisticMetaData(
+            has_mean=True,
+            mean_type=StatisticMeanType.ARITHMETIC,
+            has_sum=False,
+            name=f"{entry.title} Power (iLO history)",
+            source=DOMAIN,
+            statistic_id=f"{DOMAIN}:power_history_{slug}",
+            unit_of_measurement=UnitOfPower.WATT,
+        )
+        self.energy_metadata = StatisticMetaData(
+            has_mean=False,
+            mean_type=StatisticMeanType.NONE,
+            has_sum=True,
+            name=f"{entry.title} Energy (iLO history)",
+            source=DOMAIN,
+            statistic_id=f"{DOMAIN}:energy_history_{slug}",
+            unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        )
+        self.supported = True
+        self.imported = 0
+        # Laatst geïmporteerde uur en de som tot en met dat uur
+        self._last_hour: datetime | None = None
+        self._total = 0.0
+        self._loaded = False
+
+    @callback
+    def async_start(self, entry: ConfigEntry) -> None:
+        """Importeer meteen (inhalen na een herstart) en daarna elk uur."""
+        entry.async_on_unload(
+            async_track_time_interval(
+                self.hass, self._async_tick, HISTORY_INTERVAL, cancel_on_shutdown=True
+            )
+        )
+        entry.async_create_background_task(
+            self.hass, self.async_update(), f"hp_ilo power history {self.client.base_url}"
+        )
+
+    async def _async_tick(self, now: datetime) -> None:
+        await self.async_update()
+
+    async def _async_load_last(self) -> None:
+        """Ga verder waar de vorige import (ook van een vorige run) stopte."""
+        statistic_id = self.energy_metadata["statistic_id"]
+        last = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics, self.hass, 1, statistic_id, False, {"sum"}
+        )
+        if rows := last.get(statistic_id):
+            self._last_hour = dt_util.utc_from_timestamp(rows[0]["start"])
+            self._total = rows[0].get("sum") or 0.0
+        self._loaded = True
+
+    async def async_update(self) -> int:
+        """Haal de historie op en importeer de nieuwe uren; geeft het aantal uren."""
+        if not self.supported:
+            return 0
+        if not self._loaded:
+            await self._async_load_last()
+        coordinator = self.coordinator
+        try:
+            async with coordinator.gate.async_session(
+                PRIORITY_POLL, f"{coordinator.entry.entry_id}_history"
+            ), coordinator.scheduler.async_slot(coordinator):
+                samples = await self.client.async_get_power_history()
+        except IloPollMerged:
+            return 0
+        except IloRedfishNotFoundError:
+            _LOGGER.info(
+                "%s has no power meter history, not importing it", self.client.base_url
+            )
+            self.supported = False
+            return 0
+        except IloRedfishError as err:
+            _LOGGER.debug("Power history of %s failed: %s", self.client.base_url, err)
+            return 0
+
+        power, energy, total = hourly_statistics(samples, self._last_hour, self._total)
+        if not energy:
+            return 0
+        async_add_external_statistics(self.hass, self.power_metadata, power)
+        async_add_external_statistics(self.hass, self.energy_metadata, energy)
+        self._last_hour = energy[-1]["start"]
+        self._total = total
+        self.imported += len(energy)
+        _LOGGER.debug(
+            "Imported %d hours of power history from %s", len(energy), self.client.base_url
+        )
+        return len(energy)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Voortgang van de import, voor diagnostics."""
+        return {
+            "supported": self.supported,
+            "imported_hours": self.imported,
+            "last_hour": self._last_hour.isoformat() if self._last_hour else None,
+            "total": round(self._total, 3),
+        }
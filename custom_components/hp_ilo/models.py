@@ -0,0 +1,207 @@
+"""Genormaliseerd snapshot model voor de iLO data."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, replace
+from typing import Any
+
+from .const import PROTOCOL_REDFISH, PROTOCOL_RIBCL
+
+TEMPERATURE = "temperature"
+FANS = "fans"
+# Veld met de meetwaarde in de hpilo (en Redfish) dicts
+READING_FIELDS = {TEMPERATURE: "currentreading", FANS: "speed"}
+NOT_INSTALLED = "Not Installed"
+# Vanaf deze iLO generatie is Redfish goedkoper dan een RIBCL batch
+REDFISH_MIN_GENERATION = 5
+
+
+@dataclass(slots=True, frozen=True)
+class IloSnapshot:
+    """Eén poll, genormaliseerd.
+
+    Temperaturen en fans zijn kolommen (tuples) geïndexeerd op het slot
+    dat :class:`SensorSlots` per label uitdeelt; een entity leest zijn
+    waarde met één index. Een label dat in deze poll ontbreekt heeft
+    waarde ``None``.
+    """
+
+    power_status: str | None = None
+    power_usage: float | None = None
+    health_summary: str | None = None
+    power_on_time: int | None = None
+    # Cumulatief verbruik in kWh, bijgehouden door IloEnergyMeter
+    energy: float | None = None
+    # Gemiddelde en piek van power_usage over het rolling venster
+    power_average: float | None = None
+    power_peak: float | None = None
+    temperature: tuple[float | None, ...] = ()
+    temperature_status: tuple[str | None, ...] = ()
+    # Verandering per minuut over het rolling venster, per slot
+    temperature_rate: tuple[float | None, ...] = ()
+    fans: tuple[float | None, ...] = ()
+    fans_status: tuple[str | None, ...] = ()
+    fans_rate: tuple[float | None, ...] = ()
+
+    def as_dict(self) -> dict[str, Any]:
+        """JSON-vriendelijke vorm, voor HA storage en diagnostics."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> IloSnapshot:
+        """Terug uit :meth:`as_dict`; JSON lijsten worden weer tuples."""
+        return cls(
+            **{
+                key: tuple(value) if isinstance(value, list) else value
+                for key, value in data.items()
+            }
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class IloInventory:
+    """Statische gegevens van de server en de iLO.
+
+    Verandert alleen bij een firmware- of hardwarewissel en wordt daarom
+    apart van de metingen gecached (``fetched_at`` is wall-clock tijd).
+    """
+
+    model: str | None = None
+    serial_number: str | None = None
+    firmware_version: str | None = None
+    hw_version: str | None = None
+    fetched_at: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """JSON-vriendelijke vorm, voor HA storage en diagnostics."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> IloInventory:
+        """Terug uit :meth:`as_dict`."""
+        return cls(**data)
+
+
+@dataclass(slots=True, frozen=True)
+class IloCapabilities:
+    """Wat een iLO ondersteunt, één keer geprobed en in de config entry bewaard.
+
+    Met protocol ``auto`` kiest :attr:`protocol` het goedkoopste pad:
+    Redfish vanaf iLO 5, daaronder één RIBCL batch per poll (iLO 4 kent
+    wel Redfish, maar heeft daar een handvol trage GETs voor nodig).
+    Onbekend (probe mislukt) valt terug op RIBCL, dat elke iLO spreekt.
+    """
+
+    generation: int | None = None
+    firmware: str | None = None
+    redfish: bool = False
+
+    @property
+    def protocol(self) -> str:
+        """Het transport voor deze generatie en firmware."""
+        if self.redfish and (self.generation or 0) >= REDFISH_MIN_GENERATION:
+            return PROTOCOL_REDFISH
+        return PROTOCOL_RIBCL
+
+    def as_dict(self) -> dict[str, Any]:
+        """JSON-vriendelijke vorm, voor de config entry en diagnostics."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> IloCapabilities:
+        """Terug uit :meth:`as_dict`."""
+        return cls(**data)
+
+
+@dataclass(slots=True)
+class IloEnergyMeter:
+    """Cumulatieve energie uit opeenvolgende power readings.
+
+    Elke nieuwe reading voegt het trapezium tussen de vorige en de huidige
+    toe. Na een gat langer dan ``max_gap`` (mislukte polls, herstart) is
+    het verbruik daartussen onbekend: dat stuk wordt overgeslagen in
+    plaats van geschat. Tijden zijn wall-clock, zodat de meter via HA
+    storage een herstart overleeft.
+    """
+
+    total: float = 0.0
+    last_time: float | None = None
+    last_power: float | None = None
+    gaps: int = 0
+
+    def add(self, power: float, now: float, max_gap: float) -> None:
+        """Verwerk één reading (W) op tijdstip ``now`` (seconden)."""
+        if self.last_time is not None and self.last_power is not None:
+            elapsed = now - self.last_time
+            if 0 < elapsed <= max_gap:
+                self.total += (self.last_power + power) / 2 * elapsed / 3_600_000
+            elif elapsed > max_gap:
+                self.gaps += 1
+        self.last_time = now
+        self.last_power = power
+
+    def as_dict(self) -> dict[str, Any]:
+        """JSON-vriendelijke vorm, voor HA storage en diagnostics."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> IloEnergyMeter:
+        """Terug uit :meth:`as_dict`."""
+        return cls(**data)
+
+
+class SensorSlots:
+    """Vaste label -> slot toewijzing per sensor-groep.
+
+    Slots worden bij de eerste poll uitgedeeld en blijven daarna stabiel;
+    nieuwe labels krijgen het volgende vrije slot.
+    """
+
+    __slots__ = (TEMPERATURE, FANS)
+
+    def __init__(self) -> None:
+        self.temperature: dict[str, int] = {}
+        self.fans: dict[str, int] = {}
+
+    def as_dict(self) -> dict[str, dict[str, int]]:
+        """Label -> slot per groep, voor HA storage."""
+        return {TEMPERATURE: dict(self.temperature), FANS: dict(self.fans)}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, dict[str, int]]) -> SensorSlots:
+        """Terug uit :meth:`as_dict`."""
+        slots = cls()
+        slots.temperature = dict(data[TEMPERATURE])
+        slots.fans = dict(data[FANS])
+        return slots
+
+    def columns(
+        self, kind: str, sensors: dict[str, dict[str, Any]]
+    ) -> tuple[tuple[float | None, ...], tuple[str | None, ...]]:
+        """Zet de hpilo dicts van één groep om naar waarde- en statuskolom."""
+        slots: dict[str, int] = getattr(self, kind)
+        for label in sensors:
+            slots.setdefault(label, len(slots))
+        values: list[float | None] = [None] * len(slots)
+        statuses: list[str | None] = [None] * len(slots)
+        field = READING_FIELDS[kind]
+        for label, info in sensors.items():
+            slot = slots[label]
+            reading = info.get(field)
+            values[slot] = reading[0] if isinstance(reading, (list, tuple)) else reading
+            statuses[slot] = info.get("status")
+        return tuple(values), tuple(statuses)
+
+
+def normalize(
+    raw: dict[str, Any], previous: IloSnapshot | None, slots: SensorSlots
+) -> IloSnapshot:
+    """Voeg een (gedeeltelijke) poll samen met de vorige snapshot."""
+    values: dict[str, Any] = {
+        key: raw[key]
+        for key in ("power_status", "power_usage", "health_summary", "power_on_time")
+        if key in raw
+    }
+    for kind in (TEMPERATURE, FANS):
+        if kind in raw:
+            values[kind], values[f"{kind}_status"] = slots.columns(kind, raw[kind])
+    return replace(previous, **values) if previous else IloSnapshot(**values)
@@ -0,0 +1,221 @@
+"""Rolling vensters over de recente metingen, in geheugen."""
+from __future__ import annotations
+
+from array import array
+from collections import deque
+import math
+from typing import Any
+
+# Venster (seconden) van de afgeleide sensors
+ROLLING_WINDOW = 300.0
+
+
+def window_capacity(window: float, spacing: float) -> int:
+    """Aantal samples dat in ``window`` past bij polls om de ``spacing`` seconden."""
+    return math.ceil(window / max(spacing, 1.0)) + 1
+
+
+class RollingWindow:
+    """Ring buffer van (tijd, waarde) met lopende sommen.
+
+    Gemiddelde, tijdgewogen gemiddelde, maximum en helling (kleinste
+    kwadraten, per minuut) kosten O(1) per sample, hoe lang het venster
+    ook is: een nieuw sample wordt bij de sommen opgeteld en een verlopen
+    sample eraf getrokken. Het tijdgewogen gemiddelde integreert de
+    trapezia tussen opeenvolgende samples, net als de energie meter, zodat
+    een burst van snelle polls niet zwaarder telt dan het normale interval.
+    Het maximum komt uit een monotone deque. Zodat afrondingsfouten zich
+    niet opstapelen worden de sommen na elke ``capacity`` samples opnieuw
+    uitgerekend, relatief aan het oudste sample. Is de buffer vol voordat
+    het venster om is, dan valt het oudste sample eruit.
+    """
+
+    __slots__ = (
+        "window",
+        "capacity",
+        "count",
+        "_times",
+        "_values",
+        "_start",
+        "_origin",
+        "_sum_t",
+        "_sum_v",
+        "_sum_tt",
+        "_sum_tv",
+        "_area",
+        "_peaks",
+        "_pushes",
+    )
+
+    def __init__(self, window: float, capacity: int) -> None:
+        self.window = window
+        self.capacity = capacity
+        self.count = 0
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._origin = 0.0
+        self._sum_t = self._sum_v = self._sum_tt = self._sum_tv = 0.0
+        # Integraal (waarde x seconden) tussen het oudste en nieuwste sample
+        self._area = 0.0
+        # (tijd, waarde) met aflopende waarden; de eerste is het maximum
+        self._peaks: deque[tuple[float, float]] = deque()
+        self._pushes = 0
+
+    def push(self, now: float, value: float) -> None:
+        """Voeg een sample toe en laat verlopen samples vallen."""
+        if self.count and now <= self._times[(self._start + self.count - 1) % self.capacity]:
+            return
+        cutoff = now - self.window
+        while self.count and self._times[self._start] < cutoff:
+            self._drop_oldest()
+        if self.count == self.capacity:
+            self._drop_oldest()
+        if self.count:
+            last = (self._start + self.count - 1) % self.capacity
+            self._area += _trapezoid(self._times[last], self._values[last], now, value)
+        index = (self._start + self.count) % self.capacity
+        self._times[index] = now
+        self._values[index] = value
+        self.count += 1
+        self._add(now, value, 1.0)
+        while self._peaks and self._peaks[-1][1] <= value:
+            self._peaks.pop()
+        self._peaks.append((now, value))
+        self._pushes += 1
+        if self._pushes >= self.capacity:
+            self._rebase()
+
+    def _add(self, time: float, value: float, sign: float) -> None:
+        time -= self._origin
+        self._sum_t += sign * time
+        self._sum_v += sign * value
+        self._sum_tt += sign * time * time
+        self._sum_tv += sign * time * value
+
+    def _drop_oldest(self) -> None:
+        time = self._times[self._start]
+        value = self._values[self._start]
+        self._add(time, value, -1.0)
+        self._start = (self._start + 1) % self.capacity
+        if self.count > 1:
+            self._area -= _trapezoid(
+                time, value, self._times[self._start], self._values[self._start]
+            )
+        self.count -= 1
+        while self._peaks and self._peaks[0][0] <= time:
+            self._peaks.popleft()
+
+    def _rebase(self) -> None:
+        self._origin = self._times[self._start] if self.count else 0.0
+        self._sum_t = self._sum_v = self._sum_tt = self._sum_tv = 0.0
+        self._area = 0.0
+        for offset in range(self.count):
+            index = (self._start + offset) % self.capacity
+            self._add(self._times[index], self._values[index], 1.0)
+            if offset:
+                previous = (index - 1) % self.capacity
+                self._area += _trapezoid(
+                    self._times[previous],
+                    self._values[previous],
+                    self._times[index],
+                    self._values[index],
+                )
+        self._pushes = 0
+
+    @property
+    def mean(self) -> float | None:
+        """Gemiddelde van de samples in het venster."""
+        return self._sum_v / self.count if self.count else None
+
+    @property
+    def average(self) -> float | None:
+        """Tijdgewogen gemiddelde: de integraal gedeeld door de tijdspanne."""
+        if not self.count:
+            return None
+        last = (self._start + self.count - 1) % self.capacity
+        span = self._times[last] - self._times[self._start]
+        if span <= 0:
+            return self._values[last]
+        return self._area / span
+
+    @property
+    def peak(self) -> float | None:
+        """Hoogste sample in het venster."""
+        return self._peaks[0][1] if self._peaks else None
+
+    @property
+    def slope(self) -> float | None:
+        """Helling van de regressielijn, in eenheden per minuut."""
+        if self.count < 2:
+            return None
+        count = self.count
+        denominator = count * self._sum_tt - self._sum_t * self._sum_t
+        if denominator <= 0:
+            return None
+        return (count * self._sum_tv - self._sum_t * self._sum_v) / denominator * 60
+
+
+def _trapezoid(time: float, value: float, next_time: float, next_value: float) -> float:
+    return (next_time - time) * (value + next_value) / 2
+
+
+class IloRollingMetrics:
+    """De rolling vensters van één entry, per snapshot veld en slot.
+
+    Vervangt statistics helpers die bij elke update de recorder
+    bevragen: de coordinator voegt elke poll de nieuwe metingen toe en
+    schrijft de afgeleide waarden in de snapshot. Niet bewaard over een
+    herstart; de vensters vullen zich binnen ``window`` seconden weer.
+    """
+
+    def __init__(self, window: float = ROLLING_WINDOW) -> None:
+        self.window = window
+        self._windows: dict[tuple[str, int | None], RollingWindow] = {}
+
+    def _get(self, key: str, slot: int | None, spacing: float) -> RollingWindow:
+        if (rolling := self._windows.get((key, slot))) is None:
+            rolling = self._windows[(key, slot)] = RollingWindow(
+                self.window, window_capacity(self.window, spacing)
+            )
+        return rolling
+
+    def update_power(
+        self, now: float, power: float | None, spacing: float
+    ) -> dict[str, float | None]:
+        """Nieuwe power reading; geeft tijdgewogen gemiddelde en piek over het venster."""
+        rolling = self._get("power_usage", None, spacing)
+        if power is not None:
+            rolling.push(now, float(power))
+        average = rolling.average
+        return {
+            "power_average": round(average, 1) if average is not None else None,
+            "power_peak": rolling.peak,
+        }
+
+    def update_rates(
+        self, key: str, now: float, values: tuple[float | None, ...], spacing: float
+    ) -> tuple[float | None, ...]:
+        """Nieuwe kolom van een sensor-groep; geeft de helling per slot."""
+        rates: list[float | None] = []
+        for slot, value in enumerate(values):
+            if not isinstance(value, (int, float)):
+                # Sensor ontbreekt in deze poll: geen trend tonen
+                rates.append(None)
+                continue
+            rolling = self._get(key, slot, spacing)
+            rolling.push(now, float(value))
+            slope = rolling.slope
+            # + 0.0: geen "-0.0" als state
+            rates.append(round(slope, 2) + 0.0 if slope is not None else None)
+        return tuple(rates)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Aantal vensters en samples, voor diagnostics."""
+        return {
+            "window": self.window,
+            "metrics": len(self._windows),
+            "samples": sum(rolling.count for rolling in self._windows.values()),
+            "capacity": sum(rolling.capacity for rolling in self._windows.values()),
+        }
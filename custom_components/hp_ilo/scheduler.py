@@ -0,0 +1,176 @@
+"""Domein-brede poll scheduler voor alle hp_ilo entries."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import ipaddress
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DATA_SCHEDULER
+
+if TYPE_CHECKING:
+    from .coordinator import IloDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Maximaal aantal gelijktijdige iLO requests, totaal en per subnet
+MAX_CONCURRENT = 8
+MAX_PER_SUBNET = 4
+# Gulden snede: opeenvolgende entries krijgen een fase die het interval
+# gelijkmatig vult, hoeveel entries er ook bijkomen.
+GOLDEN_RATIO = 0.6180339887498949
+
+
+def subnet_key(host: str) -> str:
+    """Groepeer hosts per /24 (IPv4) of /64 (IPv6); hostnames per domein."""
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return host.partition(".")[2] or host
+    prefix = 24 if address.version == 4 else 64
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+class IloFleetScheduler:
+    """Plant de polls van alle coordinators en begrenst de concurrency.
+
+    De coordinators hebben zelf geen timer meer: ze zetten ``next_due``
+    (monotonic) en deze scheduler start de refresh als die verstreken is.
+    Elk iLO request (poll of actie) wacht op een globale en een subnet
+    semaphore, zodat een grote vloot nooit tegelijk TLS handshakes doet.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrent: int = MAX_CONCURRENT,
+        max_per_subnet: int = MAX_PER_SUBNET,
+    ) -> None:
+        self.hass = hass
+        self.max_per_subnet = max_per_subnet
+        self._global = asyncio.Semaphore(max_concurrent)
+        self._subnets: dict[str, asyncio.Semaphore] = {}
+        self._coordinators: dict[str, IloDataUpdateCoordinator] = {}
+        # entry_id -> next_due op het moment van dispatch
+        self._in_flight: dict[str, float] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._added = 0
+        self.queued = 0
+        self.active = 0
+        self.dispatched = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    @callback
+    def async_add(self, coordinator: IloDataUpdateCoordinator) -> CALLBACK_TYPE:
+        """Neem een coordinator op; geeft een callback om hem weer te verwijderen."""
+        entry_id = coordinator.entry.entry_id
+        coordinator.phase = 1 - (self._added * GOLDEN_RATIO) % 1
+        self._added += 1
+        self._coordinators[entry_id] = coordinator
+
+        @callback
+        def _remove() -> None:
+            self._coordinators.pop(entry_id, None)
+            self.async_reschedule()
+
+        return _remove
+
+    @asynccontextmanager
+    async def async_slot(
+        self, coordinator: IloDataUpdateCoordinator
+    ) -> AsyncIterator[None]:
+        """Wacht op een vrije plek voor een request naar deze iLO."""
+        subnet = self._subnets.setdefault(
+            subnet_key(coordinator.connection.host),
+            asyncio.Semaphore(self.max_per_subnet),
+        )
+        self.queued += 1
+        try:
+            await subnet.acquire()
+            try:
+                await self._global.acquire()
+            except BaseException:
+                subnet.release()
+                raise
+        finally:
+            self.queued -= 1
+        if (due := self._in_flight.get(coordinator.entry.entry_id)) is not None:
+            self.last_lag = max(0.0, time.monotonic() - due)
+            self.max_lag = max(self.max_lag, self.last_lag)
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._global.release()
+            subnet.release()
+
+    @callback
+    def async_reschedule(self) -> None:
+        """Zet de timer op de eerstvolgende poll van de hele vloot."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        due = [
+            coordinator.next_due
+            for entry_id, coordinator in self._coordinators.items()
+            if coordinator.next_due is not None and entry_id not in self._in_flight
+        ]
+        if not due:
+            return
+        delay = max(0.0, min(due) - time.monotonic())
+        self._timer = self.hass.loop.call_later(delay, self._async_dispatch_due)
+
+    @callback
+    def _async_dispatch_due(self) -> None:
+        self._timer = None
+        now = time.monotonic()
+        for entry_id, coordinator in list(self._coordinators.items()):
+            due = coordinator.next_due
+            if due is None or due > now or entry_id in self._in_flight:
+                continue
+            self._in_flight[entry_id] = due
+            self.dispatched += 1
+            coordinator.entry.async_create_background_task(
+                self.hass,
+                self._async_refresh(entry_id, coordinator),
+                f"hp_ilo poll {coordinator.connection.host}",
+            )
+        _LOGGER.debug("Fleet scheduler: %s", self.stats)
+        self.async_reschedule()
+
+    async def _async_refresh(
+        self, entry_id: str, coordinator: IloDataUpdateCoordinator
+    ) -> None:
+        try:
+            await coordinator.async_refresh()
+        finally:
+            self._in_flight.pop(entry_id, None)
+            self.async_reschedule()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Queue diepte en vertraging, voor logging en diagnostics."""
+        return {
+            "entries": len(self._coordinators),
+            "active": self.active,
+            "queued": self.queued,
+            "in_flight": len(self._in_flight),
+            "dispatched": self.dispatched,
+            "last_lag": round(self.last_lag, 3),
+            "max_lag": round(self.max_lag, 3),
+        }
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> IloFleetScheduler:
+    """Geef de scheduler van het domein, en maak hem bij de eerste entry aan."""
+    if (scheduler := hass.data.get(DATA_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_SCHEDULER] = IloFleetScheduler(hass)
+    return scheduler
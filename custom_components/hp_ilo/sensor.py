@@ -2,10 +2,7 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
-from typing import Any
 
-import hpilo
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
@@ -13,30 +10,39 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
-    CONF_HOST,
-    CONF_NAME,
-    CONF_PASSWORD,
-    CONF_PORT,
-    CONF_USERNAME,
     PERCENTAGE,
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfInformation,
+    UnitOfPower,
     UnitOfTemperature,
     UnitOfTime,
 )
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, DEFAULT_PORT
+from .const import DOMAIN
+from .coordinator import IloDataUpdateCoordinator
+from .models import NOT_INSTALLED
+from .rolling import ROLLING_WINDOW
 
 _LOGGER = logging.getLogger(__name__)
 
-# AANGEPAST: Interval nu op 30 seconden
-SCAN_INTERVAL = timedelta(seconds=30)
+# Stats veld -> (naam, eenheid, state class)
+POLL_STAT_SENSORS = {
+    "last_poll_duration": ("Poll Duration", UnitOfTime.SECONDS, SensorStateClass.MEASUREMENT),
+    "failures": ("Poll Failures", None, SensorStateClass.TOTAL_INCREASING),
+    "last_poll_bytes": ("Poll Response Size", UnitOfInformation.BYTES, SensorStateClass.MEASUREMENT),
+}
+
+WINDOW_MINUTES = int(ROLLING_WINDOW // 60)
+# Snapshot veld -> naam, voor de rolling power sensors
+POWER_WINDOW_SENSORS = {
+    "power_average": f"Power Usage {WINDOW_MINUTES} min Average",
+    "power_peak": f"Power Usage {WINDOW_MINUTES} min Peak",
+}
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -45,93 +51,76 @@ async def async_setup_entry(
 ) -> None:
     """Set up the HP iLO sensors vanuit een config entry."""
     
-    coordinator = IloDataUpdateCoordinator(hass, entry)
-    
-    # Eerste refresh bij opstarten
-    await coordinator.async_config_entry_first_refresh()
-
-    device_info = DeviceInfo(
-        identifiers={(DOMAIN, entry.unique_id or entry.entry_id)},
-        name=entry.data.get(CONF_NAME, "HP iLO"),
-        manufacturer="Hewlett Packard Enterprise",
-        configuration_url=f"https://{entry.data[CONF_HOST]}",
-    )
+    # Gedeelde coordinator uit __init__.py, die heeft al een eerste refresh gedaan
+    coordinator: IloDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    # Model, serienummer en firmware komen uit de inventory cache
+    device_info = coordinator.device_info
 
     sensors: list[SensorEntity] = []
     data = coordinator.data
 
-    # 1. Temperatuur
-    if "temperature" in data:
-        for label, sensor_info in data["temperature"].items():
-            if sensor_info.get("status") != "Not Installed":
-                sensors.append(HpIloTemperatureSensor(coordinator, label, device_info))
+    # 1. Temperatuur (per slot in de snapshot kolommen)
+    for label, slot in coordinator.slots.temperature.items():
+        if data.temperature_status[slot] != NOT_INSTALLED:
+            sensors.append(HpIloTemperatureSensor(coordinator, label, slot, device_info))
 
     # 2. Fans
-    if "fans" in data:
-        for label, fan_info in data["fans"].items():
-            sensors.append(HpIloFanSensor(coordinator, label, device_info))
+    for label, slot in coordinator.slots.fans.items():
+        sensors.append(HpIloFanSensor(coordinator, label, slot, device_info))
 
     # 3. Power Status
-    if "power_status" in data:
+    if data.power_status is not None:
         sensors.append(HpIloPowerSensor(coordinator, device_info))
 
     # 4. Power On Time
-    if "power_on_time" in data:
+    if data.power_on_time is not None:
         sensors.append(HpIloPowerOnTimeSensor(coordinator, device_info))
 
-    async_add_entities(sensors)
-
+    # 5. Stroomverbruik en de daaruit geïntegreerde energie (kWh)
+    if data.power_usage is not None:
+        sensors.append(HpIloPowerUsageSensor(coordinator, device_info))
+        sensors.append(HpIloEnergySensor(coordinator, device_info))
+        sensors.extend(
+            HpIloPowerWindowSensor(coordinator, device_info, key)
+            for key in POWER_WINDOW_SENSORS
+        )
 
-class IloDataUpdateCoordinator(DataUpdateCoordinator):
-    """Centrale klasse om iLO data elke 30 seconden te verzamelen."""
+    # 6. Trend per temperatuur sensor en fan (standaard uitgeschakeld)
+    for label, slot in coordinator.slots.temperature.items():
+        if data.temperature_status[slot] != NOT_INSTALLED:
+            sensors.append(HpIloRateSensor(coordinator, "temperature", label, slot, device_info))
+    for label, slot in coordinator.slots.fans.items():
+        sensors.append(HpIloRateSensor(coordinator, "fans", label, slot, device_info))
+
+    # 7. Poll instrumentatie (standaard uitgeschakeld)
+    sensors.extend(
+        HpIloPollStatSensor(coordinator, device_info, key)
+        for key in POLL_STAT_SENSORS
+    )
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=f"{DOMAIN}_{entry.data[CONF_HOST]}",
-            update_interval=SCAN_INTERVAL,
-        )
-        self.entry = entry
-
-    async def _async_update_data(self) -> dict[str, Any]:
-        """Haal alle data op in één call."""
-        return await self.hass.async_add_executor_job(self._get_ilo_data)
-
-    def _get_ilo_data(self) -> dict[str, Any]:
-        """Sync verbinding met de iLO library."""
-        try:
-            ilo = hpilo.Ilo(
-                hostname=self.entry.data[CONF_HOST],
-                login=self.entry.data[CONF_USERNAME],
-                password=self.entry.data[CONF_PASSWORD],
-                port=self.entry.data.get(CONF_PORT, DEFAULT_PORT),
-            )
-            
-            health = ilo.get_embedded_health()
-            
-            return {
-                "temperature": health.get("temperature", {}),
-                "fans": health.get("fans", {}),
-                "power_status": ilo.get_host_power_status(),
-                "power_on_time": ilo.get_server_power_on_time(),
-            }
-        except Exception as err:
-            raise UpdateFailed(f"iLO onbereikbaar: {err}") from err
+    async_add_entities(sensors)
 
 
 class HpIloBaseSensor(CoordinatorEntity, SensorEntity):
     """Basis voor iLO sensoren."""
-    def __init__(self, coordinator: IloDataUpdateCoordinator, device_info: DeviceInfo):
-        super().__init__(coordinator)
+    def __init__(
+        self,
+        coordinator: IloDataUpdateCoordinator,
+        device_info: DeviceInfo,
+        context: tuple[str, int | None],
+    ):
+        # De context (snapshot veld, slot) laat de coordinator alleen deze
+        # entity bijwerken als zijn eigen waarde veranderd is.
+        super().__init__(coordinator, context)
         self._attr_device_info = device_info
 
 
 class HpIloTemperatureSensor(HpIloBaseSensor):
     """Temperatuur sensor."""
-    def __init__(self, coordinator, label, device_info):
-        super().__init__(coordinator, device_info)
-        self._label = label
+    def __init__(self, coordinator, label, slot, device_info):
+        super().__init__(coordinator, device_info, ("temperature", slot))
+        self._slot = slot
         self._attr_name = f"{device_info['name']} Temp {label}"
         self._attr_unique_id = f"{coordinator.entry.entry_id}_temp_{label.replace(' ', '_')}"
         self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
@@ -140,18 +129,14 @@ class HpIloTemperatureSensor(HpIloBaseSensor):
 
     @property
     def native_value(self) -> float | None:
-        temp_data = self.coordinator.data["temperature"].get(self._label)
-        if temp_data:
-            val = temp_data.get("currentreading")
-            return val[0] if isinstance(val, (list, tuple)) else val
-        return None
+        return self.coordinator.data.temperature[self._slot]
 
 
 class HpIloFanSensor(HpIloBaseSensor):
     """Fan snelheid."""
-    def __init__(self, coordinator, label, device_info):
-        super().__init__(coordinator, device_info)
-        self._label = label
+    def __init__(self, coordinator, label, slot, device_info):
+        super().__init__(coordinator, device_info, ("fans", slot))
+        self._slot = slot
         self._attr_name = f"{device_info['name']} Fan {label}"
         self._attr_unique_id = f"{coordinator.entry.entry_id}_fan_{label.replace(' ', '_')}"
         self._attr_native_unit_of_measurement = PERCENTAGE
@@ -160,17 +145,13 @@ class HpIloFanSensor(HpIloBaseSensor):
 
     @property
     def native_value(self) -> int | None:
-        fan_data = self.coordinator.data["fans"].get(self._label)
-        if fan_data:
-            val = fan_data.get("speed")
-            return val[0] if isinstance(val, (list, tuple)) else val
-        return None
+        return self.coordinator.data.fans[self._slot]
 
 
 class HpIloPowerSensor(HpIloBaseSensor):
     """Power Status."""
     def __init__(self, coordinator, device_info):
-        super().__init__(coordinator, device_info)
+        super().__init__(coordinator, device_info, ("power_status", None))
         self._attr_name = f"{device_info['name']} Power Status"
         self._attr_unique_id = f"{coordinator.entry.entry_id}_power_status"
         self._attr_device_class = SensorDeviceClass.ENUM
@@ -178,14 +159,14 @@ class HpIloPowerSensor(HpIloBaseSensor):
 
     @property
     def native_value(self) -> str:
-        status = self.coordinator.data.get("power_status", "UNKNOWN")
+        status = self.coordinator.data.power_status
         return status.upper() if status else "UNKNOWN"
 
 
 class HpIloPowerOnTimeSensor(HpIloBaseSensor):
     """Power On Time."""
     def __init__(self, coordinator, device_info):
-        super().__init__(coordinator, device_info)
+        super().__init__(coordinator, device_info, ("power_on_time", None))
         self._attr_name = f"{device_info['name']} Power On Time"
         self._attr_unique_id = f"{coordinator.entry.entry_id}_power_on_time"
         self._attr_native_unit_of_measurement = UnitOfTime.MINUTES
@@ -193,4 +174,107 @@ class HpIloPowerOnTimeSensor(HpIloBaseSensor):
 
     @property
     def native_value(self) -> int | None:
-        return self.coordinator.data.get("power_on_time")
+        return self.coordinator.data.power_on_time
+
+
+class HpIloPowerUsageSensor(HpIloBaseSensor):
+    """Actueel stroomverbruik."""
+    def __init__(self, coordinator, device_info):
+        super().__init__(coordinator, device_info, ("power_usage", None))
+        self._attr_name = f"{device_info['name']} Power Usage"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_power_usage"
+        self._attr_native_unit_of_measurement = UnitOfPower.WATT
+        self._attr_device_class = SensorDeviceClass.POWER
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self) -> float | None:
+        return self.coordinator.data.power_usage
+
+
+class HpIloEnergySensor(HpIloBaseSensor):
+    """Totaal verbruik, voor het energie dashboard."""
+    def __init__(self, coordinator, device_info):
+        super().__init__(coordinator, device_info, ("energy", None))
+        self._attr_name = f"{device_info['name']} Energy"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_energy"
+        self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+        self._attr_device_class = SensorDeviceClass.ENERGY
+        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        self._attr_suggested_display_precision = 2
+
+    @property
+    def native_value(self) -> float | None:
+        return self.coordinator.data.energy
+
+
+class HpIloPowerWindowSensor(HpIloBaseSensor):
+    """Gemiddeld of piek stroomverbruik over het rolling venster."""
+    def __init__(self, coordinator, device_info, key):
+        super().__init__(coordinator, device_info, (key, None))
+        self._key = key
+        self._attr_name = f"{device_info['name']} {POWER_WINDOW_SENSORS[key]}"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_{key}"
+        self._attr_native_unit_of_measurement = UnitOfPower.WATT
+        self._attr_device_class = SensorDeviceClass.POWER
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self) -> float | None:
+        return getattr(self.coordinator.data, self._key)
+
+
+class HpIloRateSensor(HpIloBaseSensor):
+    """Verandering per minuut van een temperatuur of fan, over het rolling venster."""
+
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator, kind, label, slot, device_info):
+        super().__init__(coordinator, device_info, (f"{kind}_rate", slot))
+        self._key = f"{kind}_rate"
+        self._slot = slot
+        suffix = label.replace(' ', '_')
+        if kind == "temperature":
+            self._attr_name = f"{device_info['name']} Temp {label} Rate"
+            self._attr_unique_id = f"{coordinator.entry.entry_id}_temp_{suffix}_rate"
+            self._attr_native_unit_of_measurement = f"{UnitOfTemperature.CELSIUS}/min"
+            self._attr_icon = "mdi:thermometer-chevron-up"
+        else:
+            self._attr_name = f"{device_info['name']} Fan {label} Trend"
+            self._attr_unique_id = f"{coordinator.entry.entry_id}_fan_{suffix}_trend"
+            self._attr_native_unit_of_measurement = f"{PERCENTAGE}/min"
+            self._attr_icon = "mdi:fan-chevron-up"
+
+    @property
+    def native_value(self) -> float | None:
+        rates = getattr(self.coordinator.data, self._key)
+        return rates[self._slot] if self._slot < len(rates) else None
+
+
+class HpIloPollStatSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostische teller uit de poll instrumentatie."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, device_info, key):
+        # Geen context: de stats veranderen elke poll
+        super().__init__(coordinator)
+        name, unit, state_class = POLL_STAT_SENSORS[key]
+        self._key = key
+        self._attr_device_info = device_info
+        self._attr_name = f"{device_info['name']} {name}"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+
+    @property
+    def available(self) -> bool:
+        # Ook na een mislukte poll zijn de tellers geldig
+        return True
+
+    @property
+    def native_value(self) -> float | int | None:
+        value = getattr(self.coordinator.stats, self._key)
+        return round(value, 3) if isinstance(value, float) else value
@@ -0,0 +1,258 @@
+"""Services van de hp_ilo integratie, één keer per domein geregistreerd."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+import logging
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_DEVICE_ID, CONF_HOST
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers import device_registry as dr
+
+from .actions import RESTART_ACTIONS, IloActionRejected
+from .const import CONVERGE_TIMEOUT, DOMAIN
+from .coordinator import IloDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Service naam naar coordinator actie (zelfde acties als de buttons)
+SERVICE_ACTIONS = {
+    "reboot_server": "warm_boot",
+    "shutdown_graceful": "press_pwr_button",
+    "shutdown_hard": "hard_shutdown",
+    "power_on": "power_on",
+}
+SERVICE_BULK_POWER = "bulk_power"
+SERVICE_REFRESH_INVENTORY = "refresh_inventory"
+
+ATTR_ACTION = "action"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_MAX_CONCURRENT = "max_concurrent"
+ATTR_STAGGER = "stagger"
+ATTR_TIMEOUT = "timeout"
+ATTR_WAIT = "wait"
+
+# Resultaat per host van een power actie
+RESULT_SENT = "sent"
+RESULT_CONFIRMED = "confirmed"
+RESULT_COALESCED = "coalesced"
+RESULT_TIMEOUT = "timeout"
+RESULT_REJECTED = "rejected"
+RESULT_FAILED = "failed"
+FAILED_RESULTS = {RESULT_TIMEOUT, RESULT_REJECTED, RESULT_FAILED}
+
+DEFAULT_MAX_CONCURRENT = 4
+
+# Zonder doel: alleen toegestaan als er precies één iLO is
+TARGET_SCHEMA = {
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+}
+# Optioneel blokkeren tot de iLO de nieuwe power status meldt
+POWER_SCHEMA = {
+    **TARGET_SCHEMA,
+    vol.Optional(ATTR_WAIT, default=False): cv.boolean,
+    vol.Optional(ATTR_TIMEOUT, default=CONVERGE_TIMEOUT): vol.All(
+        vol.Coerce(float), vol.Range(min=1, max=3600)
+    ),
+}
+POWER_SERVICE_SCHEMA = vol.Schema(POWER_SCHEMA)
+BULK_POWER_SCHEMA = vol.Schema(
+    {
+        **POWER_SCHEMA,
+        vol.Required(ATTR_ACTION): vol.In(SERVICE_ACTIONS),
+        vol.Optional(ATTR_MAX_CONCURRENT, default=DEFAULT_MAX_CONCURRENT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=64)
+        ),
+        # Seconden tussen de start van opeenvolgende hosts (inschakelstroom)
+        vol.Optional(ATTR_STAGGER, default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=600)
+        ),
+    }
+)
+REFRESH_INVENTORY_SCHEMA = vol.Schema(TARGET_SCHEMA)
+
+
+def _coordinators(hass: HomeAssistant) -> dict[str, IloDataUpdateCoordinator]:
+    return {
+        entry_id: data["coordinator"]
+        for entry_id, data in hass.data.get(DOMAIN, {}).items()
+    }
+
+
+def _targets(
+    hass: HomeAssistant, call: ServiceCall, default_all: bool = False
+) -> list[IloDataUpdateCoordinator]:
+    """De geladen entries die een service call aanwijst, in volgorde van de call."""
+    loaded = _coordinators(hass)
+    entry_ids: list[str] = list(call.data.get(ATTR_CONFIG_ENTRY_ID, []))
+    device_registry = dr.async_get(hass)
+    for device_id in call.data.get(ATTR_DEVICE_ID, []):
+        if (device := device_registry.async_get(device_id)) is None:
+            raise ServiceValidationError(f"Unknown device {device_id}")
+        entry_ids.extend(
+            entry_id for entry_id in device.config_entries if entry_id in loaded
+        )
+    if not entry_ids:
+        if default_all or len(loaded) == 1:
+            return list(loaded.values())
+        raise ServiceValidationError(
+            f"{call.service} needs a config_entry_id or device_id when "
+            f"{len(loaded)} iLO entries are loaded"
+        )
+    if missing := [entry_id for entry_id in entry_ids if entry_id not in loaded]:
+        raise ServiceValidationError(f"iLO entries not loaded: {', '.join(missing)}")
+    # Dubbele doelen (entry én device) maar één keer
+    return [loaded[entry_id] for entry_id in dict.fromkeys(entry_ids)]
+
+
+async def _async_power_host(
+    coordinator: IloDataUpdateCoordinator,
+    action: str,
+    wait: bool,
+    timeout: float,
+    started: float,
+) -> dict[str, Any]:
+    """Eén power actie op één host, met uitkomst en timing."""
+    begin = time.monotonic()
+    result: dict[str, Any] = {
+        "entry_id": coordinator.entry.entry_id,
+        "name": coordinator.entry.title,
+        "host": coordinator.entry.data[CONF_HOST],
+        "started": round(begin - started, 3),
+    }
+    try:
+        sent = await coordinator.async_power_action(action, timeout)
+        status = RESULT_SENT if sent else RESULT_COALESCED
+        # Een herstart begint en eindigt ON: niets om op te wachten
+        if wait and action not in RESTART_ACTIONS:
+            status = (
+                RESULT_CONFIRMED
+                if await coordinator.async_wait_power_state(action)
+                else RESULT_TIMEOUT
+            )
+    except IloActionRejected as err:
+        status, result["error"] = RESULT_REJECTED, str(err)
+    except Exception as err:  # noqa: BLE001 - per host rapporteren, niet afbreken
+        status, result["error"] = RESULT_FAILED, str(err)
+    result["result"] = status
+    result["duration"] = round(time.monotonic() - begin, 3)
+    _LOGGER.info("iLO action %s on %s: %s", action, result["host"], status)
+    return result
+
+
+async def async_power_hosts(
+    coordinators: Iterable[IloDataUpdateCoordinator],
+    action: str,
+    *,
+    wait: bool = False,
+    timeout: float = CONVERGE_TIMEOUT,
+    max_concurrent: int | None = None,
+    stagger: float = 0.0,
+) -> list[dict[str, Any]]:
+    """Voer een power actie uit op meerdere hosts tegelijk.
+
+    Host ``i`` start niet eerder dan ``i * stagger`` seconden na de call en
+    er lopen er hoogstens ``max_concurrent`` tegelijk (inclusief het wachten
+    op de bevestiging). De fleet scheduler begrenst daarnaast het aantal
+    gelijktijdige iLO requests.
+    """
+    started = time.monotonic()
+    semaphore = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+
+    async def _run(index: int, coordinator: IloDataUpdateCoordinator) -> dict[str, Any]:
+        if (delay := started + index * stagger - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+        if semaphore is None:
+            return await _async_power_host(coordinator, action, wait, timeout, started)
+        async with semaphore:
+            return await _async_power_host(coordinator, action, wait, timeout, started)
+
+    return list(
+        await asyncio.gather(
+            *(_run(index, coordinator) for index, coordinator in enumerate(coordinators))
+        )
+    )
+
+
+def _raise_failures(action: str, results: list[dict[str, Any]]) -> None:
+    if failed := [result for result in results if result["result"] in FAILED_RESULTS]:
+        raise HomeAssistantError(
+            f"{action} failed on "
+            + ", ".join(
+                f"{result['host']} ({result.get('error', result['result'])})"
+                for result in failed
+            )
+        )
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Registreer de services één keer voor alle iLO entries."""
+
+    async def handle_power_action(call: ServiceCall) -> None:
+        results = await async_power_hosts(
+            _targets(hass, call),
+            SERVICE_ACTIONS[call.service],
+            wait=call.data[ATTR_WAIT],
+            timeout=call.data[ATTR_TIMEOUT],
+        )
+        _raise_failures(call.service, results)
+
+    async def handle_bulk_power(call: ServiceCall) -> ServiceResponse:
+        started = time.monotonic()
+        results = await async_power_hosts(
+            _targets(hass, call),
+            SERVICE_ACTIONS[call.data[ATTR_ACTION]],
+            wait=call.data[ATTR_WAIT],
+            timeout=call.data[ATTR_TIMEOUT],
+            max_concurrent=call.data[ATTR_MAX_CONCURRENT],
+            stagger=call.data[ATTR_STAGGER],
+        )
+        response = {
+            "action": call.data[ATTR_ACTION],
+            "duration": round(time.monotonic() - started, 3),
+            "failed": sum(result["result"] in FAILED_RESULTS for result in results),
+            "results": results,
+        }
+        if not call.return_response:
+            # Zonder response variabele is een exception de enige terugkoppeling
+            _raise_failures(call.data[ATTR_ACTION], results)
+            return None
+        return response
+
+    async def handle_refresh_inventory(call: ServiceCall) -> None:
+        # Model, serienummer en firmware opnieuw ophalen (bv. na een upgrade)
+        for coordinator in _targets(hass, call, default_all=True):
+            coordinator.async_refresh_inventory()
+            await coordinator.async_request_refresh()
+
+    for service in SERVICE_ACTIONS:
+        hass.services.async_register(
+            DOMAIN, service, handle_power_action, schema=POWER_SERVICE_SCHEMA
+        )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_POWER,
+        handle_bulk_power,
+        schema=BULK_POWER_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH_INVENTORY,
+        handle_refresh_inventory,
+        schema=REFRESH_INVENTORY_SCHEMA,
+    )
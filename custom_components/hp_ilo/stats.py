@@ -0,0 +1,118 @@
+"""Instrumentatie per entry: latency, payload grootte, logins en fouten."""
+from __future__ import annotations
+
+from collections import Counter
+import threading
+from typing import Any
+
+# Bovengrenzen (seconden) van de latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """Vaste buckets plus aantal, som en maximum."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Tel één meting."""
+        index = next(
+            (i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound),
+            len(LATENCY_BUCKETS),
+        )
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Cumulatieve buckets (zoals Prometheus) en samenvatting."""
+        buckets: dict[str, int] = {}
+        running = 0
+        for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), self.counts):
+            running += count
+            buckets[f"le_{bound}"] = running
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else None,
+            "max": round(self.max, 4),
+            "buckets": buckets,
+        }
+
+
+class IloPollStats:
+    """Tellers van één entry, te lezen via diagnostics en diagnostic sensors.
+
+    Wordt vanuit de event loop en vanuit executor threads (RIBCL) gevuld,
+    daarom achter een lock.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latency: dict[str, LatencyHistogram] = {}
+        self.bytes: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.executor_wait = LatencyHistogram()
+        self.poll_duration = LatencyHistogram()
+        self.logins = 0
+        self.polls = 0
+        self.failures = 0
+        self.last_poll_duration: float | None = None
+        self.last_poll_bytes = 0
+
+    def observe_call(self, call: str, seconds: float, size: int | None = None) -> None:
+        """Eén request naar de iLO (RIBCL batch of Redfish GET/POST)."""
+        with self._lock:
+            self.latency.setdefault(call, LatencyHistogram()).observe(seconds)
+            if size is not None:
+                self.bytes[call] += size
+                self.last_poll_bytes += size
+
+    def observe_login(self) -> None:
+        """Een nieuwe sessie of RIBCL login."""
+        with self._lock:
+            self.logins += 1
+
+    def observe_executor_wait(self, seconds: float) -> None:
+        """Tijd tussen indienen en starten van een executor job."""
+        with self._lock:
+            self.executor_wait.observe(seconds)
+
+    def start_poll(self) -> None:
+        """Begin van een poll: de bytes-teller van de laatste poll op nul."""
+        with self._lock:
+            self.last_poll_bytes = 0
+
+    def finish_poll(self, seconds: float, error: Exception | None = None) -> None:
+        """Einde van een poll, geslaagd of niet."""
+        with self._lock:
+            self.polls += 1
+            self.poll_duration.observe(seconds)
+            self.last_poll_duration = seconds
+            if error is not None:
+                self.failures += 1
+                # De oorzaak is informatiever dan de UpdateFailed wrapper
+                cause = error.__cause__ or error
+                self.errors[type(cause).__name__] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Alles als JSON-vriendelijke dict."""
+        with self._lock:
+            return {
+                "polls": self.polls,
+                "failures": self.failures,
+                "logins": self.logins,
+                "errors": dict(self.errors),
+                "last_poll_duration": self.last_poll_duration,
+                "last_poll_bytes": self.last_poll_bytes,
+                "poll_duration": self.poll_duration.as_dict(),
+                "executor_wait": self.executor_wait.as_dict(),
+                "latency": {call: h.as_dict() for call, h in self.latency.items()},
+                "bytes": dict(self.bytes),
+            }
@@ -0,0 +1,364 @@
+"""Transport backends voor de iLO: RIBCL (python-hpilo) en Redfish."""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Mapping
+from functools import partial
+import logging
+import re
+import time
+from typing import Any
+
+import hpilo
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .api import (
+    DEFAULT_TIMEOUT,
+    REDFISH_ROOT,
+    IloRedfishAuthError,
+    IloRedfishClient,
+    IloRedfishError,
+)
+from .connection import IloConnectionManager
+from .const import (
+    CONF_CAPABILITIES,
+    CONF_PROTOCOL,
+    DEFAULT_PORT,
+    DEFAULT_PROTOCOL,
+    PROTOCOL_AUTO,
+    PROTOCOL_REDFISH,
+    PROTOCOL_RIBCL,
+    TIER_INVENTORY,
+    TIER_POWER,
+    TIER_THERMAL,
+)
+from .discovery import IloScanResult, async_probe_host
+from .models import IloCapabilities
+from .stats import IloPollStats
+
+_LOGGER = logging.getLogger(__name__)
+
+# RIBCL calls per tier; alleen de tiers die aan de beurt zijn gaan mee in de batch
+RIBCL_TIER_CALLS: dict[str, tuple[str, ...]] = {
+    TIER_POWER: ("get_host_power_status", "get_power_readings"),
+    TIER_THERMAL: ("get_embedded_health",),
+    TIER_INVENTORY: ("get_server_power_on_time", "get_fw_version"),
+}
+# Identiteit van de server: alleen als de inventory cache verlopen is
+RIBCL_IDENTITY_CALLS = ("get_product_name", "get_host_data")
+
+# Button/service acties naar hpilo methode, args en kwargs
+RIBCL_ACTIONS: dict[str, tuple[str, tuple, dict]] = {
+    "power_on": ("set_host_power", (True,), {}),
+    "warm_boot": ("warm_boot_server", (), {}),
+    "press_pwr_button": ("press_pwr_btn", (), {}),
+    "hard_shutdown": ("hold_pwr_btn", (), {}),
+}
+
+
+class IloTransportError(Exception):
+    """Validatie van de verbinding mislukt."""
+
+
+class IloTransportAuthError(IloTransportError):
+    """Gebruikersnaam of wachtwoord geweigerd."""
+
+
+class IloTransportConnectionError(IloTransportError):
+    """iLO niet bereikbaar of antwoordt niet zoals verwacht."""
+
+
+class IloTransport(ABC):
+    """Eén protocol om een iLO te pollen en te bedienen.
+
+    De coordinator, buttons en services kennen alleen deze interface.
+    Polls geven de ruwe dict in het formaat van de RIBCL poll; de
+    coordinator normaliseert die op de event loop, waar ook entities en
+    de event stream de snapshot lezen. Polls geven bij een fout
+    ``UpdateFailed``; :meth:`async_validate` (config flow) geeft een
+    :class:`IloTransportError`.
+    """
+
+    protocol: str
+    # Redfish client voor event stream en power historie, als die er is
+    redfish: IloRedfishClient | None = None
+
+    @abstractmethod
+    async def async_fetch(
+        self, tiers: set[str], identity: bool
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Haal de tiers op; geeft de ruwe poll en de inventory velden."""
+
+    @abstractmethod
+    async def async_power_action(self, action: str) -> None:
+        """Stuur een power actie."""
+
+    @abstractmethod
+    async def async_validate(self) -> None:
+        """Log in en doe één goedkope call."""
+
+    @abstractmethod
+    async def async_close(self) -> None:
+        """Ruim sessies op bij het ontladen."""
+
+
+class RibclTransport(IloTransport):
+    """python-hpilo over de gedeelde client pool, in de executor."""
+
+    protocol = PROTOCOL_RIBCL
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: IloConnectionManager,
+        stats: IloPollStats | None = None,
+    ) -> None:
+        self.hass = hass
+        self.connection = connection
+        self.stats = stats or IloPollStats()
+
+    async def async_fetch(
+        self, tiers: set[str], identity: bool
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Eén RIBCL batch in de executor."""
+        return await self.hass.async_add_executor_job(
+            self.fetch, tiers, identity, time.perf_counter()
+        )
+
+    def fetch(
+        self,
+        tiers: Iterable[str],
+        identity: bool,
+        submitted: float | None = None,
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Sync verbinding met de iLO library (blocking)."""
+        if submitted is not None:
+            self.stats.observe_executor_wait(time.perf_counter() - submitted)
+        try:
+            with self.connection.client() as ilo:
+                received = getattr(ilo, "bytes_received", None)
+                start = time.perf_counter()
+                raw = self._poll(ilo, tiers, identity)
+                # Elk RIBCL document logt opnieuw in
+                self.stats.observe_login()
+                self.stats.observe_call(
+                    f"RIBCL {','.join(sorted(tiers))}",
+                    time.perf_counter() - start,
+                    ilo.bytes_received - received if isinstance(received, int) else None,
+                )
+            inventory = raw.pop("inventory", {})
+            return raw, inventory
+        except Exception as err:
+            raise UpdateFailed(f"Communication error: {err}") from err
+        finally:
+            _LOGGER.debug("iLO pool %s: %s", self.connection.host, self.connection.stats)
+
+    def _poll(
+        self, ilo: hpilo.Ilo, tiers: Iterable[str], identity: bool = False
+    ) -> dict[str, Any]:
+        """De calls van de gevraagde tiers, als één RIBCL document verstuurd."""
+        methods = [
+            method
+            for tier in (TIER_POWER, TIER_THERMAL, TIER_INVENTORY)
+            if tier in tiers
+            for method in RIBCL_TIER_CALLS[tier]
+        ]
+        if identity:
+            methods.extend(RIBCL_IDENTITY_CALLS)
+        # In delayed mode worden de calls alleen in de wachtrij gezet;
+        # call_delayed() stuurt ze in één request en geeft de resultaten
+        # in dezelfde volgorde terug.
+        ilo.delayed = True
+        try:
+            for method in methods:
+                getattr(ilo, method)()
+            results = dict(zip(methods, ilo.call_delayed()))
+        finally:
+            ilo.delayed = False
+
+        data: dict[str, Any] = {}
+        if "get_host_power_status" in results:
+            data["power_status"] = results["get_host_power_status"]
+        if "get_power_readings" in results:
+            reading = results["get_power_readings"].get("present_power_reading", 0)
+            data["power_usage"] = reading[0] if isinstance(reading, (list, tuple)) else reading
+        if "get_embedded_health" in results:
+            health = results["get_embedded_health"]
+            data["temperature"] = health.get("temperature", {})
+            data["fans"] = health.get("fans", {})
+            data["health_summary"] = health.get("health_at_a_glance", {}).get("status", "OK")
+        if "get_server_power_on_time" in results:
+            data["power_on_time"] = results["get_server_power_on_time"]
+        if "get_fw_version" in results:
+            firmware = results["get_fw_version"] or {}
+            data["inventory"] = {"firmware_version": firmware.get("firmware_version")}
+            if identity:
+                data["inventory"].update(
+                    model=results["get_product_name"],
+                    serial_number=_serial_number(results["get_host_data"]),
+                    hw_version=firmware.get("management_processor"),
+                )
+        return data
+
+    async def async_power_action(self, action: str) -> None:
+        """Via een client uit de gedeelde pool."""
+        method, args, kwargs = RIBCL_ACTIONS[action]
+        await self.hass.async_add_executor_job(
+            partial(self.connection.call, method, *args, **kwargs)
+        )
+
+    async def async_validate(self) -> None:
+        """get_fw_version: het kleinste RIBCL antwoord."""
+        try:
+            await self.hass.async_add_executor_job(self.connection.call, "get_fw_version")
+        except hpilo.IloLoginFailed as err:
+            raise IloTransportAuthError(str(err)) from err
+        except (hpilo.IloError, OSError) as err:
+            raise IloTransportConnectionError(str(err)) from err
+
+    async def async_close(self) -> None:
+        """Niets te sluiten: de client pool is van de host, niet van de entry."""
+
+
+class RedfishTransport(IloTransport):
+    """Native async Redfish: geen executor thread per poll."""
+
+    protocol = PROTOCOL_REDFISH
+
+    def __init__(self, client: IloRedfishClient) -> None:
+        self.redfish = client
+
+    async def async_fetch(
+        self, tiers: set[str], identity: bool
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Alleen de resources van de gevraagde tiers."""
+        try:
+            raw = await self.redfish.async_get_snapshot(tiers)
+            inventory = raw.pop("inventory", {})
+            if identity:
+                inventory = await self.redfish.async_get_inventory()
+        except IloRedfishError as err:
+            raise UpdateFailed(f"Communication error: {err}") from err
+        _LOGGER.debug("Redfish cycle %s: %s", self.redfish.base_url, self.redfish.last_cycle)
+        return raw, inventory
+
+    async def async_power_action(self, action: str) -> None:
+        """ComputerSystem.Reset met de bijbehorende ResetType."""
+        await self.redfish.async_power_action(action)
+
+    async def async_validate(self) -> None:
+        """De service root na inloggen; een 404 op /Systems/1/ kan zo niet."""
+        try:
+            try:
+                await self.redfish.async_get(REDFISH_ROOT)
+            finally:
+                # Uitloggen om sessie-vervuiling op de iLO te voorkomen
+                await self.redfish.async_logout()
+        except IloRedfishAuthError as err:
+            raise IloTransportAuthError(str(err)) from err
+        except IloRedfishError as err:
+            raise IloTransportConnectionError(str(err)) from err
+
+    async def async_close(self) -> None:
+        """Sluit de Redfish sessie."""
+        await self.redfish.async_logout()
+
+
+def resolve_protocol(
+    data: Mapping[str, Any], options: Mapping[str, Any] | None = None
+) -> str:
+    """Het transport van een entry; ``auto`` volgt de gecachete capabilities."""
+    protocol = (options or {}).get(
+        CONF_PROTOCOL, data.get(CONF_PROTOCOL, DEFAULT_PROTOCOL)
+    )
+    if protocol == PROTOCOL_AUTO:
+        return IloCapabilities.from_dict(data.get(CONF_CAPABILITIES) or {}).protocol
+    return protocol
+
+
+def create_transport(
+    hass: HomeAssistant,
+    data: Mapping[str, Any],
+    protocol: str,
+    *,
+    connection: IloConnectionManager | None = None,
+    stats: IloPollStats | None = None,
+) -> IloTransport:
+    """Bouw het transport voor entry (of flow) data."""
+    host = data[CONF_HOST]
+    port = data.get(CONF_PORT, DEFAULT_PORT)
+    if protocol == PROTOCOL_REDFISH:
+        return RedfishTransport(
+            IloRedfishClient(
+                async_get_clientsession(hass, verify_ssl=False),
+                host=host,
+                port=port,
+                username=data[CONF_USERNAME],
+                password=data[CONF_PASSWORD],
+                stats=stats,
+            )
+        )
+    if connection is None:
+        # Config flow: een eigen, kortlevende pool
+        connection = IloConnectionManager(
+            host, port, data[CONF_USERNAME], data[CONF_PASSWORD]
+        )
+    return RibclTransport(hass, connection, stats)
+
+
+def capabilities_from_scan(result: IloScanResult | None) -> IloCapabilities:
+    """Capabilities uit de (login-loze) fingerprint van de subnet scan."""
+    if result is None:
+        return IloCapabilities()
+    match = re.search(r"iLO\s*(\d+)", result.manager or "")
+    return IloCapabilities(
+        generation=int(match.group(1)) if match else None,
+        firmware=result.firmware,
+        redfish=result.protocol == PROTOCOL_REDFISH,
+    )
+
+
+async def async_probe_capabilities(
+    hass: HomeAssistant, host: str, port: int = DEFAULT_PORT
+) -> IloCapabilities | None:
+    """Probe generatie, firmware en Redfish support; None als de iLO niet antwoordt."""
+    result = await async_probe_host(
+        async_get_clientsession(hass, verify_ssl=False), host, port, DEFAULT_TIMEOUT
+    )
+    return capabilities_from_scan(result) if result is not None else None
+
+
+async def async_ensure_capabilities(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Probe een ``auto`` entry zonder gecachete capabilities en bewaar het resultaat.
+
+    Een mislukte probe wordt niet bewaard: deze run gebruikt RIBCL en de
+    volgende setup probeert het opnieuw.
+    """
+    protocol = entry.options.get(
+        CONF_PROTOCOL, entry.data.get(CONF_PROTOCOL, DEFAULT_PROTOCOL)
+    )
+    if protocol != PROTOCOL_AUTO or CONF_CAPABILITIES in entry.data:
+        return
+    capabilities = await async_probe_capabilities(
+        hass, entry.data[CONF_HOST], entry.data.get(CONF_PORT, DEFAULT_PORT)
+    )
+    if capabilities is None:
+        _LOGGER.debug("Could not probe %s, using RIBCL for now", entry.data[CONF_HOST])
+        return
+    _LOGGER.debug("Capabilities of %s: %s", entry.data[CONF_HOST], capabilities)
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, CONF_CAPABILITIES: capabilities.as_dict()}
+    )
+
+
+def _serial_number(host_data: list[dict[str, Any]] | None) -> str | None:
+    """Serienummer uit het SMBIOS type 1 (System Information) record."""
+    for record in host_data or []:
+        if record.get("type") == 1 and (serial := record.get("Serial Number")):
+            return serial.strip() or None
+    return None
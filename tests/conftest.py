@@ -1,4 +1,4 @@
-"""Global fixtures for integration_blueprint integration."""
+"""Global fixtures for hp_ilo integration."""
 # Fixtures allow you to replace functions with a Mock object. You can perform
 # many options via the Mock to reflect a particular behavior from the original
 # function that you want to see without going through the function's actual logic.
@@ -14,10 +14,15 @@
 #
 # See here for more info: https://docs.pytest.org/en/latest/fixture.html (note that
 # pytest includes fixtures OOB which you can use as defined on this page)
+from collections import Counter
+import copy
 from unittest.mock import patch
 
 import pytest
 
+from .const import MOCK_RESPONSES
+from .simulator import IloSimulator
+
 pytest_plugins = "pytest_homeassistant_custom_component"
 
 
@@ -40,24 +45,51 @@ def skip_notifications_fixture():
         yield
 
 
-# This fixture, when used, will result in calls to async_get_data to return None. To have the call
-# return a value, we would add the `return_value=<VALUE_TO_RETURN>` parameter to the patch call.
-@pytest.fixture(name="bypass_get_data")
-def bypass_get_data_fixture():
-    """Skip calls to get data from API."""
-    with patch(
-        "custom_components.integration_blueprint.IntegrationBlueprintApiClient.async_get_data"
-    ):
-        yield
+class FakeIlo:
+    """Stand-in for hpilo.Ilo that supports delayed mode and counts calls."""
 
+    def __init__(self, responses):
+        self.responses = responses
+        self.delayed = False
+        self.calls = Counter()
+        self.requests = 0
+        self._queued = []
 
-# In this fixture, we are forcing calls to async_get_data to raise an Exception. This is useful
-# for exception handling.
-@pytest.fixture(name="error_on_get_data")
-def error_get_data_fixture():
-    """Simulate error when retrieving data from API."""
-    with patch(
-        "custom_components.integration_blueprint.IntegrationBlueprintApiClient.async_get_data",
-        side_effect=Exception,
-    ):
-        yield
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            self.calls[name] += 1
+            if self.delayed:
+                self._queued.append(name)
+                return None
+            self.requests += 1
+            return copy.deepcopy(self.responses.get(name))
+
+        return method
+
+    def call_delayed(self):
+        """Answer all queued calls in one request."""
+        queued, self._queued = self._queued, []
+        self.requests += 1
+        return [copy.deepcopy(self.responses.get(name)) for name in queued]
+
+
+# Patches hpilo.Ilo in the connection pool; the yielded FakeIlo records every call.
+@pytest.fixture(name="mock_ilo")
+def mock_ilo_fixture():
+    """Patch hpilo.Ilo with a client that returns canned data."""
+    ilo = FakeIlo(copy.deepcopy(MOCK_RESPONSES))
+    with patch("custom_components.hp_ilo.connection.hpilo.Ilo", return_value=ilo):
+        yield ilo
+
+
+# Real sockets: the simulator listens on a local HTTPS port.
+@pytest.fixture(name="ilo_simulator")
+async def ilo_simulator_fixture(socket_enabled):
+    """Run the iLO simulator (RIBCL and Redfish) on a local HTTPS port."""
+    simulator = IloSimulator()
+    await simulator.async_start()
+    yield simulator
+    await simulator.async_stop()
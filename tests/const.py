@@ -1,5 +1,52 @@
-"""Constants for integration_blueprint tests."""
-from custom_components.integration_blueprint.const import CONF_PASSWORD, CONF_USERNAME
+"""Constants for hp_ilo tests."""
+from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
 
 # Mock config data to be used across multiple tests
-MOCK_CONFIG = {CONF_USERNAME: "test_username", CONF_PASSWORD: "test_password"}
+MOCK_ENTRY_DATA = {
+    CONF_HOST: "ilo.example.test",
+    CONF_PORT: 443,
+    CONF_USERNAME: "Administrator",
+    CONF_PASSWORD: "secret",
+    CONF_NAME: "Test iLO",
+}
+
+MOCK_HEALTH = {
+    "temperature": {
+        "01-Inlet Ambient": {
+            "label": "01-Inlet Ambient",
+            "status": "OK",
+            "currentreading": (21, "Celsius"),
+        },
+        "02-CPU 1": {
+            "label": "02-CPU 1",
+            "status": "OK",
+            "currentreading": (40, "Celsius"),
+        },
+    },
+    "fans": {
+        "Fan 1": {"label": "Fan 1", "status": "OK", "speed": (23, "Percentage")},
+    },
+    "health_at_a_glance": {"status": "OK"},
+}
+
+# Return values of the python-hpilo calls the coordinator makes
+MOCK_RESPONSES = {
+    "get_embedded_health": MOCK_HEALTH,
+    "get_host_power_status": "ON",
+    "get_power_readings": {"present_power_reading": (180, "Watts")},
+    "get_server_power_on_time": 1234,
+    "get_fw_version": {
+        "firmware_version": "2.82",
+        "management_processor": "iLO4",
+        "license_type": "iLO Advanced",
+    },
+    "get_product_name": "ProLiant DL380 Gen9",
+    "get_host_data": [
+        {"type": 0, "Family": "P89", "Date": "10/21/2019"},
+        {
+            "type": 1,
+            "Product Name": "ProLiant DL380 Gen9",
+            "Serial Number": "CZJ00000XX      ",
+        },
+    ],
+}
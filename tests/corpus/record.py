@@ -0,0 +1,100 @@
+"""Record one poll batch from a real iLO into the benchmark corpus.
+
+    python tests/corpus/record.py ilo.example.net --generation ilo4
+
+Sends the same RIBCL document the coordinator sends for a full poll
+(every tier plus the identity calls) and saves the raw reply with
+python-hpilo's ``save_response``, the format ``read_response`` replays.
+Serial numbers, UUIDs, MAC and IP addresses and host names are
+anonymized before it is written to ``tests/corpus/<generation>.xml``.
+"""
+from __future__ import annotations
+
+import argparse
+import getpass
+from pathlib import Path
+import re
+import tempfile
+
+import hpilo
+
+from custom_components.hp_ilo.const import TIER_INVENTORY, TIER_POWER, TIER_THERMAL
+from custom_components.hp_ilo.transport import RIBCL_IDENTITY_CALLS, RIBCL_TIER_CALLS
+
+CORPUS = Path(__file__).parent
+
+# (pattern, replacement) pairs, applied in order
+ANONYMIZE = [
+    (re.compile(r'(NAME="Serial Number" VALUE=")[^"]*'), r"\1CZJ00000XX      "),
+    (re.compile(r'(SERIAL_NUMBER VALUE = ")[^"]*'), r"\g<1>5DMVV0XXXXXXXX"),
+    (re.compile(r'(NAME="UUID" VALUE=")[^"]*'), r"\g<1>00000000-0000-0000-0000-000000000000"),
+    (re.compile(r'(NAME="Product ID" VALUE=")[^"]*'), r"\g<1>000000-B21"),
+    (re.compile(r"\b(?:[0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2}\b"), "00:00:00:00:00:00"),
+    (re.compile(r"(?<![\d.])(?:\d{1,3}\.){3}\d{1,3}(?![\d.])"), "192.0.2.1"),
+    (re.compile(r"\b[\w-]+(?:\.[\w-]+)+\.(?:com|net|org|local|lan|internal)\b"), "ilo.example.net"),
+]
+
+
+def anonymize(data: str) -> str:
+    """Strip everything that identifies a server or network."""
+    for pattern, replacement in ANONYMIZE:
+        data = pattern.sub(replacement, data)
+    return data
+
+
+def strip_http(data: str) -> str:
+    """Drop the HTTP headers and chunk sizes; the XML replays on its own.
+
+    Anonymizing changes lengths, so a chunked body would no longer parse.
+    """
+    if not data.startswith("HTTP/"):
+        return data
+    headers, body = data.split("\r\n\r\n", 1)
+    if "chunked" not in headers.lower():
+        return body
+    xml = ""
+    while body:
+        size, body = body.split("\r\n", 1)
+        if not (length := int(size, 16)):
+            break
+        xml += body[:length]
+        body = body[length + 2 :]
+    return xml
+
+
+def record(host: str, login: str, password: str, port: int) -> str:
+    """One full poll, as the raw RIBCL reply."""
+    methods = [
+        method
+        for tier in (TIER_POWER, TIER_THERMAL, TIER_INVENTORY)
+        for method in RIBCL_TIER_CALLS[tier]
+    ] + list(RIBCL_IDENTITY_CALLS)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "reply.xml"
+        ilo = hpilo.Ilo(host, login=login, password=password, port=port)
+        # Detect the protocol first, or its reply ends up in the file too
+        ilo._detect_protocol()
+        ilo.save_response = str(path)
+        ilo.delayed = True
+        for method in methods:
+            getattr(ilo, method)()
+        ilo.call_delayed()
+        return path.read_bytes().decode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n")[0])
+    parser.add_argument("host")
+    parser.add_argument("--generation", required=True, help="e.g. ilo4")
+    parser.add_argument("--login", default="Administrator")
+    parser.add_argument("--port", type=int, default=443)
+    args = parser.parse_args()
+
+    data = record(args.host, args.login, getpass.getpass(), args.port)
+    target = CORPUS / f"{args.generation}.xml"
+    target.write_text(anonymize(strip_http(data)), newline="")
+    print(f"Wrote {target} ({target.stat().st_size} bytes); review it before committing")
+
+
+if __name__ == "__main__":
+    main()
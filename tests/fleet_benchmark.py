@@ -0,0 +1,238 @@
+"""Fleet load benchmark: N hp_ilo entries against local iLO simulators.
+
+Run from the repository root::
+
+    python -m tests.fleet_benchmark --entries 50 --duration 120 --latency 0.3
+
+Every entry gets its own simulator (see ``tests/simulator.py``) on a
+local HTTPS port. After setup the benchmark lets the fleet scheduler run
+for ``--duration`` seconds and reports:
+
+* setup time and poll throughput (polls per second, failures),
+* event-loop lag (how late a 50 ms timer fires),
+* executor saturation (threads, queued jobs, RIBCL executor wait),
+* state writes per minute.
+
+The numbers depend on the machine; only compare runs made on the same host.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+import json
+import statistics
+import tempfile
+import time
+from typing import Any
+from unittest.mock import patch
+
+from aiohttp.resolver import ThreadedResolver
+from homeassistant import loader
+from homeassistant.const import CONF_HOST, CONF_PORT, EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant, callback
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.hp_ilo.const import (
+    CONF_INVENTORY_INTERVAL,
+    CONF_POWER_INTERVAL,
+    CONF_PROTOCOL,
+    CONF_THERMAL_INTERVAL,
+    DOMAIN,
+    PROTOCOL_REDFISH,
+    PROTOCOL_RIBCL,
+)
+
+from .const import MOCK_ENTRY_DATA
+from .simulator import IloSimulator
+
+LAG_PROBE_INTERVAL = 0.05
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class _Probe:
+    """Sample event-loop lag and executor load during the run."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.lag: list[float] = []
+        self.executor_threads = 0
+        self.executor_queue: list[int] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + LAG_PROBE_INTERVAL
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            self.lag.append(max(0.0, loop.time() - expected))
+            # hass.async_add_executor_job runs on the default executor
+            if (executor := getattr(loop, "_default_executor", None)) is not None:
+                self.executor_threads = max(self.executor_threads, len(executor._threads))
+                self.executor_queue.append(executor._work_queue.qsize())
+
+
+def _count_state_writes(hass: HomeAssistant) -> tuple[list[int], Callable[[], None]]:
+    counter = [0]
+
+    @callback
+    def _state_changed(event) -> None:
+        counter[0] += 1
+
+    return counter, hass.bus.async_listen(EVENT_STATE_CHANGED, _state_changed)
+
+
+async def async_run(args: argparse.Namespace) -> dict[str, Any]:
+    """Set up the fleet, let it run and return the report."""
+    simulators = [
+        IloSimulator(
+            temperatures=args.temperatures,
+            fans=args.fans,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            jitter=args.jitter,
+            seed=index,
+        )
+        for index in range(args.entries)
+    ]
+    await asyncio.gather(*(simulator.async_start() for simulator in simulators))
+
+    # No zeroconf integration here; the simulators are on 127.0.0.1 anyway
+    with tempfile.TemporaryDirectory() as config_dir, patch(
+        "homeassistant.helpers.aiohttp_client._async_make_resolver",
+        return_value=ThreadedResolver(),
+    ):
+        async with async_test_home_assistant(config_dir=config_dir) as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+            entries = []
+            for index, simulator in enumerate(simulators):
+                entry = MockConfigEntry(
+                    domain=DOMAIN,
+                    data={
+                        **MOCK_ENTRY_DATA,
+                        CONF_HOST: "127.0.0.1",
+                        CONF_PORT: simulator.port,
+                        CONF_PROTOCOL: args.protocol,
+                    },
+                    options={
+                        CONF_POWER_INTERVAL: args.power_interval,
+                        CONF_THERMAL_INTERVAL: args.thermal_interval,
+                        CONF_INVENTORY_INTERVAL: 3600,
+                    },
+                    title=f"iLO {index}",
+                    entry_id=f"bench{index}",
+                )
+                entry.add_to_hass(hass)
+                entries.append(entry)
+
+            probe = _Probe(hass)
+            probe.start()
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(hass.config_entries.async_setup(entry.entry_id) for entry in entries)
+            )
+            await hass.async_block_till_done()
+            setup_time = time.perf_counter() - start
+
+            coordinators = [
+                hass.data[DOMAIN][entry.entry_id]["coordinator"]
+                for entry in entries
+                if entry.entry_id in hass.data.get(DOMAIN, {})
+            ]
+            polls_before = sum(c.stats.polls for c in coordinators)
+            writes, unsub = _count_state_writes(hass)
+            probe.lag.clear()
+            await asyncio.sleep(args.duration)
+            unsub()
+            await probe.stop()
+
+            polls = sum(c.stats.polls for c in coordinators) - polls_before
+            failures = sum(c.stats.failures for c in coordinators)
+            durations = [
+                c.stats.poll_duration.total / c.stats.poll_duration.count
+                for c in coordinators
+                if c.stats.poll_duration.count
+            ]
+            waits = [c.stats.executor_wait for c in coordinators]
+            wait_count = sum(w.count for w in waits)
+            scheduler = coordinators[0].scheduler.stats if coordinators else {}
+            entities = len(hass.states.async_all())
+
+            report = {
+                "entries": args.entries,
+                "loaded": len(coordinators),
+                "protocol": args.protocol,
+                "entities": entities,
+                "setup_time": round(setup_time, 3),
+                "polls": polls,
+                "polls_per_second": round(polls / args.duration, 2),
+                "failures": failures,
+                "mean_poll_duration": round(statistics.fmean(durations), 4)
+                if durations
+                else None,
+                "loop_lag_mean": round(statistics.fmean(probe.lag), 4) if probe.lag else 0.0,
+                "loop_lag_p99": round(_percentile(probe.lag, 0.99), 4),
+                "loop_lag_max": round(max(probe.lag, default=0.0), 4),
+                "executor_threads": probe.executor_threads,
+                "executor_queue_max": max(probe.executor_queue, default=0),
+                "executor_wait_mean": round(sum(w.total for w in waits) / wait_count, 4)
+                if wait_count
+                else None,
+                "executor_wait_max": round(max((w.max for w in waits), default=0.0), 4),
+                "scheduler_max_lag": scheduler.get("max_lag"),
+                "state_writes_per_minute": round(writes[0] * 60 / args.duration, 1),
+            }
+
+            for entry in entries:
+                await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+
+    await asyncio.gather(*(simulator.async_stop() for simulator in simulators))
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n")[0])
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds")
+    parser.add_argument(
+        "--protocol", choices=[PROTOCOL_RIBCL, PROTOCOL_REDFISH], default=PROTOCOL_RIBCL
+    )
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--temperatures", type=int, default=20)
+    parser.add_argument("--fans", type=int, default=6)
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--power-interval", type=int, default=10)
+    parser.add_argument("--thermal-interval", type=int, default=30)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(async_run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    width = max(map(len, report))
+    for key, value in report.items():
+        print(f"{key:<{width}}  {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,499 @@
+"""Local iLO simulator: RIBCL and Redfish over HTTPS, plus the SSE event stream.
+
+One :class:`IloSimulator` is one iLO on its own port. python-hpilo talks
+to ``POST /ribcl`` (HTTP RIBCL, iLO 3 and newer) and the Redfish client to
+``/redfish/v1/``, so an entry can point at it with either protocol. Like a
+real iLO, the Redfish service root and ``/xmldata?item=all`` answer
+without a login; the subnet scan fingerprints them.
+Latency, errors and the number of sensors are configurable, which makes
+it usable both for tests and for ``tests/fleet_benchmark.py``.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import functools
+import hashlib
+import json
+import random
+import ssl
+import tempfile
+from typing import Any
+from xml.etree import ElementTree
+
+from aiohttp import web
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+TOKEN = "stand-in-token"
+SSE_URI = "/redfish/v1/EventService/SSE/"
+SYSTEM_URI = "/redfish/v1/Systems/1/"
+
+MODEL = "ProLiant DL360 Gen10"
+SERIAL_NUMBER = "CZJ0000000"
+FIRMWARE_VERSION = "2.72"
+
+# RIBCL write commands and the power state they leave behind
+RIBCL_POWER_COMMANDS = {
+    "PRESS_PWR_BTN": None,
+    "HOLD_PWR_BTN": "Off",
+    "WARM_BOOT_SERVER": "On",
+    "COLD_BOOT_SERVER": "On",
+    "RESET_SERVER": "On",
+}
+# Redfish ResetType -> power state
+REDFISH_RESET_TYPES = {
+    "On": "On",
+    "ForceOff": "Off",
+    "GracefulShutdown": "Off",
+    "PushPowerButton": None,
+    "ForceRestart": "On",
+}
+
+
+@functools.cache
+def _self_signed_context() -> ssl.SSLContext:
+    """Server TLS context with a throwaway self-signed certificate."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    with tempfile.NamedTemporaryFile() as cert_file, tempfile.NamedTemporaryFile() as key_file:
+        cert_file.write(cert.public_bytes(serialization.Encoding.PEM))
+        key_file.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+        cert_file.flush()
+        key_file.flush()
+        context.load_cert_chain(cert_file.name, key_file.name)
+    return context
+
+
+def _ribcl_message(payload: str = "", status: int = 0, message: str = "No error") -> str:
+    """One RIBCL response document, as the iLO sends one per command."""
+    return (
+        '<?xml version="1.0"?>\r\n<RIBCL VERSION="2.23">\r\n'
+        f"<RESPONSE\r\n    STATUS=\"0x{status:04X}\"\r\n    MESSAGE='{message}'\r\n     />\r\n"
+        f"{payload}</RIBCL>\r\n"
+    )
+
+
+def _element(
+    tag: str, parent: ElementTree.Element | None = None, **attrib: Any
+) -> ElementTree.Element:
+    """RIBCL style element: upper case attributes with string values."""
+    attrib = {key.upper(): str(value) for key, value in attrib.items()}
+    if parent is None:
+        return ElementTree.Element(tag, attrib)
+    return ElementTree.SubElement(parent, tag, attrib)
+
+
+class IloSimulator:
+    """Serve the RIBCL commands and Redfish resources the integration uses.
+
+    ``state`` holds the system state and power actions change it;
+    ``async_push`` sends an event to every connected SSE client, like
+    iLO 5 does after a power or health change. Every request except the
+    event stream is delayed by ``latency`` seconds and fails with a 503
+    with probability ``error_rate``. Readings move by up to ``jitter``
+    per request, so a benchmark sees changing states. A power action
+    takes effect ``power_delay`` seconds after the command, like a server
+    that needs time to boot or shut down. With ``redfish`` off it acts
+    like an iLO 3: RIBCL only, every Redfish resource is a 404.
+    """
+
+    def __init__(
+        self,
+        *,
+        temperatures: int = 1,
+        fans: int = 1,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        jitter: float = 0.0,
+        power_delay: float = 0.0,
+        redfish: bool = True,
+        password: str = "secret",
+        seed: int = 0,
+    ) -> None:
+        self.state: dict[str, Any] = {
+            "PowerState": "On",
+            "Health": "OK",
+            "Watts": 182,
+            "PowerOnMinutes": 1234,
+        }
+        self.temperatures = temperatures
+        self.fans = fans
+        self.latency = latency
+        self.error_rate = error_rate
+        self.jitter = jitter
+        self.power_delay = power_delay
+        self.redfish = redfish
+        # Last power meter sample; None is the latest 5-minute boundary
+        self.history_end: datetime.datetime | None = None
+        self.password = password
+        self.requests: list[str] = []
+        self.commands: list[str] = []
+        self.errors = 0
+        self.port = 0
+        self._random = random.Random(seed)
+        self._streams: list[asyncio.Queue] = []
+        self._power_timers: list[asyncio.TimerHandle] = []
+        self._runner: web.AppRunner | None = None
+        self.stream_connected = asyncio.Event()
+
+    async def async_start(self) -> None:
+        app = web.Application(middlewares=[self._conditions])
+        app.router.add_post("/ribcl", self._ribcl)
+        app.router.add_get("/xmldata", self._xmldata)
+        app.router.add_post("/redfish/v1/SessionService/Sessions/", self._login)
+        app.router.add_delete("/redfish/v1/SessionService/Sessions/1/", self._ok)
+        app.router.add_post(
+            f"{SYSTEM_URI}Actions/ComputerSystem.Reset/", self._reset
+        )
+        app.router.add_get(SSE_URI, self._sse)
+        app.router.add_get("/redfish/v1/{path:.*}", self._resource)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(
+            self._runner, "127.0.0.1", 0, ssl_context=_self_signed_context()
+        )
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def async_stop(self) -> None:
+        for timer in self._power_timers:
+            timer.cancel()
+        for queue in self._streams:
+            queue.put_nowait(None)
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def async_push(self, *events: dict[str, Any]) -> None:
+        """Send one SSE message with the given Redfish events."""
+        await self.async_push_raw(
+            json.dumps({"@odata.type": "#Event.v1_0_0.Event", "Events": list(events)})
+        )
+
+    async def async_push_raw(self, payload: str) -> None:
+        """Send one SSE message with ``payload`` as its data, as is."""
+        for queue in self._streams:
+            queue.put_nowait(payload)
+
+    # -- Sensors ----------------------------------------------------------
+
+    def _reading(self, base: float) -> float:
+        if not self.jitter:
+            return base
+        return round(base + self._random.uniform(-self.jitter, self.jitter), 1)
+
+    def _temperature_sensors(self) -> list[tuple[str, float]]:
+        labels = ["01-Inlet Ambient"] + [
+            f"{index + 1:02d}-Sensor {index}" for index in range(1, self.temperatures)
+        ]
+        return [
+            (label, self._reading(21 + 3 * index)) for index, label in enumerate(labels)
+        ]
+
+    def _fan_sensors(self) -> list[tuple[str, float]]:
+        return [
+            (f"Fan {index + 1}", self._reading(23)) for index in range(self.fans)
+        ]
+
+    def _set_power(self, state: str | None) -> None:
+        """``None`` is a power button press: it toggles."""
+        if state is None:
+            state = "Off" if self.state["PowerState"] == "On" else "On"
+        if self.power_delay:
+            self._power_timers.append(
+                asyncio.get_running_loop().call_later(
+                    self.power_delay, self.state.__setitem__, "PowerState", state
+                )
+            )
+        else:
+            self.state["PowerState"] = state
+
+    # -- HTTP -------------------------------------------------------------
+
+    @web.middleware
+    async def _conditions(self, request: web.Request, handler) -> web.StreamResponse:
+        if request.path == SSE_URI:
+            return await handler(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=503)
+        return await handler(request)
+
+    # -- RIBCL ------------------------------------------------------------
+
+    async def _ribcl(self, request: web.Request) -> web.StreamResponse:
+        self.requests.append("ribcl")
+        body = "".join(self._ribcl_messages(await request.read()))
+        # python-hpilo expects a chunked response and reads until the
+        # connection closes (it always sends "Connection: Close").
+        response = web.StreamResponse(headers={"Content-Type": "text/xml"})
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        await response.write(body.encode())
+        await response.write_eof()
+        return response
+
+    def _ribcl_messages(self, body: bytes) -> list[str]:
+        login = ElementTree.fromstring(body).find("LOGIN")
+        if login is None:
+            # python-hpilo's protocol detection sends an empty document
+            return [_ribcl_message(status=0x0001, message="Syntax error: Line #0: syntax error near \">\" in the line: \"\"")]
+        if login.get("PASSWORD") != self.password:
+            return [_ribcl_message(status=0x005F, message="Login failed.")]
+        return [
+            self._ribcl_command(command)
+            for section in login
+            for command in section
+        ]
+
+    def _ribcl_command(self, command: ElementTree.Element) -> str:
+        self.commands.append(command.tag)
+        if command.tag in RIBCL_POWER_COMMANDS:
+            self._set_power(RIBCL_POWER_COMMANDS[command.tag])
+            return _ribcl_message()
+        if command.tag == "SET_HOST_POWER":
+            self._set_power("On" if command.get("HOST_POWER") == "Yes" else "Off")
+            return _ribcl_message()
+        builder = getattr(self, f"_ribcl_{command.tag.lower()}", None)
+        if builder is None:
+            return _ribcl_message(
+                status=0x0001, message=f"Syntax error: {command.tag} is not supported"
+            )
+        return _ribcl_message(ElementTree.tostring(builder(), encoding="unicode") + "\r\n")
+
+    def _ribcl_get_host_power_status(self) -> ElementTree.Element:
+        return _element("GET_HOST_POWER", host_power=self.state["PowerState"].upper())
+
+    def _ribcl_get_power_readings(self) -> ElementTree.Element:
+        readings = _element("GET_POWER_READINGS")
+        _element("PRESENT_POWER_READING", readings, value=self.state["Watts"], unit="Watts")
+        _element("AVERAGE_POWER_READING", readings, value=self.state["Watts"], unit="Watts")
+        return readings
+
+    def _ribcl_get_server_power_on_time(self) -> ElementTree.Element:
+        return _element("SERVER_POWER_ON_MINUTES", value=self.state["PowerOnMinutes"])
+
+    def _ribcl_get_fw_version(self) -> ElementTree.Element:
+        return _element(
+            "GET_FW_VERSION",
+            firmware_version=FIRMWARE_VERSION,
+            firmware_date="Jun 15 2022",
+            management_processor="iLO5",
+            license_type="iLO Advanced",
+        )
+
+    def _ribcl_get_product_name(self) -> ElementTree.Element:
+        product = _element("GET_PRODUCT_NAME")
+        _element("PRODUCT_NAME", product, value=MODEL)
+        return product
+
+    def _ribcl_get_host_data(self) -> ElementTree.Element:
+        host_data = _element("GET_HOST_DATA")
+        bios = _element("SMBIOS_RECORD", host_data, type=0)
+        bios.append(ElementTree.Element("FIELD", NAME="Family", VALUE="U32"))
+        record = _element("SMBIOS_RECORD", host_data, type=1)
+        for name, value in (
+            ("Manufacturer", "HPE"),
+            ("Product Name", MODEL),
+            ("Serial Number", SERIAL_NUMBER),
+        ):
+            record.append(ElementTree.Element("FIELD", NAME=name, VALUE=value))
+        return host_data
+
+    def _ribcl_get_embedded_health(self) -> ElementTree.Element:
+        health = _element("GET_EMBEDDED_HEALTH_DATA")
+        fans = _element("FANS", health)
+        for label, speed in self._fan_sensors():
+            fan = _element("FAN", fans)
+            _element("ZONE", fan, value="System")
+            _element("LABEL", fan, value=label)
+            _element("STATUS", fan, value="OK")
+            _element("SPEED", fan, value=speed, unit="Percentage")
+        temperature = _element("TEMPERATURE", health)
+        for label, reading in self._temperature_sensors():
+            temp = _element("TEMP", temperature)
+            _element("LABEL", temp, value=label)
+            _element("LOCATION", temp, value="System")
+            _element("STATUS", temp, value="OK")
+            _element("CURRENTREADING", temp, value=reading, unit="Celsius")
+            _element("CAUTION", temp, value=80, unit="Celsius")
+            _element("CRITICAL", temp, value=90, unit="Celsius")
+        glance = _element("HEALTH_AT_A_GLANCE", health)
+        _element("FANS", glance, status=self.state["Health"])
+        _element("TEMPERATURE", glance, status=self.state["Health"])
+        return health
+
+    # -- Redfish ----------------------------------------------------------
+
+    def _resources(self) -> dict[str, dict[str, Any]]:
+        return {
+            "": {
+                "ProtocolFeaturesSupported": {"SelectQuery": False},
+                "Product": MODEL,
+                "Vendor": "HPE",
+                "Oem": {
+                    "Hpe": {
+                        "Manager": [
+                            {"ManagerType": "iLO 5", "ManagerFirmwareVersion": FIRMWARE_VERSION}
+                        ]
+                    }
+                },
+            },
+            "Systems/": {"Members": [{"@odata.id": SYSTEM_URI}]},
+            "Chassis/": {"Members": [{"@odata.id": "/redfish/v1/Chassis/1/"}]},
+            "Managers/": {"Members": [{"@odata.id": "/redfish/v1/Managers/1/"}]},
+            "Managers/1/": {"Model": "iLO 5", "FirmwareVersion": f"iLO 5 v{FIRMWARE_VERSION}"},
+            "Systems/1/": {
+                "Model": MODEL,
+                "SerialNumber": SERIAL_NUMBER,
+                "PowerState": self.state["PowerState"],
+                "Status": {"Health": self.state["Health"]},
+            },
+            "Chassis/1/Thermal/": {
+                "Temperatures": [
+                    {
+                        "Name": label,
+                        "ReadingCelsius": reading,
+                        "Status": {"State": "Enabled", "Health": "OK"},
+                    }
+                    for label, reading in self._temperature_sensors()
+                ],
+                "Fans": [
+                    {
+                        "Name": label,
+                        "Reading": speed,
+                        "Status": {"State": "Enabled", "Health": "OK"},
+                    }
+                    for label, speed in self._fan_sensors()
+                ],
+            },
+            "Chassis/1/Power/": {
+                "PowerControl": [{"PowerConsumedWatts": self.state["Watts"]}]
+            },
+            "Chassis/1/Power/PowerMeter/": {"PowerDetail": self._power_history()},
+            "EventService/": {"ServerSentEventUri": SSE_URI},
+        }
+
+    def _power_history(self) -> list[dict[str, Any]]:
+        """24 hours of 5-minute samples at the current draw, like iLO 4/5."""
+        end = self.history_end
+        if end is None:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            end = now.replace(minute=now.minute - now.minute % 5, second=0, microsecond=0)
+        watts = self.state["Watts"]
+        return [
+            {
+                "Time": (end - datetime.timedelta(minutes=5 * index)).strftime(
+                    "%Y-%m-%dT%H:%M:%SZ"
+                ),
+                "Average": watts,
+                "Minimum": watts - 10,
+                "Peak": watts + 20,
+            }
+            for index in reversed(range(288))
+        ]
+
+    def _authorized(self, request: web.Request) -> bool:
+        return request.headers.get("X-Auth-Token") == TOKEN
+
+    async def _login(self, request: web.Request) -> web.Response:
+        self.requests.append("login")
+        body = await request.json()
+        if body.get("Password") != self.password:
+            return web.Response(status=401)
+        return web.json_response(
+            {},
+            status=201,
+            headers={
+                "X-Auth-Token": TOKEN,
+                "Location": "/redfish/v1/SessionService/Sessions/1/",
+            },
+        )
+
+    async def _ok(self, request: web.Request) -> web.Response:
+        return web.Response(status=200)
+
+    async def _reset(self, request: web.Request) -> web.Response:
+        if not self._authorized(request):
+            return web.Response(status=401)
+        reset_type = (await request.json()).get("ResetType")
+        self.commands.append(reset_type)
+        if reset_type not in REDFISH_RESET_TYPES:
+            return web.Response(status=400)
+        self._set_power(REDFISH_RESET_TYPES[reset_type])
+        return web.json_response({})
+
+    async def _resource(self, request: web.Request) -> web.Response:
+        path = request.match_info["path"]
+        self.requests.append(path)
+        # The service root is public
+        if path and not self._authorized(request):
+            return web.Response(status=401)
+        resources = self._resources()
+        if not self.redfish or path not in resources:
+            return web.Response(status=404)
+        body = json.dumps(resources[path])
+        # Like iLO 5: one ETag per resource, 304 when it did not change
+        etag = f'W/"{hashlib.md5(body.encode()).hexdigest()[:8]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            text=body, content_type="application/json", headers={"ETag": etag}
+        )
+
+    async def _xmldata(self, request: web.Request) -> web.Response:
+        """Unauthenticated identity document, as used for iLO discovery."""
+        self.requests.append("xmldata")
+        if request.query.get("item") != "all":
+            return web.Response(status=404)
+        generation = 5 if self.redfish else 3
+        rimp = ElementTree.Element("RIMP")
+        hsi = ElementTree.SubElement(rimp, "HSI")
+        ElementTree.SubElement(hsi, "SBSN").text = SERIAL_NUMBER
+        ElementTree.SubElement(hsi, "SPN").text = MODEL
+        mp = ElementTree.SubElement(rimp, "MP")
+        ElementTree.SubElement(mp, "PN").text = (
+            f"Integrated Lights-Out {generation} (iLO {generation})"
+        )
+        ElementTree.SubElement(mp, "FWRI").text = FIRMWARE_VERSION
+        return web.Response(
+            body=ElementTree.tostring(rimp, xml_declaration=True), content_type="text/xml"
+        )
+
+    async def _sse(self, request: web.Request) -> web.StreamResponse:
+        if not self._authorized(request):
+            return web.Response(status=401)
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._streams.append(queue)
+        self.stream_connected.set()
+        await response.write(b": keepalive\n\n")
+        try:
+            while (payload := await queue.get()) is not None:
+                await response.write(f"id: 1\ndata: {payload}\n\n".encode())
+        finally:
+            self._streams.remove(queue)
+        return response
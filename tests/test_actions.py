@@ -0,0 +1,123 @@
+"""Test the per-host hp_ilo power action queue."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.hp_ilo.actions import (
+    IloActionQueue,
+    IloActionRejected,
+    IloPowerConvergence,
+)
+
+
+class FakeIlo:
+    """Record power actions; each one takes until ``release`` is set."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+        self.running = 0
+        self.max_running = 0
+        self.release = asyncio.Event()
+
+    def send(self, action: str):
+        async def _send() -> None:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            await self.release.wait()
+            self.sent.append(action)
+            self.running -= 1
+
+        return _send
+
+
+async def test_duplicates_are_coalesced():
+    """A double click sends the action once; both callers wait for it."""
+    queue = IloActionQueue()
+    ilo = FakeIlo()
+    first = asyncio.create_task(queue.async_submit("warm_boot", ilo.send("warm_boot")))
+    second = asyncio.create_task(queue.async_submit("warm_boot", ilo.send("warm_boot")))
+    await asyncio.sleep(0)
+    assert not second.done()
+
+    ilo.release.set()
+    assert await first is True
+    assert await second is False
+    # Within the window a repeat is not sent either
+    assert await queue.async_submit("warm_boot", ilo.send("warm_boot")) is False
+
+    assert ilo.sent == ["warm_boot"]
+    assert queue.stats["executed"] == 1
+    assert queue.stats["coalesced"] == 2
+
+
+async def test_contradictory_actions_are_rejected():
+    """Power on is refused while a shutdown is queued or just sent."""
+    queue = IloActionQueue()
+    ilo = FakeIlo()
+    shutdown = asyncio.create_task(
+        queue.async_submit("hard_shutdown", ilo.send("hard_shutdown"))
+    )
+    await asyncio.sleep(0)
+
+    with pytest.raises(IloActionRejected, match="conflicts with hard_shutdown"):
+        await queue.async_submit("warm_boot", ilo.send("warm_boot"))
+    ilo.release.set()
+    await shutdown
+    with pytest.raises(IloActionRejected):
+        await queue.async_submit("power_on", ilo.send("power_on"))
+
+    # After the window the opposite action is allowed again
+    with patch(
+        "custom_components.hp_ilo.actions.time.monotonic",
+        return_value=asyncio.get_running_loop().time() + 1000,
+    ):
+        assert await queue.async_submit("power_on", ilo.send("power_on")) is True
+    assert ilo.sent == ["hard_shutdown", "power_on"]
+    assert queue.stats["rejected"] == 2
+
+
+async def test_same_target_actions_are_serialized():
+    """Graceful then hard shutdown both go out, one at a time."""
+    queue = IloActionQueue()
+    ilo = FakeIlo()
+    graceful = asyncio.create_task(
+        queue.async_submit("press_pwr_button", ilo.send("press_pwr_button"))
+    )
+    hard = asyncio.create_task(queue.async_submit("hard_shutdown", ilo.send("hard_shutdown")))
+    await asyncio.sleep(0.01)
+    assert ilo.running == 1
+
+    ilo.release.set()
+    assert await asyncio.gather(graceful, hard) == [True, True]
+    assert ilo.sent == ["press_pwr_button", "hard_shutdown"]
+    assert ilo.max_running == 1
+    assert queue.stats["queue_latency"]["count"] == 2
+    assert queue.stats["queue_latency"]["max"] >= 0.01
+
+
+async def test_failed_action_is_not_remembered():
+    """A failed command reaches every caller and can be retried at once."""
+    queue = IloActionQueue()
+
+    async def fail() -> None:
+        raise ConnectionError("iLO unreachable")
+
+    with pytest.raises(ConnectionError):
+        await queue.async_submit("power_on", fail)
+    ilo = FakeIlo()
+    ilo.release.set()
+    assert await queue.async_submit("power_on", ilo.send("power_on")) is True
+    assert queue.stats["pending"] == []
+
+
+async def test_convergence_resolves_every_waiter():
+    """Waiters that timed out are skipped; the others get the outcome once."""
+    loop = asyncio.get_running_loop()
+    converge = IloPowerConvergence("OFF", 0.0)
+    gone, waiting = loop.create_future(), loop.create_future()
+    gone.cancel()
+    converge.waiters.extend([gone, waiting])
+    converge.resolve(True)
+    assert waiting.result() is True
+    assert converge.waiters == []
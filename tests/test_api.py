@@ -1,86 +1,204 @@
-"""Tests for integration_blueprint api."""
+"""Tests for the hp_ilo async Redfish client."""
 import asyncio
 
-import aiohttp
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import pytest
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMockResponse,
+)
+from yarl import URL
 
-from custom_components.integration_blueprint.api import IntegrationBlueprintApiClient
+from custom_components.hp_ilo.api import (
+    IloRedfishAuthError,
+    IloRedfishClient,
+    IloRedfishConnectionError,
+)
 
+BASE_URL = "https://ilo.example.test:443"
 
-async def test_api(hass, aioclient_mock, caplog):
-    """Test API calls."""
+SYSTEM = {
+    "Model": "ProLiant DL360 Gen10",
+    "SerialNumber": "CZJ0000000 ",
+    "PowerState": "On",
+    "Status": {"Health": "OK", "HealthRollup": "Warning"},
+}
+THERMAL = {
+    "Temperatures": [
+        {"Name": "01-Inlet Ambient", "ReadingCelsius": 21, "Status": {"State": "Enabled", "Health": "OK"}},
+        {"Name": "05-P2 DIMM 1-6", "ReadingCelsius": None, "Status": {"State": "Absent"}},
+    ],
+    "Fans": [
+        {"Name": "Fan 1", "Reading": 23, "ReadingUnits": "Percent", "Status": {"State": "Enabled", "Health": "OK"}},
+    ],
+}
+POWER = {"PowerControl": [{"PowerConsumedWatts": 182}]}
+MANAGER = {"Model": "iLO 5", "FirmwareVersion": "iLO 5 v2.72"}
 
-    # To test the api submodule, we first create an instance of our API client
-    api = IntegrationBlueprintApiClient("test", "test", async_get_clientsession(hass))
 
-    # Use aioclient_mock which is provided by `pytest_homeassistant_custom_components`
-    # to mock responses to aiohttp requests. In this case we are telling the mock to
-    # return {"test": "test"} when a `GET` call is made to the specified URL. We then
-    # call `async_get_data` which will make that `GET` request.
+def _mock_redfish(aioclient_mock, select=False, status=200):
+    aioclient_mock.post(
+        f"{BASE_URL}/redfish/v1/SessionService/Sessions/",
+        status=201,
+        json={},
+        headers={
+            "X-Auth-Token": "token",
+            "Location": f"{BASE_URL}/redfish/v1/SessionService/Sessions/1/",
+        },
+    )
+    aioclient_mock.delete(f"{BASE_URL}/redfish/v1/SessionService/Sessions/1/")
     aioclient_mock.get(
-        "https://jsonplaceholder.typicode.com/posts/1", json={"test": "test"}
+        f"{BASE_URL}/redfish/v1/",
+        json={"ProtocolFeaturesSupported": {"SelectQuery": select}},
     )
-    assert await api.async_get_data() == {"test": "test"}
-
-    # We do the same for `async_set_title`. Note the difference in the mock call
-    # between the previous step and this one. We use `patch` here instead of `get`
-    # because we know that `async_set_title` calls `api_wrapper` with `patch` as the
-    # first parameter
-    aioclient_mock.patch("https://jsonplaceholder.typicode.com/posts/1")
-    assert await api.async_set_title("test") is None
-
-    # In order to get 100% coverage, we need to test `api_wrapper` to test the code
-    # that isn't already called by `async_get_data` and `async_set_title`. Because the
-    # only logic that lives inside `api_wrapper` that is not being handled by a third
-    # party library (aiohttp) is the exception handling, we also want to simulate
-    # raising the exceptions to ensure that the function handles them as expected.
-    # The caplog fixture allows access to log messages in tests. This is particularly
-    # useful during exception handling testing since often the only action as part of
-    # exception handling is a logging statement
-    caplog.clear()
-    aioclient_mock.put(
-        "https://jsonplaceholder.typicode.com/posts/1", exc=asyncio.TimeoutError
+    aioclient_mock.get(
+        f"{BASE_URL}/redfish/v1/Systems/",
+        json={"Members": [{"@odata.id": "/redfish/v1/Systems/1/"}]},
     )
-    assert (
-        await api.api_wrapper("put", "https://jsonplaceholder.typicode.com/posts/1")
-        is None
+    aioclient_mock.get(
+        f"{BASE_URL}/redfish/v1/Chassis/",
+        json={"Members": [{"@odata.id": "/redfish/v1/Chassis/1/"}]},
     )
-    assert (
-        len(caplog.record_tuples) == 1
-        and "Timeout error fetching information from" in caplog.record_tuples[0][2]
+    aioclient_mock.get(
+        f"{BASE_URL}/redfish/v1/Managers/",
+        json={"Members": [{"@odata.id": "/redfish/v1/Managers/1/"}]},
     )
+    for path, body in (
+        ("/redfish/v1/Systems/1/", SYSTEM),
+        ("/redfish/v1/Chassis/1/Thermal/", THERMAL),
+        ("/redfish/v1/Chassis/1/Power/", POWER),
+        ("/redfish/v1/Managers/1/", MANAGER),
+    ):
+        aioclient_mock.get(
+            f"{BASE_URL}{path}",
+            status=status,
+            json=body if status == 200 else None,
+            headers={"ETag": f'W/"{path}"'},
+        )
 
-    caplog.clear()
-    aioclient_mock.post(
-        "https://jsonplaceholder.typicode.com/posts/1", exc=aiohttp.ClientError
+
+def _client(hass) -> IloRedfishClient:
+    return IloRedfishClient(
+        async_get_clientsession(hass), "ilo.example.test", 443, "Administrator", "secret"
     )
-    assert (
-        await api.api_wrapper("post", "https://jsonplaceholder.typicode.com/posts/1")
-        is None
+
+
+async def test_snapshot(hass, aioclient_mock):
+    """The Redfish snapshot uses the same keys as the RIBCL poll."""
+    _mock_redfish(aioclient_mock)
+    client = _client(hass)
+
+    data = await client.async_get_snapshot()
+
+    assert data["power_status"] == "ON"
+    assert data["power_usage"] == 182
+    assert data["health_summary"] == "Warning"
+    assert data["temperature"]["01-Inlet Ambient"]["currentreading"] == (21, "Celsius")
+    assert data["temperature"]["05-P2 DIMM 1-6"]["status"] == "Not Installed"
+    assert data["fans"]["Fan 1"]["speed"] == (23, "Percentage")
+    assert data["inventory"] == {"firmware_version": "iLO 5 v2.72"}
+
+    assert await client.async_get_inventory() == {
+        "model": "ProLiant DL360 Gen10",
+        "serial_number": "CZJ0000000",
+        "firmware_version": "iLO 5 v2.72",
+        "hw_version": "iLO 5",
+    }
+
+    # The session token is reused: one login, and it is sent on every GET
+    logins = [call for call in aioclient_mock.mock_calls if call[0].lower() == "post"]
+    assert len(logins) == 1
+    assert all(
+        call[3]["X-Auth-Token"] == "token"
+        for call in aioclient_mock.mock_calls
+        if call[0].lower() == "get"
     )
-    assert (
-        len(caplog.record_tuples) == 1
-        and "Error fetching information from" in caplog.record_tuples[0][2]
+
+    await client.async_logout()
+    assert aioclient_mock.mock_calls[-1][0].lower() == "delete"
+
+
+async def test_login_errors(hass, aioclient_mock):
+    """Bad credentials and unreachable hosts raise distinct errors."""
+    aioclient_mock.post(f"{BASE_URL}/redfish/v1/SessionService/Sessions/", status=401)
+    with pytest.raises(IloRedfishAuthError):
+        await _client(hass).async_login()
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.post(
+        f"{BASE_URL}/redfish/v1/SessionService/Sessions/", exc=TimeoutError
     )
+    with pytest.raises(IloRedfishConnectionError):
+        await _client(hass).async_login()
+
 
-    caplog.clear()
-    aioclient_mock.post("https://jsonplaceholder.typicode.com/posts/2", exc=Exception)
-    assert (
-        await api.api_wrapper("post", "https://jsonplaceholder.typicode.com/posts/2")
-        is None
+async def test_conditional_get(hass, aioclient_mock):
+    """Unchanged resources come back as 304 and reuse the cached object."""
+    _mock_redfish(aioclient_mock, select=True)
+    client = _client(hass)
+    first = await client.async_get_snapshot()
+    assert client.last_cycle["bytes"] > 0
+
+    # $select is used when the service root advertises it
+    thermal_call = next(
+        call for call in aioclient_mock.mock_calls if "Thermal" in str(call[1])
     )
-    assert (
-        len(caplog.record_tuples) == 1
-        and "Something really wrong happened!" in caplog.record_tuples[0][2]
+    assert "Temperatures/ReadingCelsius" in thermal_call[1].query["$select"]
+
+    aioclient_mock.clear_requests()
+    _mock_redfish(aioclient_mock, select=True, status=304)
+    second = await client.async_get_snapshot()
+
+    assert second == first
+    assert client.last_cycle["not_modified"] == 4
+    assert client.last_cycle["bytes"] == 0
+    assert all(
+        call[3]["If-None-Match"].startswith('W/"')
+        for call in aioclient_mock.mock_calls
+        if call[0].lower() == "get" and "Systems/1" in str(call[1])
     )
 
-    caplog.clear()
-    aioclient_mock.post("https://jsonplaceholder.typicode.com/posts/3", exc=TypeError)
-    assert (
-        await api.api_wrapper("post", "https://jsonplaceholder.typicode.com/posts/3")
-        is None
+
+async def test_concurrent_401_logs_in_once(hass, aioclient_mock):
+    """Requests that all hit an expired session share one new session."""
+    async def login(method, url, data):
+        return AiohttpClientMockResponse(
+            method,
+            url,
+            status=201,
+            json={},
+            headers={
+                "X-Auth-Token": "fresh",
+                "Location": f"{BASE_URL}/redfish/v1/SessionService/Sessions/2/",
+            },
+        )
+
+    expired: list[URL] = []
+
+    async def system(method, url, data):
+        if aioclient_mock.mock_calls[-1][3].get("X-Auth-Token") == "fresh":
+            return AiohttpClientMockResponse(method, url, json=SYSTEM)
+        expired.append(url)
+        first = len(expired) == 1
+        # Both requests are in flight with the expired token ...
+        while len(expired) < 2:
+            await asyncio.sleep(0)
+        # ... and the second 401 arrives after the first one logged in again
+        while not first and client._token != "fresh":
+            await asyncio.sleep(0)
+        return AiohttpClientMockResponse(method, url, status=401)
+
+    aioclient_mock.post(
+        f"{BASE_URL}/redfish/v1/SessionService/Sessions/", side_effect=login
     )
-    assert (
-        len(caplog.record_tuples) == 1
-        and "Error parsing information from" in caplog.record_tuples[0][2]
+    aioclient_mock.get(f"{BASE_URL}/redfish/v1/Systems/1/", side_effect=system)
+    client = _client(hass)
+    client._token = "expired"
+
+    results = await asyncio.gather(
+        client.async_get("/redfish/v1/Systems/1/"),
+        client.async_get("/redfish/v1/Systems/1/"),
     )
+
+    assert results == [SYSTEM, SYSTEM]
+    assert [call[0].lower() for call in aioclient_mock.mock_calls].count("post") == 1
+    assert client._token == "fresh"
@@ -0,0 +1,116 @@
+"""Micro-benchmarks over the recorded iLO replies in tests/corpus/.
+
+In a normal test run every benchmark runs once, as a plain test. See
+tests/README.md for measuring and comparing against the baselines.
+"""
+from dataclasses import replace
+from itertools import cycle
+from pathlib import Path
+from unittest.mock import patch
+
+import hpilo
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.helpers.entity_platform import async_get_platforms
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.hp_ilo.const import DOMAIN, TIER_INTERVAL_OPTIONS
+from custom_components.hp_ilo.models import NOT_INSTALLED
+
+from .const import MOCK_ENTRY_DATA
+
+CORPUS = Path(__file__).parent / "corpus"
+GENERATIONS = ["ilo2", "ilo3", "ilo4", "ilo5"]
+ALL_TIERS = set(TIER_INTERVAL_OPTIONS)
+# Installed temperature sensors and fans per recording
+SENSORS = {"ilo2": (7, 4), "ilo3": (17, 6), "ilo4": (35, 6), "ilo5": (62, 7)}
+ILO = hpilo.Ilo
+
+
+@pytest.fixture(name="generation", params=GENERATIONS)
+def generation_fixture(request):
+    """One iLO generation from the corpus."""
+    return request.param
+
+
+@pytest.fixture(name="coordinator")
+async def coordinator_fixture(hass, generation):
+    """An entry whose iLO replays the recorded reply of one generation."""
+
+    def replay(**kwargs):
+        ilo = ILO(**kwargs)
+        ilo.read_response = str(CORPUS / f"{generation}.xml")
+        return ilo
+
+    with patch("custom_components.hp_ilo.connection.hpilo.Ilo", side_effect=replay):
+        entry = MockConfigEntry(domain=DOMAIN, data=MOCK_ENTRY_DATA, entry_id="test")
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        yield hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+def _sensors(hass) -> list[SensorEntity]:
+    return [
+        entity
+        for platform in async_get_platforms(hass, DOMAIN)
+        for entity in platform.entities.values()
+        if isinstance(entity, SensorEntity)
+    ]
+
+
+async def test_parse_and_normalize(benchmark, coordinator, generation):
+    """Parse one full RIBCL reply and normalize it into a snapshot."""
+    benchmark.group = "parse and normalize"
+
+    def parse_and_normalize():
+        raw, inventory = coordinator.transport.fetch(ALL_TIERS, True)
+        return coordinator.normalize_poll(raw), inventory
+
+    snapshot, inventory = benchmark(parse_and_normalize)
+
+    temperatures, fans = SENSORS[generation]
+    installed = [s for s in snapshot.temperature_status if s != NOT_INSTALLED]
+    assert len(installed) == temperatures
+    assert len(snapshot.fans) == fans
+    assert inventory["serial_number"] == "CZJ00000XX"
+
+
+async def test_native_value(benchmark, hass, coordinator, generation):
+    """Evaluate native_value of every sensor entity once."""
+    benchmark.group = "native_value"
+    sensors = _sensors(hass)
+
+    values = benchmark(lambda: [sensor.native_value for sensor in sensors])
+
+    temperatures, fans = SENSORS[generation]
+    # Plus power status, power-on time, power usage, energy and the 5 min
+    # average and peak; the trend sensors are disabled by default
+    assert len(values) == temperatures + fans + 6
+
+
+async def test_fan_out(benchmark, hass, coordinator, generation):
+    """Push a snapshot in which every reading moved to all entities."""
+    benchmark.group = "fan-out"
+    snapshots = [
+        coordinator.data,
+        replace(
+            coordinator.data,
+            temperature=tuple(
+                value + 5 if isinstance(value, int) else value
+                for value in coordinator.data.temperature
+            ),
+            fans=tuple(value + 5 for value in coordinator.data.fans),
+        ),
+    ]
+    # Alternate, so every round changes every reading
+    rounds = cycle(reversed(snapshots))
+
+    def fan_out():
+        coordinator.async_set_updated_data(next(rounds))
+
+    benchmark(fan_out)
+
+    for sensor in _sensors(hass):
+        assert hass.states.get(sensor.entity_id).state == str(sensor.native_value)
@@ -1,110 +1,181 @@
-"""Test integration_blueprint config flow."""
+"""Test the hp_ilo config flow against the iLO simulator."""
 from unittest.mock import patch
 
 from homeassistant import config_entries, data_entry_flow
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
 import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.integration_blueprint.const import (
-    BINARY_SENSOR,
+from custom_components.hp_ilo.const import (
+    CONF_CAPABILITIES,
+    CONF_FAN_DEADBAND,
+    CONF_POWER_INTERVAL,
+    CONF_PROTOCOL,
+    CONF_PUSH_UPDATES,
     DOMAIN,
-    PLATFORMS,
-    SENSOR,
-    SWITCH,
+    PROTOCOL_AUTO,
+    PROTOCOL_REDFISH,
+    PROTOCOL_RIBCL,
 )
 
-from .const import MOCK_CONFIG
+from .const import MOCK_ENTRY_DATA
+from .simulator import IloSimulator
 
 
-# This fixture bypasses the actual setup of the integration
-# since we only want to test the config flow. We test the
-# actual functionality of the integration in other test modules.
+# Only the flow is under test here, not the setup of the created entry.
 @pytest.fixture(autouse=True)
 def bypass_setup_fixture():
     """Prevent setup."""
-    with patch(
-        "custom_components.integration_blueprint.async_setup",
-        return_value=True,
-    ), patch(
-        "custom_components.integration_blueprint.async_setup_entry",
-        return_value=True,
-    ):
+    with patch("custom_components.hp_ilo.async_setup_entry", return_value=True):
         yield
 
 
-# Here we simiulate a successful config flow from the backend.
-# Note that we use the `bypass_get_data` fixture here because
-# we want the config flow validation to succeed during the test.
-async def test_successful_config_flow(hass, bypass_get_data):
-    """Test a successful config flow."""
-    # Initialize a config flow
+async def _start(hass, step: str = "manual"):
+    """Open the flow and pick a step from the menu."""
     result = await hass.config_entries.flow.async_init(
         DOMAIN, context={"source": config_entries.SOURCE_USER}
     )
+    assert result["type"] == data_entry_flow.FlowResultType.MENU
+    return await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": step}
+    )
+
+
+def _user_input(simulator, **overrides):
+    return {
+        **MOCK_ENTRY_DATA,
+        CONF_HOST: "127.0.0.1",
+        CONF_PORT: simulator.port,
+        **overrides,
+    }
+
 
-    # Check that the config flow shows the user form as the first step
-    assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
-    assert result["step_id"] == "user"
+async def test_successful_config_flow(hass, ilo_simulator):
+    """The iLO is probed, then validated and logged out over Redfish."""
+    result = await _start(hass)
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    assert result["step_id"] == "manual"
 
-    # If a user were to enter `test_username` for username and `test_password`
-    # for password, it would result in this function call
     result = await hass.config_entries.flow.async_configure(
-        result["flow_id"], user_input=MOCK_CONFIG
+        result["flow_id"], user_input=_user_input(ilo_simulator)
     )
 
-    # Check that the config flow is complete and a new entry is created with
-    # the input data
-    assert result["type"] == data_entry_flow.RESULT_TYPE_CREATE_ENTRY
-    assert result["title"] == "test_username"
-    assert result["data"] == MOCK_CONFIG
-    assert result["result"]
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert result["title"] == MOCK_ENTRY_DATA["name"]
+    assert result["data"][CONF_PORT] == ilo_simulator.port
+    assert result["result"].unique_id == "redfish_ilo_127.0.0.1"
+    assert result["data"][CONF_PROTOCOL] == PROTOCOL_AUTO
+    assert result["data"][CONF_CAPABILITIES]["generation"] == 5
+    assert result["data"][CONF_CAPABILITIES]["redfish"]
+    assert ilo_simulator.requests == ["", "login", ""]
+
+
+async def test_config_flow_validates_over_ribcl(hass, socket_enabled):
+    """An iLO without Redfish is validated with a RIBCL login."""
+    simulator = IloSimulator(redfish=False)
+    await simulator.async_start()
+    try:
+        result = await _start(hass)
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input=_user_input(simulator)
+        )
+    finally:
+        await simulator.async_stop()
+
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert result["data"][CONF_CAPABILITIES]["generation"] == 3
+    assert "ribcl" in simulator.requests
+    assert "login" not in simulator.requests
+
+
+async def test_config_flow_with_fixed_protocol(hass, ilo_simulator):
+    """A protocol picked by hand skips the probe."""
+    result = await _start(hass)
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input=_user_input(ilo_simulator, **{CONF_PROTOCOL: PROTOCOL_RIBCL}),
+    )
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert CONF_CAPABILITIES not in result["data"]
+    assert set(ilo_simulator.requests) == {"ribcl"}
 
 
-# In this case, we want to simulate a failure during the config flow.
-# We use the `error_on_get_data` mock instead of `bypass_get_data`
-# (note the function parameters) to raise an Exception during
-# validation of the input config.
-async def test_failed_config_flow(hass, error_on_get_data):
-    """Test a failed config flow due to credential validation failure."""
-    result = await hass.config_entries.flow.async_init(
-        DOMAIN, context={"source": config_entries.SOURCE_USER}
+async def test_failed_config_flow(hass, ilo_simulator):
+    """Wrong credentials and an unreachable iLO are reported on the form."""
+    result = await _start(hass)
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input=_user_input(ilo_simulator, **{CONF_PASSWORD: "wrong"}),
+    )
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    assert result["errors"] == {"base": "invalid_auth"}
+
+    await ilo_simulator.async_stop()
+    result = await _start(hass)
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], user_input=_user_input(ilo_simulator)
     )
+    assert result["errors"] == {"base": "cannot_connect"}
 
-    assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
-    assert result["step_id"] == "user"
 
+async def test_scan_onboards_selected_ilos(hass, ilo_simulator):
+    """The subnet scan lists new iLOs and adds the selected ones."""
+    result = await _start(hass, "scan")
+    assert result["step_id"] == "scan"
     result = await hass.config_entries.flow.async_configure(
-        result["flow_id"], user_input=MOCK_CONFIG
+        result["flow_id"], {"subnet": "10.0.0.0/20", CONF_PORT: ilo_simulator.port}
     )
+    assert result["errors"] == {"subnet": "subnet_too_large"}
 
-    assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
-    assert result["errors"] == {"base": "auth"}
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"subnet": "127.0.0.1/32", CONF_PORT: ilo_simulator.port}
+    )
+    assert result["step_id"] == "scan_select"
+    assert result["description_placeholders"] == {"count": "1"}
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {"hosts": ["127.0.0.1"], CONF_USERNAME: "Administrator", CONF_PASSWORD: "secret"},
+    )
+    assert result["type"] == data_entry_flow.FlowResultType.ABORT
+    assert result["reason"] == "onboarding_started"
+    await hass.async_block_till_done()
+
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    assert entry.unique_id == "redfish_ilo_127.0.0.1"
+    assert entry.data[CONF_PROTOCOL] == PROTOCOL_AUTO
+    assert entry.data[CONF_CAPABILITIES]["generation"] == 5
+    assert entry.data[CONF_PORT] == ilo_simulator.port
+
+    # Configured iLOs are not offered again
+    result = await _start(hass, "scan")
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"subnet": "127.0.0.1", CONF_PORT: ilo_simulator.port}
+    )
+    assert result["errors"] == {"base": "no_devices_found"}
 
 
-# Our config flow also has an options flow, so we must test it as well.
 async def test_options_flow(hass):
-    """Test an options flow."""
-    # Create a new MockConfigEntry and add to HASS (we're bypassing config
-    # flow entirely)
-    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    """Push updates are only offered for Redfish entries."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_ENTRY_DATA, entry_id="test")
     entry.add_to_hass(hass)
-
-    # Initialize an options flow
     result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["step_id"] == "init"
+    assert CONF_PUSH_UPDATES not in result["data_schema"].schema
 
-    # Verify that the first options step is a user form
-    assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
-    assert result["step_id"] == "user"
-
-    # Enter some fake data into the form
+    redfish = MockConfigEntry(
+        domain=DOMAIN,
+        data={**MOCK_ENTRY_DATA, CONF_PROTOCOL: PROTOCOL_REDFISH},
+        entry_id="redfish",
+    )
+    redfish.add_to_hass(hass)
+    result = await hass.config_entries.options.async_init(redfish.entry_id)
     result = await hass.config_entries.options.async_configure(
         result["flow_id"],
-        user_input={platform: platform != SENSOR for platform in PLATFORMS},
+        user_input={CONF_POWER_INTERVAL: 15, CONF_FAN_DEADBAND: 5, CONF_PUSH_UPDATES: True},
     )
 
-    # Verify that the flow finishes
-    assert result["type"] == data_entry_flow.RESULT_TYPE_CREATE_ENTRY
-    assert result["title"] == "test_username"
-
-    # Verify that the options were updated
-    assert entry.options == {BINARY_SENSOR: True, SENSOR: False, SWITCH: True}
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert redfish.options[CONF_POWER_INTERVAL] == 15
+    assert redfish.options[CONF_FAN_DEADBAND] == 5.0
+    assert redfish.options[CONF_PUSH_UPDATES] is True
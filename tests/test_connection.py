@@ -0,0 +1,90 @@
+"""Test the hp_ilo connection pool."""
+from unittest.mock import MagicMock, patch
+
+import hpilo
+import pytest
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.hp_ilo.connection import (
+    IloConnectionManager,
+    async_get_connection_manager,
+    async_release_connection_manager,
+)
+from custom_components.hp_ilo.const import DOMAIN
+
+from .const import MOCK_ENTRY_DATA
+
+
+@pytest.fixture(name="manager")
+def manager_fixture():
+    """Connection manager with hpilo.Ilo patched out."""
+    with patch(
+        "custom_components.hp_ilo.connection.hpilo.Ilo",
+        side_effect=lambda **kwargs: MagicMock(),
+    ) as ilo_cls:
+        manager = IloConnectionManager("ilo.example.test", 443, "admin", "secret")
+        manager.ilo_cls = ilo_cls
+        yield manager
+
+
+def test_clients_are_reused(manager):
+    """A returned client is handed out again instead of building a new one."""
+    manager.call("get_host_power_status")
+    manager.call("warm_boot")
+    manager.call("get_host_power_status")
+
+    assert manager.ilo_cls.call_count == 1
+    assert manager.stats == {"hits": 2, "misses": 1, "discarded": 0, "idle": 1}
+
+
+def test_stale_client_is_dropped(manager):
+    """A communication error discards the client so the next call reconnects."""
+    with pytest.raises(hpilo.IloCommunicationError):
+        with manager.client():
+            raise hpilo.IloCommunicationError("connection reset")
+
+    manager.call("get_host_power_status")
+
+    assert manager.ilo_cls.call_count == 2
+    assert manager.stats["discarded"] == 1
+
+
+def test_idle_client_expires(manager):
+    """Clients idle for longer than max_idle are rebuilt."""
+    manager._max_idle = 0
+    manager.call("get_host_power_status")
+    with patch("custom_components.hp_ilo.connection.time.monotonic", return_value=1e12):
+        manager.call("get_host_power_status")
+
+    assert manager.ilo_cls.call_count == 2
+    assert manager.stats["misses"] == 2
+
+
+async def test_shared_manager_is_reference_counted(hass):
+    """Unloading one of two entries for the same iLO keeps the pool open."""
+    first = MockConfigEntry(domain=DOMAIN, data=MOCK_ENTRY_DATA, entry_id="first")
+    second = MockConfigEntry(domain=DOMAIN, data=MOCK_ENTRY_DATA, entry_id="second")
+    manager = async_get_connection_manager(hass, first)
+    assert async_get_connection_manager(hass, second) is manager
+
+    async_release_connection_manager(hass, first)
+    assert async_get_connection_manager(hass, first) is manager
+    async_release_connection_manager(hass, first)
+    async_release_connection_manager(hass, second)
+    assert manager.references == 0
+    assert async_get_connection_manager(hass, second) is not manager
+
+
+def test_new_password_drops_pooled_clients(manager):
+    """Clients that logged in with the old password are not reused."""
+    manager.call("get_host_power_status")
+    with manager.client():
+        # A reload with new credentials while this client is lent out
+        assert manager.set_password("new-secret")
+    assert not manager.set_password("new-secret")
+    manager.call("get_host_power_status")
+
+    assert manager.ilo_cls.call_count == 2
+    assert manager.ilo_cls.call_args.kwargs["password"] == "new-secret"
+    assert manager.stats["idle"] == 1
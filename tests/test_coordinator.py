@@ -0,0 +1,432 @@
+"""Test the shared hp_ilo data coordinator."""
+import asyncio
+from contextlib import contextmanager
+from datetime import timedelta
+import threading
+import time
+from unittest.mock import Mock, patch
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import EVENT_STATE_CHANGED, EVENT_STATE_REPORTED
+from homeassistant.core import callback
+from homeassistant.helpers import device_registry as dr
+
+import hpilo
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.hp_ilo.const import (
+    CONF_INVENTORY_INTERVAL,
+    CONF_POWER_INTERVAL,
+    CONF_TEMPERATURE_DEADBAND,
+    CONF_THERMAL_INTERVAL,
+    DOMAIN,
+)
+
+from .const import MOCK_ENTRY_DATA
+
+MOCK_OPTIONS = {
+    CONF_POWER_INTERVAL: 5,
+    CONF_THERMAL_INTERVAL: 60,
+    CONF_INVENTORY_INTERVAL: 3600,
+}
+
+
+@contextmanager
+def _at(now: float):
+    """Freeze the coordinator and scheduler clock and take the jitter out."""
+    clock = Mock(wraps=time, monotonic=Mock(return_value=now))
+    # Only the integration's clock: the event loop keeps real time, so the
+    # scheduler timer does not fire in the middle of a test.
+    with patch("custom_components.hp_ilo.coordinator.time", clock), patch(
+        "custom_components.hp_ilo.scheduler.time", clock
+    ), patch("custom_components.hp_ilo.coordinator.random.random", return_value=0.0):
+        yield
+
+
+async def _setup_entry(hass, options=None) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN, data=MOCK_ENTRY_DATA, options=options or {}, entry_id="test"
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def test_single_poll_for_all_platforms(hass, mock_ilo):
+    """All platforms share one coordinator, so setup polls the iLO once."""
+    entry = await _setup_entry(hass)
+
+    assert mock_ilo.requests == 1
+    assert set(mock_ilo.calls.values()) == {1}
+    assert hass.states.get("sensor.test_ilo_temp_02_cpu_1").state == "40"
+    assert hass.states.get("binary_sensor.test_ilo_global_health").state == "off"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_tiers_poll_only_what_is_due(hass, mock_ilo):
+    """A tick only fetches the tiers whose interval has elapsed."""
+    with _at(1000.0):
+        entry = await _setup_entry(hass, MOCK_OPTIONS)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    assert coordinator.next_due == 1005.0
+    mock_ilo.calls.clear()
+
+    # 5 s later: only the power tier is due
+    with _at(1005.0):
+        await coordinator.async_refresh()
+    assert set(mock_ilo.calls) == {"get_host_power_status", "get_power_readings"}
+    assert coordinator.data.temperature
+
+    # 60 s later the thermal tier joins the same batch
+    mock_ilo.calls.clear()
+    requests = mock_ilo.requests
+    with _at(1060.0):
+        await coordinator.async_refresh()
+    assert set(mock_ilo.calls) == {
+        "get_host_power_status",
+        "get_power_readings",
+        "get_embedded_health",
+    }
+    assert mock_ilo.requests == requests + 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_stable_tier_slows_down(hass, mock_ilo):
+    """Unchanged readings stretch the interval, changing readings shrink it."""
+    with _at(1000.0):
+        entry = await _setup_entry(hass, MOCK_OPTIONS)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    with _at(1005.0):
+        await coordinator.async_refresh()
+    # Power readings did not change: next power poll after 5 * 1.25 s
+    assert coordinator.next_due == 1011.25
+
+    mock_ilo.responses["get_power_readings"] = {"present_power_reading": (250, "Watts")}
+    with _at(1011.25):
+        await coordinator.async_refresh()
+    # Power draw moved: the tier speeds up again
+    assert coordinator.next_due == 1014.375
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_circuit_breaker_stops_polling(hass, mock_ilo):
+    """After repeated failures the iLO is left alone until the backoff expires."""
+    with _at(1000.0):
+        entry = await _setup_entry(hass, MOCK_OPTIONS)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    def unreachable():
+        mock_ilo._queued.clear()
+        raise hpilo.IloCommunicationError("Timeout connecting to ilo.example.test")
+
+    mock_ilo.call_delayed = unreachable
+    with patch("custom_components.hp_ilo.breaker.random.uniform", return_value=1.0):
+        for now in (1005.0, 1015.0, 1035.0):
+            coordinator.async_mark_tiers_due("power")
+            with _at(now):
+                await coordinator.async_refresh()
+            assert not coordinator.last_update_success
+
+    assert coordinator.breaker.state == "open"
+    requests = mock_ilo.requests
+
+    # While open nothing is sent to the iLO
+    coordinator.async_mark_tiers_due("power")
+    with _at(1040.0):
+        await coordinator.async_refresh()
+    assert mock_ilo.requests == requests
+
+    # Once the backoff expires a single probe goes out and closes the breaker
+    del mock_ilo.call_delayed
+    with _at(1080.0):
+        await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator.breaker.state == "closed"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_half_open_probe_is_awaited_by_other_entries(hass, mock_ilo):
+    """Entries of the same host wait for the probe instead of failing each tick."""
+    with _at(1000.0):
+        first = await _setup_entry(hass, MOCK_OPTIONS)
+        second = MockConfigEntry(
+            domain=DOMAIN, data=MOCK_ENTRY_DATA, options=MOCK_OPTIONS, entry_id="second"
+        )
+        second.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(second.entry_id)
+        await hass.async_block_till_done()
+    prober = hass.data[DOMAIN][first.entry_id]["coordinator"]
+    waiter = hass.data[DOMAIN][second.entry_id]["coordinator"]
+    assert prober.breaker is waiter.breaker
+    with patch("custom_components.hp_ilo.breaker.random.uniform", return_value=1.0):
+        for _ in range(3):
+            prober.breaker.record_failure(1000.0)
+    assert prober.breaker.state == "open"
+
+    release = threading.Event()
+    call_delayed = mock_ilo.call_delayed
+
+    def slow_probe():
+        release.wait(5)
+        return call_delayed()
+
+    mock_ilo.call_delayed = slow_probe
+    with _at(1100.0):
+        prober.async_mark_tiers_due("power")
+        waiter.async_mark_tiers_due("power")
+        probe = hass.async_create_task(prober.async_refresh())
+        while not prober.breaker.probing:
+            await asyncio.sleep(0)
+        waiting = hass.async_create_task(waiter.async_refresh())
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        assert waiter.last_update_success
+
+        release.set()
+        await probe
+        await waiting
+    assert prober.breaker.state == "closed"
+    assert prober.last_update_success and waiter.last_update_success
+
+    assert await hass.config_entries.async_unload(second.entry_id)
+    assert await hass.config_entries.async_unload(first.entry_id)
+
+
+async def test_removed_listeners_are_forgotten(hass, mock_ilo):
+    """Contexts of removed listeners do not pile up in the coordinator."""
+    with _at(1000.0):
+        entry = await _setup_entry(hass, MOCK_OPTIONS)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    tracked = len(coordinator._notified)
+
+    context = ("temperature", 99)
+    remove_first = coordinator.async_add_listener(lambda: None, context)
+    remove_second = coordinator.async_add_listener(lambda: None, context)
+    remove_first()
+    assert context in coordinator._notified
+    remove_second()
+    assert context not in coordinator._notified
+    assert len(coordinator._notified) == tracked
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert not coordinator._notified
+
+
+async def test_only_changed_entities_are_written(hass, mock_ilo):
+    """A poll only writes the states whose reading moved past the deadband."""
+    with _at(1000.0):
+        entry = await _setup_entry(
+            hass, {**MOCK_OPTIONS, CONF_TEMPERATURE_DEADBAND: 1.0}
+        )
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    written = []
+
+    @callback
+    def _record(event):
+        written.append(event.data["entity_id"])
+
+    @callback
+    def _any(event_data):
+        return True
+
+    for event_type in (EVENT_STATE_CHANGED, EVENT_STATE_REPORTED):
+        hass.bus.async_listen(event_type, _record, event_filter=_any)
+
+    async def poll(cpu, fan):
+        health = mock_ilo.responses["get_embedded_health"]
+        health["temperature"]["02-CPU 1"]["currentreading"] = (cpu, "Celsius")
+        health["fans"]["Fan 1"]["speed"] = (fan, "Percentage")
+        written.clear()
+        coordinator.async_mark_tiers_due("thermal")
+        with _at(1100.0):
+            await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        return set(written)
+
+    # Nothing moved: no state writes at all
+    assert await poll(40, 23) == set()
+    # Fan changed, CPU moved within the deadband
+    assert await poll(41, 30) == {"sensor.test_ilo_fan_fan_1"}
+    # CPU is now more than 1 °C away from its last written state
+    assert await poll(42, 30) == {"sensor.test_ilo_temp_02_cpu_1"}
+    assert hass.states.get("sensor.test_ilo_temp_02_cpu_1").state == "42"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_snapshot_is_cached(hass, hass_storage, mock_ilo):
+    """The last snapshot and sensor inventory end up in HA storage."""
+    entry = await _setup_entry(hass)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=61))
+    await hass.async_block_till_done()
+
+    stored = hass_storage[f"{DOMAIN}.{entry.entry_id}"]["data"]
+    assert stored["slots"]["temperature"] == {"01-Inlet Ambient": 0, "02-CPU 1": 1}
+    assert stored["snapshot"]["temperature"] == [21, 40]
+    assert stored["snapshot"]["power_status"] == "ON"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_startup_from_cache(hass, hass_storage, mock_ilo):
+    """With a cache, setup does not wait for the iLO and restores the last values."""
+    hass_storage[f"{DOMAIN}.test"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.test",
+        "data": {
+            "slots": {"temperature": {"02-CPU 1": 0}, "fans": {}},
+            "snapshot": {
+                "power_status": "OFF",
+                "health_summary": "OK",
+                "temperature": [38],
+                "temperature_status": ["OK"],
+            },
+        },
+    }
+
+    def unreachable():
+        mock_ilo._queued.clear()
+        raise hpilo.IloCommunicationError("Timeout connecting to ilo.example.test")
+
+    mock_ilo.call_delayed = unreachable
+    with _at(1000.0):
+        entry = await _setup_entry(hass)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert hass.states.get("sensor.test_ilo_temp_02_cpu_1").state == "38"
+    assert hass.states.get("sensor.test_ilo_power_status").state == "OFF"
+    assert mock_ilo.requests == 0
+    # The first real poll is left to the scheduler, one tick later
+    assert coordinator.next_due == 1001.0
+
+    del mock_ilo.call_delayed
+    with _at(1001.0):
+        await coordinator.async_refresh()
+    assert hass.states.get("sensor.test_ilo_temp_02_cpu_1").state == "40"
+    assert hass.states.get("sensor.test_ilo_power_status").state == "ON"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_inventory_cache(hass, mock_ilo):
+    """Identity is fetched once, then only re-read after a firmware change."""
+    with _at(1000.0):
+        entry = await _setup_entry(hass, MOCK_OPTIONS)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    device_registry = dr.async_get(hass)
+    device = device_registry.async_get_device(identifiers={(DOMAIN, entry.entry_id)})
+    assert device.model == "ProLiant DL380 Gen9"
+    assert device.serial_number == "CZJ00000XX"
+    assert device.sw_version == "2.82"
+    assert device.hw_version == "iLO4"
+
+    # The inventory tier only checks the firmware version
+    mock_ilo.calls.clear()
+    coordinator.async_mark_tiers_due("inventory")
+    with _at(1010.0):
+        await coordinator.async_refresh()
+    assert "get_fw_version" in mock_ilo.calls
+    assert "get_product_name" not in mock_ilo.calls
+
+    # A firmware upgrade updates the device and re-reads the identity
+    mock_ilo.responses["get_fw_version"]["firmware_version"] = "2.84"
+    coordinator.async_mark_tiers_due("inventory")
+    with _at(1020.0):
+        await coordinator.async_refresh()
+    device = device_registry.async_get_device(identifiers={(DOMAIN, entry.entry_id)})
+    assert device.sw_version == "2.84"
+
+    mock_ilo.calls.clear()
+    with _at(1021.0):
+        await coordinator.async_refresh()
+    assert mock_ilo.calls["get_product_name"] == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_overlapping_polls_are_merged(hass, mock_ilo):
+    """A refresh while the entry's poll is in flight does not poll again."""
+    entry = await _setup_entry(hass)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    requests = mock_ilo.requests
+
+    coordinator.async_mark_tiers_due("power")
+    await asyncio.gather(coordinator.async_refresh(), coordinator.async_refresh())
+
+    assert mock_ilo.requests == requests + 1
+    assert coordinator.last_update_success
+    assert coordinator.gate.stats["merged_polls"] == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_energy_survives_restart(hass, hass_storage, mock_ilo, freezer):
+    """The energy total continues from storage and grows with each power poll."""
+    start = dt_util.utcnow().timestamp()
+    hass_storage[f"{DOMAIN}.test"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.test",
+        "data": {
+            "slots": {"temperature": {}, "fans": {}},
+            "snapshot": {"power_status": "ON", "power_usage": 200, "energy": 12.5},
+            "energy": {"total": 12.5, "last_time": start, "last_power": 200, "gaps": 0},
+        },
+    }
+    entry = await _setup_entry(hass)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    assert hass.states.get("sensor.test_ilo_energy").state == "12.5"
+    assert hass.states.get("sensor.test_ilo_power_usage").state == "200"
+
+    # 36 s later the iLO reads 180 W: 190 W average adds 1.9 Wh
+    freezer.tick(36)
+    coordinator.async_mark_tiers_due("power")
+    await coordinator.async_refresh()
+    assert hass.states.get("sensor.test_ilo_energy").state == "12.502"
+    assert hass.states.get("sensor.test_ilo_power_usage").state == "180"
+
+    # After an hour without readings the gap is skipped
+    freezer.tick(3600)
+    coordinator.async_mark_tiers_due("power")
+    await coordinator.async_refresh()
+    assert hass.states.get("sensor.test_ilo_energy").state == "12.502"
+    assert coordinator.energy.gaps == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_rolling_power_sensors(hass, mock_ilo):
+    """Average and peak power come from the in-memory window of recent polls."""
+    with _at(1000.0):
+        entry = await _setup_entry(hass, MOCK_OPTIONS)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    assert hass.states.get("sensor.test_ilo_power_usage_5_min_average").state == "180.0"
+
+    for now, watts in ((1005.0, 300), (1010.0, 120)):
+        mock_ilo.responses["get_power_readings"] = {"present_power_reading": (watts, "Watts")}
+        coordinator.async_mark_tiers_due("power")
+        with _at(now):
+            await coordinator.async_refresh()
+    # Time-weighted: 5 s averaging 240 W and 5 s averaging 210 W
+    assert hass.states.get("sensor.test_ilo_power_usage_5_min_average").state == "225.0"
+    assert hass.states.get("sensor.test_ilo_power_usage_5_min_peak").state == "300.0"
+
+    # Five minutes on, the earlier readings have left the window
+    coordinator.async_mark_tiers_due("power")
+    with _at(1306.0):
+        await coordinator.async_refresh()
+    assert hass.states.get("sensor.test_ilo_power_usage_5_min_average").state == "120.0"
+    assert hass.states.get("sensor.test_ilo_power_usage_5_min_peak").state == "120.0"
+    assert coordinator.rolling.stats["samples"] < coordinator.rolling.stats["capacity"]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
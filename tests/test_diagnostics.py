@@ -0,0 +1,48 @@
+"""Test the hp_ilo poll instrumentation and diagnostics."""
+import hpilo
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.hp_ilo.const import DOMAIN
+from custom_components.hp_ilo.diagnostics import async_get_config_entry_diagnostics
+
+from .const import MOCK_ENTRY_DATA
+
+
+async def test_diagnostics_expose_poll_stats(hass, mock_ilo):
+    """Diagnostics report timings and error classes, without credentials."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_ENTRY_DATA, entry_id="test")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    def unreachable():
+        mock_ilo._queued.clear()
+        raise hpilo.IloCommunicationError("Timeout connecting to ilo.example.test")
+
+    mock_ilo.call_delayed = unreachable
+    coordinator.async_mark_tiers_due("power")
+    await coordinator.async_refresh()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"]["password"] == "**REDACTED**"
+    assert diagnostics["entry"]["data"]["username"] == "**REDACTED**"
+    assert diagnostics["inventory"]["serial_number"] == "**REDACTED**"
+    assert diagnostics["inventory"]["model"] == "ProLiant DL380 Gen9"
+    assert diagnostics["snapshot"]["power_status"] == "ON"
+    assert diagnostics["tiers"]["factors"] == coordinator.tier_factors
+    assert set(diagnostics["tiers"]["factors"]) == set(coordinator.tier_intervals)
+
+    stats = diagnostics["stats"]
+    assert stats["polls"] == 2
+    assert stats["failures"] == 1
+    assert stats["errors"] == {"IloCommunicationError": 1}
+    assert stats["logins"] == 1
+    assert stats["poll_duration"]["count"] == 2
+    assert stats["executor_wait"]["count"] == 2
+    (call,) = stats["latency"]
+    assert call.startswith("RIBCL ")
+    assert stats["latency"][call]["buckets"]["le_+Inf"] == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,71 @@
+"""Test the subnet scan against local iLO simulators."""
+from ipaddress import ip_network
+import time
+
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import pytest
+from pytest_socket import socket_allow_hosts
+
+from custom_components.hp_ilo.const import PROTOCOL_REDFISH, PROTOCOL_RIBCL
+from custom_components.hp_ilo.discovery import (
+    IloScanResult,
+    async_probe_host,
+    async_scan_subnet,
+)
+
+from .simulator import FIRMWARE_VERSION, MODEL, IloSimulator
+
+LOOPBACK = ip_network("127.0.0.0/24")
+
+
+@pytest.fixture(name="loopback_subnet")
+def loopback_subnet_fixture(socket_enabled):
+    """Let the scan connect to all of 127.0.0.0/24; only .1 has a simulator."""
+    socket_allow_hosts([str(address) for address in LOOPBACK])
+
+
+async def test_fingerprints(hass, ilo_simulator):
+    """The Redfish root identifies iLO 4/5, /xmldata the RIBCL-only iLOs."""
+    session = async_get_clientsession(hass, verify_ssl=False)
+    result = await async_probe_host(session, "127.0.0.1", ilo_simulator.port)
+    assert result == IloScanResult(
+        host="127.0.0.1",
+        port=ilo_simulator.port,
+        protocol=PROTOCOL_REDFISH,
+        model=MODEL,
+        manager="iLO 5",
+        firmware=FIRMWARE_VERSION,
+    )
+    assert result.label == f"127.0.0.1 — {MODEL} (iLO 5, v{FIRMWARE_VERSION})"
+    # Fingerprinting does not log in
+    assert ilo_simulator.requests == [""]
+
+    ilo3 = IloSimulator(redfish=False)
+    await ilo3.async_start()
+    try:
+        result = await async_probe_host(session, "127.0.0.1", ilo3.port)
+    finally:
+        await ilo3.async_stop()
+    assert result.protocol == PROTOCOL_RIBCL
+    assert result.manager == "iLO 3"
+    assert ilo3.requests == ["", "xmldata"]
+
+    # Nothing listening
+    assert await async_probe_host(session, "127.0.0.1", 1, timeout=0.5) is None
+
+
+async def test_scan_subnet(hass, ilo_simulator, loopback_subnet):
+    """A /24 is probed concurrently and only the iLO is returned."""
+    session = async_get_clientsession(hass, verify_ssl=False)
+    start = time.monotonic()
+    found = await async_scan_subnet(
+        session, LOOPBACK, ilo_simulator.port, concurrency=32
+    )
+    assert time.monotonic() - start < 5
+    assert [result.host for result in found] == ["127.0.0.1"]
+
+    # A single address is a host of its own
+    found = await async_scan_subnet(
+        session, ip_network("127.0.0.1/32"), ilo_simulator.port
+    )
+    assert len(found) == 1
@@ -0,0 +1,84 @@
+"""Test push updates over the Redfish event stream."""
+import asyncio
+
+from homeassistant.const import CONF_HOST, CONF_PORT
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.hp_ilo.const import (
+    CONF_PROTOCOL,
+    CONF_PUSH_UPDATES,
+    DOMAIN,
+    PROTOCOL_REDFISH,
+    PUSH_SWEEP_INTERVAL,
+    TIER_POWER,
+)
+from custom_components.hp_ilo.events import parse_event
+
+from .const import MOCK_ENTRY_DATA
+
+
+async def _wait_for(predicate):
+    for _ in range(100):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_parse_event():
+    """Power and health events map onto snapshot keys."""
+    assert parse_event({"MessageId": "iLOEvents.2.1.ServerPoweredOff"}) == {
+        "power_status": "OFF"
+    }
+    assert parse_event(
+        {"MessageId": "ResourceEvent.1.0.ResourcePowerStateChanged", "MessageArgs": ["/redfish/v1/Systems/1", "On"]}
+    ) == {"power_status": "ON"}
+    assert parse_event(
+        {"MessageId": "ResourceEvent.1.0.ResourceStatusChangedCritical"}
+    ) == {"health_summary": "Critical"}
+    assert parse_event({"MessageId": "iLOEvents.2.1.ServerPostComplete"}) == {}
+    assert parse_event({"MessageId": 7, "MessageArgs": {"state": "On"}}) == {}
+
+
+async def test_push_updates_patch_snapshot(hass, ilo_simulator):
+    """Events from the stream update the entities without a poll."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            **MOCK_ENTRY_DATA,
+            CONF_HOST: "127.0.0.1",
+            CONF_PORT: ilo_simulator.port,
+            CONF_PROTOCOL: PROTOCOL_REDFISH,
+        },
+        options={CONF_PUSH_UPDATES: True},
+        entry_id="test",
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    await asyncio.wait_for(ilo_simulator.stream_connected.wait(), 5)
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    # Polling is only a slow consistency sweep now
+    assert coordinator.tier_intervals[TIER_POWER] == PUSH_SWEEP_INTERVAL
+    assert hass.states.get("sensor.test_ilo_power_status").state == "ON"
+    polls = len(ilo_simulator.requests)
+
+    # Malformed messages are skipped without ending the stream
+    for payload in ('[1, 2]', '"On"', '{"Events": "On"}', '{"Events": [null]}'):
+        await ilo_simulator.async_push_raw(payload)
+    await ilo_simulator.async_push(
+        {"EventType": "Alert", "MessageId": "iLOEvents.2.1.ServerPoweredOff"},
+        {"MessageId": "ResourceEvent.1.0.ResourceStatusChangedCritical"},
+    )
+    await _wait_for(
+        lambda: hass.states.get("sensor.test_ilo_power_status").state == "OFF"
+    )
+    assert hass.states.get("binary_sensor.test_ilo_global_health").state == "on"
+    assert len(ilo_simulator.requests) == polls
+
+    # Unload stops the stream task
+    events = hass.data[DOMAIN][entry.entry_id]["events"]
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert events._task is None
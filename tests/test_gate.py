@@ -0,0 +1,97 @@
+"""Test the per-host hp_ilo session gate."""
+import asyncio
+
+import pytest
+
+from custom_components.hp_ilo.gate import (
+    PRIORITY_ACTION,
+    PRIORITY_POLL,
+    PRIORITY_SETUP,
+    IloPollMerged,
+    IloSessionGate,
+)
+
+
+async def _hold(gate, priority, order, release, owner=None):
+    async with gate.async_session(priority, owner):
+        order.append(priority)
+        await release.wait()
+
+
+async def test_actions_go_before_polls():
+    """Once a session frees up, waiters are served by priority, then FIFO."""
+    gate = IloSessionGate("ilo.example.test", limit=1)
+    order: list[int] = []
+    release = asyncio.Event()
+    first = asyncio.create_task(_hold(gate, PRIORITY_POLL, order, release, "a"))
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.create_task(_hold(gate, priority, order, release, owner))
+        for priority, owner in (
+            (PRIORITY_POLL, "b"),
+            (PRIORITY_SETUP, None),
+            (PRIORITY_ACTION, None),
+        )
+    ]
+    await asyncio.sleep(0)
+    assert gate.stats["queued"] == 3
+
+    release.set()
+    await asyncio.gather(first, *waiters)
+    assert order == [PRIORITY_POLL, PRIORITY_ACTION, PRIORITY_SETUP, PRIORITY_POLL]
+    assert gate.stats["active"] == 0
+    assert gate.stats["wait"]["action"]["count"] == 1
+    assert gate.stats["wait"]["poll"]["count"] == 2
+
+
+async def test_limit_is_shared():
+    """No more than ``limit`` sessions run at once."""
+    gate = IloSessionGate("ilo.example.test", limit=2)
+    running = peak = 0
+
+    async def session():
+        nonlocal running, peak
+        async with gate.async_session(PRIORITY_ACTION):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(session() for _ in range(5)))
+    assert peak == 2
+
+
+async def test_second_poll_of_an_owner_is_merged():
+    """A poll while the same owner's poll is queued or running is refused."""
+    gate = IloSessionGate("ilo.example.test", limit=1)
+    release = asyncio.Event()
+    first = asyncio.create_task(_hold(gate, PRIORITY_POLL, [], release, "entry"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(IloPollMerged):
+        async with gate.async_session(PRIORITY_POLL, "entry"):
+            pass
+    release.set()
+    await first
+    # Afterwards the owner can poll again
+    async with gate.async_session(PRIORITY_POLL, "entry"):
+        pass
+    assert gate.stats["merged_polls"] == 1
+
+
+async def test_cancelled_waiter_frees_its_place():
+    """A waiter cancelled while queued does not hold on to a session."""
+    gate = IloSessionGate("ilo.example.test", limit=1)
+    release = asyncio.Event()
+    first = asyncio.create_task(_hold(gate, PRIORITY_POLL, [], release, "a"))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(_hold(gate, PRIORITY_ACTION, [], release))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await first
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert gate.stats["active"] == 0
+    assert gate.stats["queued"] == 0
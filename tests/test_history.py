@@ -0,0 +1,111 @@
+"""Test the import of the iLO power history into long-term statistics."""
+from datetime import UTC, datetime, timedelta
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.const import CONF_HOST, CONF_PORT
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.hp_ilo.const import CONF_PROTOCOL, DOMAIN, PROTOCOL_REDFISH
+from custom_components.hp_ilo.history import IloPowerHistory, hourly_statistics
+
+from .const import MOCK_ENTRY_DATA
+
+END = datetime(2026, 10, 17, 12, 0, tzinfo=UTC)
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    """The recorder has to be set up before hass itself."""
+    yield
+
+
+def _samples(end: datetime, count: int, watts: float = 300.0) -> list[dict]:
+    return [
+        {
+            "time": end - timedelta(minutes=5 * index),
+            "average": watts,
+            "minimum": watts - 10,
+            "peak": watts + 20,
+        }
+        for index in reversed(range(count))
+    ]
+
+
+def test_hourly_statistics():
+    """Samples are summed per completed hour; known hours are skipped."""
+    # 09:35 up to 12:00; each sample covers the 5 minutes before its time
+    samples = _samples(END, 30)
+    power, energy, total = hourly_statistics(samples, None, 10.0)
+
+    assert [row["start"].hour for row in energy] == [9, 10, 11]
+    # 09:00 only has 6 samples; 10:00 and 11:00 a full 300 W hour each
+    assert [round(row["sum"], 3) for row in energy] == [10.15, 10.45, 10.75]
+    assert total == energy[-1]["sum"]
+    assert power[1] == {"start": END - timedelta(hours=2), "mean": 300, "min": 290, "max": 320}
+
+    power, energy, _ = hourly_statistics(samples, END - timedelta(hours=2), total)
+    assert [row["start"].hour for row in energy] == [11]
+    # The hour in progress is not imported yet
+    assert hourly_statistics(samples[:-1], END - timedelta(hours=2), total)[1] == []
+
+
+async def _statistics(hass, statistic_id: str) -> list[dict]:
+    await async_wait_recording_done(hass)
+    rows = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        END - timedelta(days=2),
+        None,
+        {statistic_id},
+        "hour",
+        None,
+        {"sum", "mean"},
+    )
+    return rows.get(statistic_id, [])
+
+
+async def test_history_import(hass, ilo_simulator):
+    """A Redfish entry imports the last 24 hours once, then only new hours."""
+    ilo_simulator.history_end = END
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            **MOCK_ENTRY_DATA,
+            CONF_HOST: "127.0.0.1",
+            CONF_PORT: ilo_simulator.port,
+            CONF_PROTOCOL: PROTOCOL_REDFISH,
+        },
+        entry_id="test",
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    history: IloPowerHistory = hass.data[DOMAIN][entry.entry_id]["history"]
+    energy_id = history.energy_metadata["statistic_id"]
+
+    # 288 samples of 182 W: 24 complete hours
+    rows = await _statistics(hass, energy_id)
+    assert len(rows) == 24
+    assert round(rows[-1]["sum"], 3) == round(24 * 0.182, 3)
+    power = await _statistics(hass, history.power_metadata["statistic_id"])
+    assert power[0]["mean"] == 182
+
+    # Nothing new until the iLO has another complete hour
+    assert await history.async_update() == 0
+    ilo_simulator.history_end = END + timedelta(hours=1)
+    assert await history.async_update() == 1
+
+    # After a restart the import continues from the recorder
+    await async_wait_recording_done(hass)
+    restarted = IloPowerHistory(hass, history.coordinator, history.client)
+    assert await restarted.async_update() == 0
+    rows = await _statistics(hass, energy_id)
+    assert len(rows) == 25
+    assert round(rows[-1]["sum"], 3) == round(25 * 0.182, 3)
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,89 @@
+"""Test the normalized hp_ilo snapshot model."""
+from custom_components.hp_ilo.const import PROTOCOL_REDFISH, PROTOCOL_RIBCL
+from custom_components.hp_ilo.discovery import IloScanResult
+from custom_components.hp_ilo.models import (
+    IloCapabilities,
+    IloEnergyMeter,
+    IloSnapshot,
+    SensorSlots,
+    normalize,
+)
+from custom_components.hp_ilo.transport import capabilities_from_scan
+
+from .const import MOCK_HEALTH
+
+
+def test_normalize_assigns_stable_slots():
+    """Labels keep their slot; readings are unwrapped once into columns."""
+    slots = SensorSlots()
+    first = normalize(
+        {
+            "power_status": "ON",
+            "temperature": MOCK_HEALTH["temperature"],
+            "fans": MOCK_HEALTH["fans"],
+        },
+        None,
+        slots,
+    )
+    cpu = slots.temperature["02-CPU 1"]
+    assert first.temperature[cpu] == 40
+    assert first.temperature_status[cpu] == "OK"
+    assert first.fans[slots.fans["Fan 1"]] == 23
+
+    # A new label gets the next slot; a missing one reads as None
+    second = normalize(
+        {"temperature": {"03-P1 DIMM": {"status": "OK", "currentreading": (30, "Celsius")}}},
+        first,
+        slots,
+    )
+    assert slots.temperature["02-CPU 1"] == cpu
+    assert second.temperature[slots.temperature["03-P1 DIMM"]] == 30
+    assert second.temperature[cpu] is None
+    # Fields the partial poll did not fetch are carried over
+    assert second.power_status == "ON"
+    assert second.fans == first.fans
+
+
+def test_snapshot_is_slotted():
+    """Snapshots carry no per-instance __dict__."""
+    assert not hasattr(IloSnapshot(), "__dict__")
+
+
+def test_energy_meter_integrates_and_skips_gaps():
+    """Readings add trapezoids; a gap longer than max_gap adds nothing."""
+    meter = IloEnergyMeter()
+    meter.add(200, 0.0, max_gap=60)
+    assert meter.total == 0.0
+
+    # 30 s between 200 W and 400 W: 300 W average for 30 s
+    meter.add(400, 30.0, max_gap=60)
+    assert meter.total == 300 * 30 / 3_600_000
+
+    # Ten minutes of missed polls are not guessed
+    meter.add(400, 630.0, max_gap=60)
+    assert meter.total == 300 * 30 / 3_600_000
+    assert meter.gaps == 1
+    # The clock going back is ignored too
+    meter.add(400, 600.0, max_gap=60)
+    assert meter.total == 300 * 30 / 3_600_000
+
+    assert IloEnergyMeter.from_dict(meter.as_dict()) == meter
+
+
+def test_capabilities_pick_the_transport():
+    """Redfish from iLO 5 on; iLO 4, RIBCL-only and unknown iLOs use RIBCL."""
+    ilo5 = capabilities_from_scan(
+        IloScanResult("ilo", 443, PROTOCOL_REDFISH, manager="iLO 5", firmware="2.72")
+    )
+    assert ilo5 == IloCapabilities(generation=5, firmware="2.72", redfish=True)
+    assert ilo5.protocol == PROTOCOL_REDFISH
+
+    ilo4 = capabilities_from_scan(IloScanResult("ilo", 443, PROTOCOL_REDFISH, manager="iLO4"))
+    assert ilo4.generation == 4
+    assert ilo4.protocol == PROTOCOL_RIBCL
+
+    ilo3 = capabilities_from_scan(IloScanResult("ilo", 443, PROTOCOL_RIBCL, manager="iLO 3"))
+    assert ilo3.protocol == PROTOCOL_RIBCL
+    assert capabilities_from_scan(None).protocol == PROTOCOL_RIBCL
+
+    assert IloCapabilities.from_dict(ilo5.as_dict()) == ilo5
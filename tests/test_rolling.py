@@ -0,0 +1,92 @@
+"""Test the in-memory rolling windows."""
+import random
+
+import pytest
+
+from custom_components.hp_ilo.rolling import (
+    IloRollingMetrics,
+    RollingWindow,
+    window_capacity,
+)
+
+
+def test_window_statistics():
+    """Mean, peak and slope follow the samples inside the window."""
+    rolling = RollingWindow(window=60, capacity=window_capacity(60, 10))
+    assert rolling.capacity == 7
+    assert rolling.mean is None and rolling.slope is None
+
+    # 2 degrees per 10 s is 12 per minute
+    for step in range(7):
+        rolling.push(step * 10.0, 40.0 + 2 * step)
+    assert rolling.mean == 46.0
+    assert rolling.peak == 52.0
+    assert rolling.slope == pytest.approx(12.0)
+
+    # The peak leaves the window with its sample
+    rolling.push(70.0, 30.0)
+    rolling.push(80.0, 30.0)
+    rolling.push(135.0, 30.0)
+    assert rolling.count == 2
+    assert rolling.peak == 30.0
+    assert rolling.slope == pytest.approx(0.0)
+
+    # Out-of-order samples are ignored
+    rolling.push(100.0, 99.0)
+    assert rolling.peak == 30.0
+
+
+def test_running_sums_match_a_full_recompute():
+    """After many wraps of the ring the O(1) sums still match the samples."""
+    rolling = RollingWindow(window=300, capacity=window_capacity(300, 5))
+    samples: list[tuple[float, float]] = []
+    now = 1_000_000.0
+    rng = random.Random(0)
+    for _ in range(5000):
+        now += rng.uniform(5, 12)
+        value = rng.uniform(100, 400)
+        rolling.push(now, value)
+        samples.append((now, value))
+
+    window = [(time, value) for time, value in samples if time >= now - 300]
+    assert rolling.count == len(window)
+    assert rolling.mean == pytest.approx(sum(v for _, v in window) / len(window))
+    assert rolling.peak == max(v for _, v in window)
+    area = sum(
+        (t1 - t0) * (v0 + v1) / 2 for (t0, v0), (t1, v1) in zip(window, window[1:])
+    )
+    assert rolling.average == pytest.approx(area / (window[-1][0] - window[0][0]))
+
+    mean_t = sum(t for t, _ in window) / len(window)
+    mean_v = rolling.mean
+    slope = sum((t - mean_t) * (v - mean_v) for t, v in window) / sum(
+        (t - mean_t) ** 2 for t, _ in window
+    )
+    assert rolling.slope == pytest.approx(slope * 60)
+
+
+def test_average_is_time_weighted():
+    """A burst of fast polls does not outweigh the normal interval."""
+    metrics = IloRollingMetrics(window=300)
+    # Four minutes at 100 W, polled every 60 s ...
+    for now in range(0, 241, 60):
+        metrics.update_power(float(now), 100, 2)
+    # ... then a 2 s convergence burst at 400 W for 20 s
+    for now in range(242, 261, 2):
+        result = metrics.update_power(float(now), 400, 2)
+
+    # 240 s at 100 W, a 2 s ramp and 18 s at 400 W over 260 s
+    assert result["power_average"] == round((240 * 100 + 2 * 250 + 18 * 400) / 260, 1)
+    # A plain mean of the 15 samples would say 300 W
+    assert result["power_average"] < 130
+    assert result["power_peak"] == 400
+
+
+def test_metrics_per_slot():
+    """A missing reading shows no trend for that slot only."""
+    metrics = IloRollingMetrics(window=300)
+    metrics.update_rates("temperature", 0.0, (40, 30), 60)
+    assert metrics.update_rates("temperature", 60.0, (41, None), 60) == (1.0, None)
+    assert metrics.update_power(0.0, 200, 10) == {"power_average": 200.0, "power_peak": 200.0}
+    assert metrics.update_power(10.0, 101, 10) == {"power_average": 150.5, "power_peak": 200.0}
+    assert metrics.stats["metrics"] == 3
@@ -0,0 +1,100 @@
+"""Test the domain-wide hp_ilo poll scheduler."""
+import asyncio
+import time
+from types import SimpleNamespace
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.hp_ilo.const import DOMAIN
+from custom_components.hp_ilo.scheduler import IloFleetScheduler, subnet_key
+
+
+class FakeCoordinator:
+    """Just enough of a coordinator for the scheduler."""
+
+    def __init__(self, hass, host: str, next_due: float | None = None) -> None:
+        self.entry = MockConfigEntry(domain=DOMAIN, entry_id=host)
+        self.entry.add_to_hass(hass)
+        self.connection = SimpleNamespace(host=host)
+        self.next_due = next_due
+        self.refreshed = asyncio.Event()
+
+    async def async_refresh(self) -> None:
+        self.next_due = None
+        self.refreshed.set()
+
+
+def test_subnet_key():
+    """Hosts are grouped per /24, /64 or DNS domain."""
+    assert subnet_key("10.0.1.17") == subnet_key("10.0.1.200") == "10.0.1.0/24"
+    assert subnet_key("10.0.2.17") != subnet_key("10.0.1.17")
+    assert subnet_key("fd00::1") == "fd00::/64"
+    assert subnet_key("ilo01.mgmt.example") == "mgmt.example"
+
+
+async def test_phases_spread_evenly(hass):
+    """Each new entry starts in the largest gap of the interval."""
+    scheduler = IloFleetScheduler(hass)
+    coordinators = [FakeCoordinator(hass, f"10.0.0.{i}") for i in range(5)]
+    for coordinator in coordinators:
+        scheduler.async_add(coordinator)
+
+    phases = sorted(coordinator.phase for coordinator in coordinators)
+    assert phases[-1] == 1.0
+    gaps = [b - a for a, b in zip([0.0, *phases], phases)]
+    assert max(gaps) < 2.7 * min(gaps)
+
+
+async def test_concurrency_is_capped(hass):
+    """Requests wait for a global and a per-subnet slot."""
+    scheduler = IloFleetScheduler(hass, max_concurrent=3, max_per_subnet=2)
+    coordinators = [
+        FakeCoordinator(hass, f"10.0.{subnet}.{i}")
+        for subnet in (1, 2)
+        for i in range(4)
+    ]
+    active: dict[str, int] = {"total": 0, "10.0.1": 0, "10.0.2": 0}
+    peak = dict.fromkeys(active, 0)
+    release = asyncio.Event()
+
+    async def request(coordinator):
+        async with scheduler.async_slot(coordinator):
+            subnet = coordinator.connection.host.rpartition(".")[0]
+            for key in ("total", subnet):
+                active[key] += 1
+                peak[key] = max(peak[key], active[key])
+            await release.wait()
+            for key in ("total", subnet):
+                active[key] -= 1
+
+    tasks = [asyncio.create_task(request(c)) for c in coordinators]
+    await asyncio.sleep(0)
+    assert scheduler.stats["active"] == 3
+    assert scheduler.stats["queued"] == 5
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert peak["total"] == 3
+    assert peak["10.0.1"] <= 2 and peak["10.0.2"] <= 2
+    assert scheduler.stats["queued"] == 0
+
+
+async def test_due_coordinators_are_dispatched(hass):
+    """The scheduler's timer refreshes coordinators once they are due."""
+    scheduler = IloFleetScheduler(hass)
+    due = FakeCoordinator(hass, "10.0.0.1", next_due=time.monotonic() - 1)
+    later = FakeCoordinator(hass, "10.0.0.2", next_due=time.monotonic() + 3600)
+    remove_due = scheduler.async_add(due)
+    remove_later = scheduler.async_add(later)
+
+    scheduler.async_reschedule()
+    await asyncio.wait_for(due.refreshed.wait(), 1)
+    await hass.async_block_till_done()
+
+    assert not later.refreshed.is_set()
+    assert scheduler.stats["dispatched"] == 1
+    assert scheduler.stats["in_flight"] == 0
+
+    remove_due()
+    remove_later()
+    assert scheduler._timer is None
@@ -0,0 +1,174 @@
+"""Test the hp_ilo services against a fleet of iLO simulators."""
+import asyncio
+
+from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import device_registry as dr
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.hp_ilo.const import DOMAIN
+
+from .const import MOCK_ENTRY_DATA
+from .simulator import IloSimulator
+
+
+@pytest.fixture(name="fleet")
+async def fleet_fixture(hass, socket_enabled):
+    """Three loaded entries, each with its own simulator."""
+    simulators = [IloSimulator() for _ in range(3)]
+    entries = []
+    for index, simulator in enumerate(simulators):
+        await simulator.async_start()
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                **MOCK_ENTRY_DATA,
+                CONF_HOST: "127.0.0.1",
+                CONF_PORT: simulator.port,
+                CONF_NAME: f"iLO {index}",
+            },
+            title=f"iLO {index}",
+            entry_id=f"ilo{index}",
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        entries.append(entry)
+    yield list(zip(entries, simulators))
+    for entry, simulator in zip(entries, simulators):
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await simulator.async_stop()
+
+
+async def test_bulk_power_staggered(hass, fleet):
+    """bulk_power reaches every host, staggered, and reports per host."""
+    for _, simulator in fleet:
+        simulator.state["PowerState"] = "Off"
+    device = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, "ilo2")})
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "bulk_power",
+        {
+            "action": "power_on",
+            "config_entry_id": ["ilo0", "ilo1"],
+            "device_id": device.id,
+            "stagger": 0.2,
+            "max_concurrent": 2,
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["failed"] == 0
+    results = response["results"]
+    assert [result["entry_id"] for result in results] == ["ilo0", "ilo1", "ilo2"]
+    assert {result["result"] for result in results} == {"sent"}
+    # Host i starts no earlier than i * stagger
+    assert all(result["started"] >= 0.2 * index for index, result in enumerate(results))
+    assert all(simulator.commands.count("SET_HOST_POWER") == 1 for _, simulator in fleet)
+
+    # Right after power on, a shutdown of the same hosts is rejected per host
+    response = await hass.services.async_call(
+        DOMAIN,
+        "bulk_power",
+        {"action": "shutdown_hard", "config_entry_id": ["ilo0", "ilo1", "ilo2"]},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["failed"] == 3
+    assert {result["result"] for result in response["results"]} == {"rejected"}
+    assert not any("HOLD_PWR_BTN" in simulator.commands for _, simulator in fleet)
+
+
+async def test_power_services_need_a_target(hass, fleet):
+    """With several iLOs loaded a power service must say which one."""
+    with pytest.raises(ServiceValidationError, match="needs a config_entry_id"):
+        await hass.services.async_call(DOMAIN, "reboot_server", {}, blocking=True)
+
+    await hass.services.async_call(
+        DOMAIN, "reboot_server", {"config_entry_id": "ilo1"}, blocking=True
+    )
+    assert [simulator.commands.count("WARM_BOOT_SERVER") for _, simulator in fleet] == [
+        0,
+        1,
+        0,
+    ]
+
+    # Without a response variable, failures surface as an error
+    await fleet[0][1].async_stop()
+    with pytest.raises(HomeAssistantError, match="reboot_server failed on 127.0.0.1"):
+        await hass.services.async_call(
+            DOMAIN,
+            "bulk_power",
+            {"action": "reboot_server", "config_entry_id": "ilo0"},
+            blocking=True,
+        )
+
+
+def _polled_after(commands: list[str], action: str) -> bool:
+    """Whether the power state was read after ``action`` was sent."""
+    return action in commands and "GET_HOST_POWER_STATUS" in commands[
+        commands.index(action) + 1 :
+    ]
+
+
+async def test_reboot_is_sent_without_waiting(hass, fleet):
+    """A warm boot starts and ends ON: ``wait`` does not wait for it."""
+    simulator = fleet[0][1]
+    response = await hass.services.async_call(
+        DOMAIN,
+        "bulk_power",
+        {"action": "reboot_server", "config_entry_id": "ilo0", "wait": True},
+        blocking=True,
+        return_response=True,
+    )
+    (result,) = response["results"]
+    assert result["result"] == "sent"
+    assert result["duration"] < 2
+    assert simulator.state["PowerState"] == "On"
+
+    # Only the power state is read right away, without a 2 s burst
+    while not _polled_after(simulator.commands, "WARM_BOOT_SERVER"):
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(3)
+    after = simulator.commands[simulator.commands.index("WARM_BOOT_SERVER") :]
+    assert after.count("GET_HOST_POWER_STATUS") == 1
+    assert "GET_SERVER_POWER_ON_TIME" not in after
+    assert "GET_FW_VERSION" not in after
+
+
+async def test_shutdowns_share_the_confirmation(hass, fleet):
+    """Graceful then hard off wait for the same OFF; a late call checks the state."""
+    simulator = fleet[0][1]
+    simulator.power_delay = 2
+
+    def shutdown(action: str):
+        return hass.async_create_task(
+            hass.services.async_call(
+                DOMAIN,
+                "bulk_power",
+                {"action": action, "config_entry_id": "ilo0", "wait": True, "timeout": 10},
+                blocking=True,
+                return_response=True,
+            )
+        )
+
+    graceful = shutdown("shutdown_graceful")
+    while "PRESS_PWR_BTN" not in simulator.commands:
+        await asyncio.sleep(0.05)
+    hard = shutdown("shutdown_hard")
+    results = [(await call)["results"][0]["result"] for call in (graceful, hard)]
+    assert results == ["confirmed", "confirmed"]
+    assert simulator.commands.count("HOLD_PWR_BTN") == 1
+
+    # Coalesced with the hard shutdown above, confirmed by a fresh read
+    response = await shutdown("shutdown_hard")
+    assert response["results"][0]["result"] == "confirmed"
+    assert simulator.commands.count("HOLD_PWR_BTN") == 1
+
+    # Without a running action the current state decides
+    coordinator = hass.data[DOMAIN]["ilo0"]["coordinator"]
+    assert await coordinator.async_wait_power_state("hard_shutdown")
+    assert not await coordinator.async_wait_power_state("power_on")
@@ -0,0 +1,144 @@
+"""Run the integration end to end against the local iLO simulator."""
+from unittest.mock import patch
+
+from homeassistant.components.button import DOMAIN as BUTTON_DOMAIN, SERVICE_PRESS
+from homeassistant.const import ATTR_ENTITY_ID, CONF_HOST, CONF_PORT
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.hp_ilo.const import (
+    CONF_CAPABILITIES,
+    CONF_PROTOCOL,
+    DOMAIN,
+    PROTOCOL_AUTO,
+    PROTOCOL_REDFISH,
+    PROTOCOL_RIBCL,
+    TIER_POWER,
+)
+
+from .const import MOCK_ENTRY_DATA
+from .simulator import IloSimulator
+
+
+async def _setup_entry(hass, simulator, protocol) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            **MOCK_ENTRY_DATA,
+            CONF_HOST: "127.0.0.1",
+            CONF_PORT: simulator.port,
+            CONF_PROTOCOL: protocol,
+        },
+        entry_id="test",
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+@pytest.mark.parametrize("protocol", [PROTOCOL_RIBCL, PROTOCOL_REDFISH])
+async def test_sensors_and_actions(hass, ilo_simulator, protocol):
+    """Both protocols build the same entities and reach the same power state."""
+    ilo_simulator.temperatures = 3
+    ilo_simulator.fans = 2
+    entry = await _setup_entry(hass, ilo_simulator, protocol)
+
+    sensors = hass.states.async_entity_ids("sensor")
+    assert hass.states.get("sensor.test_ilo_temp_01_inlet_ambient").state == "21"
+    assert hass.states.get("sensor.test_ilo_temp_03_sensor_2").state == "27"
+    assert hass.states.get("sensor.test_ilo_fan_fan_2").state == "23"
+    assert len([entity_id for entity_id in sensors if "_temp_" in entity_id]) == 3
+    assert hass.states.get("sensor.test_ilo_power_status").state == "ON"
+    device = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, entry.entry_id)})
+    assert device.model == "ProLiant DL360 Gen10"
+
+    await hass.services.async_call(
+        BUTTON_DOMAIN,
+        SERVICE_PRESS,
+        {ATTR_ENTITY_ID: "button.test_ilo_shutdown_hard_press_hold"},
+        blocking=True,
+    )
+    assert {"HOLD_PWR_BTN", "ForceOff"} & set(ilo_simulator.commands)
+    # The press triggers a power poll right away
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    assert await coordinator.async_wait_power_state("hard_shutdown")
+    assert hass.states.get("sensor.test_ilo_power_status").state == "OFF"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+@pytest.mark.parametrize(
+    ("redfish", "generation", "protocol"),
+    [(True, 5, PROTOCOL_REDFISH), (False, 3, PROTOCOL_RIBCL)],
+)
+async def test_auto_protocol(hass, socket_enabled, redfish, generation, protocol):
+    """An auto entry probes the iLO once and keeps the result."""
+    simulator = IloSimulator(redfish=redfish)
+    await simulator.async_start()
+    try:
+        entry = await _setup_entry(hass, simulator, PROTOCOL_AUTO)
+        assert entry.data[CONF_CAPABILITIES]["generation"] == generation
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        assert coordinator.protocol == protocol
+        assert hass.states.get("sensor.test_ilo_power_status").state == "ON"
+
+        # A restart reuses the cached capabilities instead of probing again
+        with patch("custom_components.hp_ilo.transport.async_probe_host") as probe:
+            assert await hass.config_entries.async_reload(entry.entry_id)
+            await hass.async_block_till_done()
+        probe.assert_not_called()
+        assert hass.data[DOMAIN][entry.entry_id]["coordinator"].protocol == protocol
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    finally:
+        await simulator.async_stop()
+
+
+async def test_errors_are_counted(hass, ilo_simulator):
+    """Simulated iLO errors fail the poll and show up in the stats."""
+    entry = await _setup_entry(hass, ilo_simulator, PROTOCOL_RIBCL)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    ilo_simulator.error_rate = 1.0
+    coordinator.async_mark_tiers_due(TIER_POWER)
+    await coordinator.async_refresh()
+
+    assert not coordinator.last_update_success
+    assert ilo_simulator.errors >= 1
+    assert coordinator.stats.errors == {"IloError": 1}
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_power_action_waits_for_state(hass, ilo_simulator):
+    """With wait, the service returns once fast polling saw the new state."""
+    ilo_simulator.power_delay = 1.5
+    entry = await _setup_entry(hass, ilo_simulator, PROTOCOL_RIBCL)
+    polls = ilo_simulator.commands.count("GET_HOST_POWER_STATUS")
+
+    await hass.services.async_call(
+        DOMAIN, "shutdown_graceful", {"wait": True}, blocking=True
+    )
+
+    assert hass.states.get("sensor.test_ilo_power_status").state == "OFF"
+    # Still ON at the first poll, OFF at the next one 2 s later
+    assert ilo_simulator.commands.count("GET_HOST_POWER_STATUS") - polls == 2
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    assert coordinator._converge is None
+
+    # Powering on right after a shutdown is refused ...
+    with pytest.raises(HomeAssistantError, match="power_on conflicts with press_pwr_button"):
+        await hass.services.async_call(DOMAIN, "power_on", {}, blocking=True)
+
+    # ... until the action window has passed
+    coordinator.connection.actions.window = 0
+    ilo_simulator.power_delay = 60
+    with pytest.raises(HomeAssistantError, match=r"power_on failed on 127.0.0.1 \(timeout\)"):
+        await hass.services.async_call(
+            DOMAIN, "power_on", {"wait": True, "timeout": 1}, blocking=True
+        )
+    assert hass.states.get("sensor.test_ilo_power_status").state == "OFF"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
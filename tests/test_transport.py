@@ -0,0 +1,48 @@
+"""Test the hp_ilo transport backends."""
+import threading
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.hp_ilo.const import DOMAIN, PROTOCOL_RIBCL
+from custom_components.hp_ilo.coordinator import IloDataUpdateCoordinator
+from custom_components.hp_ilo.transport import IloTransport, RibclTransport
+
+from .const import MOCK_ENTRY_DATA
+
+
+def test_transport_must_implement_the_interface():
+    """A backend that misses a method fails when created, not during a poll."""
+
+    class Incomplete(IloTransport):
+        protocol = PROTOCOL_RIBCL
+
+        async def async_fetch(self, tiers, identity):
+            return {}, {}
+
+    with pytest.raises(TypeError, match="async_power_action"):
+        Incomplete()
+
+
+async def test_ribcl_poll_is_normalized_on_the_event_loop(hass: HomeAssistant, mock_ilo):
+    """The executor only talks RIBCL; slots and snapshot change on the loop."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_ENTRY_DATA, entry_id="test")
+    entry.add_to_hass(hass)
+    threads: list[threading.Thread] = []
+    normalize_poll = IloDataUpdateCoordinator.normalize_poll
+
+    def record(coordinator, raw):
+        threads.append(threading.current_thread())
+        return normalize_poll(coordinator, raw)
+
+    with patch.object(IloDataUpdateCoordinator, "normalize_poll", record):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    assert isinstance(coordinator.transport, RibclTransport)
+    assert threads == [threading.main_thread()]
+    assert coordinator.data.power_status == "ON"
+    assert await hass.config_entries.async_unload(entry.entry_id)